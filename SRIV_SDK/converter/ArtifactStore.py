@@ -0,0 +1,186 @@
+"""
+Volition Artifact Store
+
+Content addressed store of crunched files shared between projects.
+A rule that was crunched before with the same inputs, in any project folder,
+gets its targets linked or copied out of the store instead of running the cruncher again.
+
+- Entries are keyed by a hash of the normalized rule, the hashes of its sources and the cruncher
+- Each entry is a folder holding the crunched target files by name
+- Entries are written to a temp folder and renamed into place, so the store can be shared between machines
+"""
+
+import ctypes
+import hashlib
+import os
+import shutil
+import sys
+import tempfile
+
+
+# Bump when the way entries are keyed or laid out changes so old entries are ignored
+ARTIFACT_STORE_VERSION = 1
+
+# Store folder name, created next to the converter unless a shared folder is set
+ARTIFACT_STORE_FOLDER = 'artifacts'
+
+
+def get_artifact_key( normalized_rule, input_hashes ):
+	"""
+	Build the store key of a crunched rule
+
+	*Arguments:*
+		* ``normalized_rule`` Rule xml without anything specific to the project folder
+		* ``input_hashes`` Hashes of the sources and the cruncher files, in a stable order
+
+	*Keyword Arguments:*
+		* ``none``
+
+	*Returns:*
+		* ``string`` store key
+	"""
+
+	key_hash = hashlib.sha1( normalized_rule )
+	for input_hash in input_hashes:
+		key_hash.update( input_hash.encode( 'ascii' ) )
+	key_hash.update( str( ARTIFACT_STORE_VERSION ).encode( 'ascii' ) )
+
+	return key_hash.hexdigest( )
+
+
+def get_artifact_dir( store_dir, artifact_key ):
+	"""
+	Get the entry folder of a store key, entries are spread over sub folders by the first characters of the key
+
+	*Arguments:*
+		* ``store_dir`` Store folder
+		* ``artifact_key`` Key returned from get_artifact_key
+
+	*Keyword Arguments:*
+		* ``none``
+
+	*Returns:*
+		* ``string`` entry folder
+	"""
+
+	return os.path.join( store_dir, artifact_key[ :2 ], artifact_key )
+
+
+def link_or_copy_file( source, destination ):
+	"""
+	Hard link a file to a new location, copy it when it can not be linked ie. the store is on another drive
+
+	*Arguments:*
+		* ``source`` Existing file
+		* ``destination`` New file, replaced if it exists
+
+	*Keyword Arguments:*
+		* ``none``
+
+	*Returns:*
+		* ``none``
+	"""
+
+	if os.path.lexists( destination ):
+		os.remove( destination )
+
+	try:
+		if hasattr( os, 'link' ):
+			os.link( source, destination )
+			return
+
+		# python 2 has no os.link on windows
+		if os.name == 'nt':
+			encoding = sys.getfilesystemencoding( )
+			if ctypes.windll.kernel32.CreateHardLinkW( destination.decode( encoding ), source.decode( encoding ), None ):
+				return
+
+	except ( OSError, UnicodeDecodeError ):
+		pass
+
+	shutil.copy2( source, destination )
+
+
+def fetch_artifacts( store_dir, artifact_key, targets ):
+	"""
+	Materialize the crunched files of a store entry at the target locations
+
+	*Arguments:*
+		* ``store_dir`` Store folder
+		* ``artifact_key`` Key returned from get_artifact_key
+		* ``targets`` Target filenames of the rule
+
+	*Keyword Arguments:*
+		* ``none``
+
+	*Returns:*
+		* ``bool`` True if every target was found in the store and put in place
+	"""
+
+	artifact_dir = get_artifact_dir( store_dir, artifact_key )
+	if not os.path.isdir( artifact_dir ):
+		return False
+
+	artifacts = [ os.path.join( artifact_dir, os.path.basename( target ) ) for target in targets ]
+	for artifact in artifacts:
+		if not os.path.isfile( artifact ):
+			return False
+
+	try:
+		for artifact, target in zip( artifacts, targets ):
+			link_or_copy_file( artifact, target )
+
+	except ( IOError, OSError ) as error:
+		print 'Could not fetch crunched files from the artifact store: {0} {1}'.format( artifact_dir, error )
+		return False
+
+	return True
+
+
+def store_artifacts( store_dir, artifact_key, targets ):
+	"""
+	Copy the crunched files of a rule into the store
+
+	*Arguments:*
+		* ``store_dir`` Store folder
+		* ``artifact_key`` Key returned from get_artifact_key
+		* ``targets`` Target filenames of the rule, all of them must exist
+
+	*Keyword Arguments:*
+		* ``none``
+
+	*Returns:*
+		* ``bool`` True if the entry was written or was already in the store
+	"""
+
+	artifact_dir = get_artifact_dir( store_dir, artifact_key )
+	if os.path.isdir( artifact_dir ):
+		return True
+
+	for target in targets:
+		if not os.path.isfile( target ):
+			return False
+
+	temp_dir = None
+	try:
+		if not os.path.isdir( os.path.dirname( artifact_dir ) ):
+			os.makedirs( os.path.dirname( artifact_dir ) )
+
+		# fill a temp folder first so a partial entry is never picked up
+		temp_dir = tempfile.mkdtemp( prefix = artifact_key + '.', suffix = '.tmp', dir = os.path.dirname( artifact_dir ) )
+		for target in targets:
+			shutil.copy2( target, os.path.join( temp_dir, os.path.basename( target ) ) )
+		os.rename( temp_dir, artifact_dir )
+
+	except ( IOError, OSError ) as error:
+		if temp_dir and os.path.isdir( temp_dir ):
+			shutil.rmtree( temp_dir, True )
+
+		# another converter stored the same entry first
+		if os.path.isdir( artifact_dir ):
+			return True
+
+		print 'Could not write the artifact store entry: {0} {1}'.format( artifact_dir, error )
+		return False
+
+	return True
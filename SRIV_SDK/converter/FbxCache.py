@@ -0,0 +1,236 @@
+"""
+Volition FBX Cache
+
+On-disk cache for the mesh data extracted from an fbx file.
+Reopening or refreshing a file that was already extracted with the same
+import settings reads the arrays back instead of walking the fbx scene again.
+
+- Entries are NumPy .npz archives, one per mesh
+- Entries are keyed by a hash of the fbx file contents and the import settings
+- The cache folder is kept under a size limit by removing the least recently used entries
+"""
+
+import hashlib
+import json
+import os
+import zipfile
+
+import numpy
+
+
+# Bump when the layout of the cached arrays changes so old entries are ignored
+FBX_CACHE_VERSION = 5
+
+# Cache folder name, created next to the converter
+FBX_CACHE_FOLDER = 'cache'
+FBX_CACHE_EXTENSION = '.npz'
+
+# Size limit of the cache folder in bytes
+FBX_CACHE_MAX_SIZE = 512 * 1024 * 1024
+
+# Number of bytes read from the fbx file at a time when hashing
+FBX_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def get_file_hash( filename, chunk_size = FBX_HASH_CHUNK_SIZE ):
+	"""
+	Hash the contents of a file
+
+	*Arguments:*
+		* ``filename`` File on disk
+
+	*Keyword Arguments:*
+		* ``chunk_size`` Number of bytes read at a time
+
+	*Returns:*
+		* ``string`` sha1 hex digest of the file contents
+	"""
+
+	file_hash = hashlib.sha1( )
+	with open( filename, 'rb' ) as hash_file:
+		while True:
+			chunk = hash_file.read( chunk_size )
+			if not chunk:
+				break
+			file_hash.update( chunk )
+
+	return file_hash.hexdigest( )
+
+
+def get_cache_key( filename, settings ):
+	"""
+	Build the cache key for an fbx file and the settings it was imported with
+
+	*Arguments:*
+		* ``filename`` Fbx file on disk
+		* ``settings`` Dictionary of import settings that change the extracted data
+
+	*Keyword Arguments:*
+		* ``none``
+
+	*Returns:*
+		* ``string`` cache key
+	"""
+
+	key_hash = hashlib.sha1( get_file_hash( filename ).encode( 'ascii' ) )
+	key_hash.update( json.dumps( settings, sort_keys = True ).encode( 'ascii' ) )
+	key_hash.update( str( FBX_CACHE_VERSION ).encode( 'ascii' ) )
+
+	return key_hash.hexdigest( )
+
+
+def get_cache_filename( cache_dir, cache_key, mesh_index ):
+	"""
+	Get the cache entry file for a mesh
+
+	*Arguments:*
+		* ``cache_dir`` Cache folder
+		* ``cache_key`` Key returned from get_cache_key
+		* ``mesh_index`` Index of the mesh in the scene
+
+	*Keyword Arguments:*
+		* ``none``
+
+	*Returns:*
+		* ``string`` cache entry filename
+	"""
+
+	return os.path.join( cache_dir, '{0}_{1}{2}'.format( cache_key, mesh_index, FBX_CACHE_EXTENSION ) )
+
+
+def load_cache_entry( filename ):
+	"""
+	Read the arrays stored in a cache entry and mark the entry as recently used
+
+	*Arguments:*
+		* ``filename`` Cache entry filename
+
+	*Keyword Arguments:*
+		* ``none``
+
+	*Returns:*
+		* ``dict`` array name -> numpy array, meta data is returned under 'meta'
+		* ``None`` if the entry does not exist or can not be read
+	"""
+
+	if not os.path.isfile( filename ):
+		return None
+
+	try:
+		with numpy.load( filename ) as entry:
+			arrays = dict( ( name, entry[ name ] ) for name in entry.files )
+		arrays[ 'meta' ] = json.loads( arrays[ 'meta' ].tostring( ).decode( 'utf-8' ) )
+
+	except ( IOError, OSError, KeyError, ValueError, zipfile.BadZipfile ):
+		# drop broken entries so they are rebuilt
+		remove_cache_entry( filename )
+		return None
+
+	try:
+		os.utime( filename, None )
+	except OSError:
+		pass
+
+	return arrays
+
+
+def save_cache_entry( filename, arrays, meta, max_size = FBX_CACHE_MAX_SIZE ):
+	"""
+	Write a cache entry then trim the cache folder to the size limit
+
+	*Arguments:*
+		* ``filename`` Cache entry filename
+		* ``arrays`` Dictionary of array name -> numpy array
+		* ``meta`` Json serializable meta data stored with the arrays
+
+	*Keyword Arguments:*
+		* ``max_size`` Size limit of the cache folder in bytes
+
+	*Returns:*
+		* ``bool`` True if the entry was written
+	"""
+
+	cache_dir = os.path.dirname( filename )
+	temp_filename = filename + '.tmp'
+
+	try:
+		if not os.path.isdir( cache_dir ):
+			os.makedirs( cache_dir )
+
+		arrays = dict( arrays )
+		arrays[ 'meta' ] = numpy.frombuffer( json.dumps( meta ).encode( 'utf-8' ), dtype = numpy.uint8 )
+
+		# write to a temp file first so a partial entry is never picked up
+		with open( temp_filename, 'wb' ) as entry_file:
+			numpy.savez_compressed( entry_file, **arrays )
+
+		remove_cache_entry( filename )
+		os.rename( temp_filename, filename )
+
+	except ( IOError, OSError, TypeError, ValueError ) as error:
+		print 'Could not write the fbx cache entry: {0} {1}'.format( filename, error )
+		remove_cache_entry( temp_filename )
+		return False
+
+	prune_cache( cache_dir, max_size )
+
+	return True
+
+
+def remove_cache_entry( filename ):
+	"""
+	Delete a cache entry if it exists
+
+	*Arguments:*
+		* ``filename`` Cache entry filename
+
+	*Keyword Arguments:*
+		* ``none``
+
+	*Returns:*
+		* ``none``
+	"""
+
+	try:
+		if os.path.lexists( filename ):
+			os.remove( filename )
+	except OSError:
+		pass
+
+
+def prune_cache( cache_dir, max_size = FBX_CACHE_MAX_SIZE ):
+	"""
+	Remove the least recently used entries until the cache folder fits in the size limit
+
+	*Arguments:*
+		* ``cache_dir`` Cache folder
+
+	*Keyword Arguments:*
+		* ``max_size`` Size limit of the cache folder in bytes
+
+	*Returns:*
+		* ``int`` number of entries removed
+	"""
+
+	entries = [ ]
+	total_size = 0
+	for entry_name in os.listdir( cache_dir ):
+		if not entry_name.endswith( FBX_CACHE_EXTENSION ):
+			continue
+		entry_filename = os.path.join( cache_dir, entry_name )
+		try:
+			entry_stat = os.stat( entry_filename )
+		except OSError:
+			continue
+		entries.append( ( entry_stat.st_mtime, entry_stat.st_size, entry_filename ) )
+		total_size += entry_stat.st_size
+
+	num_removed = 0
+	for entry_time, entry_size, entry_filename in sorted( entries ):
+		if total_size <= max_size:
+			break
+		remove_cache_entry( entry_filename )
+		total_size -= entry_size
+		num_removed += 1
+
+	return num_removed
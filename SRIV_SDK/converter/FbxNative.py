@@ -0,0 +1,2093 @@
+"""
+Volition FBX Native Scene
+
+A pure python stand in for the parts of the Autodesk FBX Python SDK ( FbxCommon )
+that the converter uses.  Files are read with FbxReader and exposed through the
+same class and method names as the SDK, so the converter can switch between the
+two backends without any other changes.
+
+- Scene, Node, Mesh, Skin/Cluster, BlendShape/Channel/Shape, Material, Texture
+- Matrix/Vector/Quaternion math following the SDK storage conventions
+- Axis system conversion and triangulation
+"""
+
+import math
+import os
+
+import numpy
+
+import FbxReader
+
+
+# Property data types, FbxCommon.EFbxType
+( eFbxUndefined, eFbxChar, eFbxUChar, eFbxShort, eFbxUShort, eFbxUInt,
+  eFbxLongLong, eFbxULongLong, eFbxHalfFloat, eFbxBool, eFbxInt, eFbxFloat,
+  eFbxDouble, eFbxDouble2, eFbxDouble3, eFbxDouble4, eFbxDouble4x4, eFbxEnum,
+  eFbxString, eFbxTime, eFbxReference, eFbxBlob, eFbxDistance, eFbxDateTime ) = range( 24 )
+
+# Property type names found in Properties70 and their data types
+PROPERTY_DATA_TYPES = { 'bool'                   : eFbxBool,
+                        'Bool'                   : eFbxBool,
+                        'Visibility Inheritance' : eFbxBool,
+                        'int'                    : eFbxInt,
+                        'Integer'                : eFbxInt,
+                        'short'                  : eFbxShort,
+                        'Short'                  : eFbxShort,
+                        'ULongLong'              : eFbxULongLong,
+                        'float'                  : eFbxFloat,
+                        'Float'                  : eFbxFloat,
+                        'double'                 : eFbxDouble,
+                        'Double'                 : eFbxDouble,
+                        'Number'                 : eFbxDouble,
+                        'Visibility'             : eFbxDouble,
+                        'Vector2D'               : eFbxDouble2,
+                        'Vector'                 : eFbxDouble3,
+                        'Vector3D'               : eFbxDouble3,
+                        'Color'                  : eFbxDouble3,
+                        'ColorRGB'               : eFbxDouble3,
+                        'Lcl Translation'        : eFbxDouble3,
+                        'Lcl Rotation'           : eFbxDouble3,
+                        'Lcl Scaling'            : eFbxDouble3,
+                        'Vector4D'               : eFbxDouble4,
+                        'ColorAndAlpha'          : eFbxDouble4,
+                        'enum'                   : eFbxEnum,
+                        'Enum'                   : eFbxEnum,
+                        'KString'                : eFbxString,
+                        'DateTime'               : eFbxDateTime,
+                        'KTime'                  : eFbxTime,
+                        'Time'                   : eFbxTime,
+                        'object'                 : eFbxReference,
+                        'Reference'              : eFbxReference,
+                        'Blob'                   : eFbxBlob,
+                        'Distance'               : eFbxDistance }
+
+# Euler rotation orders, EFbxRotationOrder, as the order the axis rotations are applied
+ROTATION_ORDERS = { 0 : 'xyz', 1 : 'xzy', 2 : 'yzx', 3 : 'yxz', 4 : 'zxy', 5 : 'zyx', 6 : 'xyz' }
+
+
+def _typed_property( fbx_property ):
+	"""
+	The SDK wraps a property in a typed template to call Get( ), the native
+	properties already return their typed value.
+
+	*Arguments:*
+		* ``fbx_property`` FbxProperty
+
+	*Returns:*
+		* ``fbx_property`` The same property
+	"""
+
+	return fbx_property
+
+FbxPropertyBool1 = _typed_property
+FbxPropertyInteger1 = _typed_property
+FbxPropertyFloat1 = _typed_property
+FbxPropertyDouble1 = _typed_property
+FbxPropertyDouble3 = _typed_property
+FbxPropertyDouble4 = _typed_property
+FbxPropertyString = _typed_property
+
+
+
+#---------------------------------------------------------------------------
+# Math
+#---------------------------------------------------------------------------
+
+class FbxVector4( object ):
+	"""
+	Four component vector, FbxCommon.FbxVector4
+
+	*Keyword Arguments:*
+		* ``x`` X value or a sequence of values
+		* ``y`` Y value
+		* ``z`` Z value
+		* ``w`` W value
+	"""
+
+	__slots__ = ( '_data', )
+
+	def __init__( self, x = 0.0, y = 0.0, z = 0.0, w = 1.0 ):
+		if isinstance( x, ( FbxVector4, list, tuple, numpy.ndarray ) ):
+			values = [ float( value ) for value in x ]
+			self._data = ( values + [ 0.0, 0.0, 0.0, 1.0 ][ len( values ) : ] )[ : 4 ]
+		else:
+			self._data = [ float( x ), float( y ), float( z ), float( w ) ]
+
+
+	def Set( self, x, y, z, w = 1.0 ):
+		self._data = [ float( x ), float( y ), float( z ), float( w ) ]
+
+
+	def Length( self ):
+		return math.sqrt( sum( value * value for value in self._data[ : 3 ] ) )
+
+
+	def __getitem__( self, index ):
+		return self._data[ index ]
+
+
+	def __setitem__( self, index, value ):
+		self._data[ index ] = float( value )
+
+
+	def __len__( self ):
+		return 4
+
+
+	def __iter__( self ):
+		return iter( self._data )
+
+
+	def __neg__( self ):
+		return FbxVector4( [ -value for value in self._data ] )
+
+
+	def __add__( self, other ):
+		return FbxVector4( [ a + b for a, b in zip( self._data, other ) ] )
+
+
+	def __sub__( self, other ):
+		return FbxVector4( [ a - b for a, b in zip( self._data, other ) ] )
+
+
+	def __mul__( self, other ):
+		if isinstance( other, ( int, long, float ) ):
+			return FbxVector4( [ value * other for value in self._data ] )
+
+		return FbxVector4( [ a * b for a, b in zip( self._data, other ) ] )
+
+	__rmul__ = __mul__
+
+
+	def __imul__( self, other ):
+		self._data = self.__mul__( other )._data
+		return self
+
+
+	def __eq__( self, other ):
+		try:
+			return list( self._data ) == [ float( value ) for value in other ]
+		except TypeError:
+			return False
+
+
+	def __ne__( self, other ):
+		return not self.__eq__( other )
+
+
+	def __repr__( self ):
+		return 'FbxVector4( {0}, {1}, {2}, {3} )'.format( *self._data )
+
+
+
+class FbxVector2( object ):
+	"""
+	Two component vector, FbxCommon.FbxVector2
+
+	*Keyword Arguments:*
+		* ``x`` X value
+		* ``y`` Y value
+	"""
+
+	__slots__ = ( '_data', )
+
+	def __init__( self, x = 0.0, y = 0.0 ):
+		self._data = [ float( x ), float( y ) ]
+
+
+	def Set( self, x, y ):
+		self._data = [ float( x ), float( y ) ]
+
+
+	def __getitem__( self, index ):
+		return self._data[ index ]
+
+
+	def __setitem__( self, index, value ):
+		self._data[ index ] = float( value )
+
+
+	def __len__( self ):
+		return 2
+
+
+	def __iter__( self ):
+		return iter( self._data )
+
+
+	def __repr__( self ):
+		return 'FbxVector2( {0}, {1} )'.format( *self._data )
+
+
+
+class FbxQuaternion( object ):
+	"""
+	Rotation quaternion stored as x, y, z, w, FbxCommon.FbxQuaternion
+
+	*Keyword Arguments:*
+		* ``x`` X value
+		* ``y`` Y value
+		* ``z`` Z value
+		* ``w`` W value
+	"""
+
+	__slots__ = ( '_data', )
+
+	def __init__( self, x = 0.0, y = 0.0, z = 0.0, w = 1.0 ):
+		self._data = [ float( x ), float( y ), float( z ), float( w ) ]
+
+
+	def Set( self, x, y, z, w = 1.0 ):
+		self._data = [ float( x ), float( y ), float( z ), float( w ) ]
+
+
+	def GetAt( self, index ):
+		return self._data[ index ]
+
+
+	def __getitem__( self, index ):
+		return self._data[ index ]
+
+
+	def __setitem__( self, index, value ):
+		self._data[ index ] = float( value )
+
+
+	def __len__( self ):
+		return 4
+
+
+	def __iter__( self ):
+		return iter( self._data )
+
+
+	def __repr__( self ):
+		return 'FbxQuaternion( {0}, {1}, {2}, {3} )'.format( *self._data )
+
+
+
+class FbxColor( object ):
+	"""
+	RGBA color, FbxCommon.FbxColor
+	"""
+
+	def __init__( self, red = 0.0, green = 0.0, blue = 0.0, alpha = 1.0 ):
+		self.mRed = red
+		self.mGreen = green
+		self.mBlue = blue
+		self.mAlpha = alpha
+
+
+
+def _axis_rotation( axis, degrees ):
+	"""
+	Build a 3x3 rotation matrix around a single axis, column vector convention
+
+	*Arguments:*
+		* ``axis`` 'x', 'y' or 'z'
+		* ``degrees`` Rotation angle
+
+	*Returns:*
+		* ``matrix`` 3x3 numpy array
+	"""
+
+	radians = math.radians( degrees )
+	cos = math.cos( radians )
+	sin = math.sin( radians )
+
+	if axis == 'x':
+		return numpy.array( [ [ 1.0, 0.0, 0.0 ], [ 0.0, cos, -sin ], [ 0.0, sin, cos ] ] )
+	elif axis == 'y':
+		return numpy.array( [ [ cos, 0.0, sin ], [ 0.0, 1.0, 0.0 ], [ -sin, 0.0, cos ] ] )
+
+	return numpy.array( [ [ cos, -sin, 0.0 ], [ sin, cos, 0.0 ], [ 0.0, 0.0, 1.0 ] ] )
+
+
+def _euler_to_matrix( rotation, order = 'xyz' ):
+	"""
+	Build a 3x3 rotation matrix from euler angles, column vector convention
+
+	*Arguments:*
+		* ``rotation`` X, Y, Z angles in degrees
+
+	*Keyword Arguments:*
+		* ``order`` Order the axis rotations are applied in
+
+	*Returns:*
+		* ``matrix`` 3x3 numpy array
+	"""
+
+	angles = { 'x' : rotation[ 0 ], 'y' : rotation[ 1 ], 'z' : rotation[ 2 ] }
+	matrix = numpy.identity( 3 )
+	for axis in order:
+		matrix = numpy.dot( _axis_rotation( axis, angles[ axis ] ), matrix )
+
+	return matrix
+
+
+def _quaternion_to_matrix( quat ):
+	"""
+	Build a 3x3 rotation matrix from a quaternion, column vector convention
+
+	*Arguments:*
+		* ``quat`` x, y, z, w quaternion values
+
+	*Returns:*
+		* ``matrix`` 3x3 numpy array
+	"""
+
+	x, y, z, w = [ float( value ) for value in quat ]
+	length = math.sqrt( x * x + y * y + z * z + w * w )
+	if length:
+		x, y, z, w = x / length, y / length, z / length, w / length
+
+	return numpy.array( [ [ 1.0 - 2.0 * ( y * y + z * z ), 2.0 * ( x * y - z * w ), 2.0 * ( x * z + y * w ) ],
+	                      [ 2.0 * ( x * y + z * w ), 1.0 - 2.0 * ( x * x + z * z ), 2.0 * ( y * z - x * w ) ],
+	                      [ 2.0 * ( x * z - y * w ), 2.0 * ( y * z + x * w ), 1.0 - 2.0 * ( x * x + y * y ) ] ] )
+
+
+def _matrix_to_quaternion( matrix ):
+	"""
+	Get the quaternion of a 3x3 rotation matrix, column vector convention
+
+	*Arguments:*
+		* ``matrix`` 3x3 numpy array
+
+	*Returns:*
+		* ``quat`` FbxQuaternion
+	"""
+
+	m = matrix
+	trace = m[ 0, 0 ] + m[ 1, 1 ] + m[ 2, 2 ]
+	if trace > 0.0:
+		s = math.sqrt( trace + 1.0 ) * 2.0
+		return FbxQuaternion( ( m[ 2, 1 ] - m[ 1, 2 ] ) / s, ( m[ 0, 2 ] - m[ 2, 0 ] ) / s, ( m[ 1, 0 ] - m[ 0, 1 ] ) / s, 0.25 * s )
+	elif m[ 0, 0 ] > m[ 1, 1 ] and m[ 0, 0 ] > m[ 2, 2 ]:
+		s = math.sqrt( 1.0 + m[ 0, 0 ] - m[ 1, 1 ] - m[ 2, 2 ] ) * 2.0
+		return FbxQuaternion( 0.25 * s, ( m[ 0, 1 ] + m[ 1, 0 ] ) / s, ( m[ 0, 2 ] + m[ 2, 0 ] ) / s, ( m[ 2, 1 ] - m[ 1, 2 ] ) / s )
+	elif m[ 1, 1 ] > m[ 2, 2 ]:
+		s = math.sqrt( 1.0 + m[ 1, 1 ] - m[ 0, 0 ] - m[ 2, 2 ] ) * 2.0
+		return FbxQuaternion( ( m[ 0, 1 ] + m[ 1, 0 ] ) / s, 0.25 * s, ( m[ 1, 2 ] + m[ 2, 1 ] ) / s, ( m[ 0, 2 ] - m[ 2, 0 ] ) / s )
+
+	s = math.sqrt( 1.0 + m[ 2, 2 ] - m[ 0, 0 ] - m[ 1, 1 ] ) * 2.0
+	return FbxQuaternion( ( m[ 0, 2 ] + m[ 2, 0 ] ) / s, ( m[ 1, 2 ] + m[ 2, 1 ] ) / s, 0.25 * s, ( m[ 1, 0 ] - m[ 0, 1 ] ) / s )
+
+
+def _compose( translation, rotation, scale ):
+	"""
+	Build a 4x4 transform from translation, 3x3 rotation and scale, column vector convention
+
+	*Arguments:*
+		* ``translation`` X, Y, Z translation
+		* ``rotation`` 3x3 rotation matrix
+		* ``scale`` X, Y, Z scale
+
+	*Returns:*
+		* ``matrix`` 4x4 numpy array
+	"""
+
+	matrix = numpy.identity( 4 )
+	matrix[ : 3, : 3 ] = rotation * numpy.array( [ float( value ) for value in scale[ : 3 ] ] )
+	matrix[ : 3, 3 ] = [ float( value ) for value in translation[ : 3 ] ]
+	return matrix
+
+
+def _decompose( matrix ):
+	"""
+	Break a 4x4 transform down into translation, rotation and scale, column vector convention.
+	A negative determinant is returned as a negative scale.
+
+	*Arguments:*
+		* ``matrix`` 4x4 numpy array
+
+	*Returns:*
+		* ``translation`` X, Y, Z translation
+		* ``rotation`` 3x3 rotation matrix
+		* ``scale`` X, Y, Z scale
+	"""
+
+	upper = matrix[ : 3, : 3 ]
+	scale = numpy.sqrt( ( upper * upper ).sum( axis = 0 ) )
+	if numpy.linalg.det( upper ) < 0.0:
+		scale = -scale
+
+	safe_scale = numpy.where( scale == 0.0, 1.0, scale )
+	rotation = upper / safe_scale
+
+	return matrix[ : 3, 3 ].copy( ), rotation, scale
+
+
+
+class FbxAMatrix( object ):
+	"""
+	Affine 4x4 matrix, FbxCommon.FbxAMatrix
+
+	The values are stored the same way as the SDK, each row of the storage holds an
+	axis and the translation is in row 3.  The math matrix is the transpose of the storage.
+
+	*Arguments:*
+		* ``other`` Optional matrix to copy, or translation, rotation, scale vectors
+	"""
+
+	__slots__ = ( 'data', )
+
+	def __init__( self, *args ):
+		if len( args ) == 1 and isinstance( args[ 0 ], FbxAMatrix ):
+			self.data = args[ 0 ].data.copy( )
+		elif len( args ) == 3:
+			self.data = numpy.identity( 4 )
+			self.SetTRS( *args )
+		else:
+			self.data = numpy.identity( 4 )
+
+
+	@classmethod
+	def _from_math( cls, matrix ):
+		"""
+		Build a matrix from a column vector convention numpy array
+		"""
+
+		result = cls( )
+		result.data = numpy.array( matrix, dtype = numpy.float64 ).T.copy( )
+		return result
+
+
+	def _math( self ):
+		"""
+		Get the column vector convention numpy array for this matrix
+		"""
+
+		return self.data.T
+
+
+	def SetIdentity( self ):
+		self.data = numpy.identity( 4 )
+
+
+	def GetRow( self, index ):
+		return FbxVector4( self.data[ index ] )
+
+
+	def GetColumn( self, index ):
+		return FbxVector4( self.data[ :, index ] )
+
+
+	def SetRow( self, index, vector ):
+		self.data[ index ] = [ float( value ) for value in vector ]
+
+
+	def SetColumn( self, index, vector ):
+		self.data[ :, index ] = [ float( value ) for value in vector ]
+
+
+	def __getitem__( self, index ):
+		return FbxVector4( self.data[ index ] )
+
+
+	def __mul__( self, other ):
+		result = self.__class__( )
+		result.data = numpy.dot( other.data, self.data )
+		return result
+
+
+	def __eq__( self, other ):
+		return isinstance( other, FbxAMatrix ) and numpy.array_equal( self.data, other.data )
+
+
+	def __ne__( self, other ):
+		return not self.__eq__( other )
+
+
+	def Inverse( self ):
+		result = self.__class__( )
+		result.data = numpy.linalg.inv( self.data )
+		return result
+
+
+	def Transpose( self ):
+		result = self.__class__( )
+		result.data = self.data.T.copy( )
+		return result
+
+
+	def GetT( self ):
+		return FbxVector4( self.data[ 3 ] )
+
+
+	def GetQ( self ):
+		translation, rotation, scale = _decompose( self._math( ) )
+		return _matrix_to_quaternion( rotation )
+
+
+	def GetS( self ):
+		translation, rotation, scale = _decompose( self._math( ) )
+		return FbxVector4( scale[ 0 ], scale[ 1 ], scale[ 2 ], 0.0 )
+
+
+	def SetT( self, translation ):
+		self.data[ 3, : 3 ] = [ float( value ) for value in list( translation )[ : 3 ] ]
+
+
+	def SetTRS( self, translation, rotation, scale ):
+		self.data = _compose( list( translation ), _euler_to_matrix( list( rotation ) ), list( scale ) ).T.copy( )
+
+
+	def SetTQS( self, translation, quat, scale ):
+		self.data = _compose( list( translation ), _quaternion_to_matrix( quat ), list( scale ) ).T.copy( )
+
+
+	def GetElements( self, translation, quat, shear, scale ):
+		"""
+		Break down the matrix into its translation, rotation, shearing and scaling.
+		The vectors passed in are filled out the same way as the SDK.
+
+		*Returns:*
+			* ``sign`` Sign of the determinant
+		"""
+
+		values, rotation, scales = _decompose( self._math( ) )
+		translation.Set( values[ 0 ], values[ 1 ], values[ 2 ], 1.0 )
+		quat.Set( *_matrix_to_quaternion( rotation ) )
+		shear.Set( 0.0, 0.0, 0.0, 0.0 )
+		scale.Set( scales[ 0 ], scales[ 1 ], scales[ 2 ], 0.0 )
+
+		return -1.0 if scales[ 0 ] < 0.0 else 1.0
+
+
+	def MultT( self, vector ):
+		values = numpy.dot( self._math( ), [ float( value ) for value in vector ] )
+		return FbxVector4( values )
+
+
+	def __repr__( self ):
+		return '{0}( {1} )'.format( self.__class__.__name__, self.data.tolist( ) )
+
+
+
+class FbxMatrix( FbxAMatrix ):
+	"""
+	Generic 4x4 matrix, FbxCommon.FbxMatrix
+	"""
+
+	__slots__ = ( )
+
+
+
+#---------------------------------------------------------------------------
+# Enums and Settings
+#---------------------------------------------------------------------------
+
+class FbxPropertyAttr( object ):
+	"""
+	Property flags, FbxCommon.FbxPropertyAttr
+	"""
+
+	eNone = 0
+	eStatic = 1 << 0
+	eAnimatable = 1 << 1
+	eAnimated = 1 << 2
+	eImported = 1 << 3
+	eUserDefined = 1 << 4
+	eHidden = 1 << 5
+	eNotSavable = 1 << 6
+
+
+
+class FbxLayerElement( object ):
+	"""
+	Layer element mapping/reference modes and texture channels, FbxCommon.FbxLayerElement
+	"""
+
+	eNone, eByControlPoint, eByPolygonVertex, eByPolygon, eByEdge, eAllSame = range( 6 )
+	eDirect, eIndex, eIndexToDirect = range( 3 )
+
+	TEXTURE_CHANNEL_NAMES = ( 'DiffuseColor', 'DiffuseFactor', 'EmissiveColor', 'EmissiveFactor',
+	                          'AmbientColor', 'AmbientFactor', 'SpecularColor', 'SpecularFactor',
+	                          'ShininessExponent', 'NormalMap', 'Bump', 'TransparentColor',
+	                          'TransparencyFactor', 'ReflectionColor', 'ReflectionFactor',
+	                          'DisplacementColor', 'VectorDisplacementColor' )
+
+	MAPPING_MODES = { 'NoMappingInformation' : eNone,
+	                  'ByVertice'            : eByControlPoint,
+	                  'ByVertex'             : eByControlPoint,
+	                  'ByControlPoint'       : eByControlPoint,
+	                  'ByPolygonVertex'      : eByPolygonVertex,
+	                  'ByPolygon'            : eByPolygon,
+	                  'ByEdge'               : eByEdge,
+	                  'AllSame'              : eAllSame }
+
+	REFERENCE_MODES = { 'Direct'        : eDirect,
+	                    'Index'         : eIndex,
+	                    'IndexToDirect' : eIndexToDirect }
+
+	@staticmethod
+	def sTypeTextureCount( ):
+		return len( FbxLayerElement.TEXTURE_CHANNEL_NAMES )
+
+
+	@staticmethod
+	def sTextureChannelNames( index ):
+		return FbxLayerElement.TEXTURE_CHANNEL_NAMES[ index ]
+
+
+
+class FbxDeformer( object ):
+	"""
+	Deformer types, FbxCommon.FbxDeformer
+	"""
+
+	eUnknown, eSkin, eBlendShape, eVertexCache = range( 4 )
+
+
+
+class FbxSystemUnit( object ):
+	"""
+	Scene units as a scale factor to centimeters, FbxCommon.FbxSystemUnit
+
+	*Arguments:*
+		* ``scale_factor`` Number of centimeters in one unit
+	"""
+
+	def __init__( self, scale_factor = 1.0 ):
+		self._scale_factor = float( scale_factor )
+
+
+	def GetScaleFactor( self ):
+		return self._scale_factor
+
+
+	def __eq__( self, other ):
+		return isinstance( other, FbxSystemUnit ) and self._scale_factor == other._scale_factor
+
+
+	def __ne__( self, other ):
+		return not self.__eq__( other )
+
+FbxSystemUnit.cm = FbxSystemUnit( 1.0 )
+FbxSystemUnit.m = FbxSystemUnit( 100.0 )
+FbxSystemUnit.Inch = FbxSystemUnit( 2.54 )
+
+
+
+class FbxAxisSystem( object ):
+	"""
+	Scene up/front/coordinate axis, FbxCommon.FbxAxisSystem
+
+	*Arguments:*
+		* ``up_vector`` Signed up axis, eXAxis, eYAxis, eZAxis
+		* ``front_vector`` Signed front parity, eParityEven, eParityOdd
+		* ``coord_system`` eRightHanded or eLeftHanded
+	"""
+
+	eXAxis, eYAxis, eZAxis = 1, 2, 3
+	eParityEven, eParityOdd = 1, 2
+	eRightHanded, eLeftHanded = 0, 1
+
+	def __init__( self, up_vector = 2, front_vector = 2, coord_system = 0 ):
+		self._up = up_vector
+		self._front = front_vector
+		self._coord = coord_system
+
+
+	@classmethod
+	def _from_settings( cls, up_axis, up_sign, front_axis, front_sign, coord_axis, coord_sign ):
+		"""
+		Build the axis system from the GlobalSettings values stored in the file
+		"""
+
+		remaining = [ axis for axis in range( 3 ) if axis != up_axis ]
+		parity = cls.eParityEven if front_axis == remaining[ 0 ] else cls.eParityOdd
+
+		up = numpy.zeros( 3 )
+		up[ up_axis ] = up_sign
+		front = numpy.zeros( 3 )
+		front[ front_axis ] = front_sign
+		coord = numpy.zeros( 3 )
+		coord[ coord_axis ] = coord_sign
+
+		handedness = cls.eRightHanded if numpy.dot( numpy.cross( up, front ), coord ) > 0.0 else cls.eLeftHanded
+
+		return cls( ( up_axis + 1 ) * up_sign, parity * front_sign, handedness )
+
+
+	def _basis( self ):
+		"""
+		Get the right, up and front axis as the columns of a 3x3 matrix
+		"""
+
+		up_axis = abs( self._up ) - 1
+		remaining = [ axis for axis in range( 3 ) if axis != up_axis ]
+		front_axis = remaining[ 0 ] if abs( self._front ) == self.eParityEven else remaining[ 1 ]
+
+		up = numpy.zeros( 3 )
+		up[ up_axis ] = 1.0 if self._up > 0 else -1.0
+		front = numpy.zeros( 3 )
+		front[ front_axis ] = 1.0 if self._front > 0 else -1.0
+
+		right = numpy.cross( up, front )
+		if self._coord == self.eLeftHanded:
+			right = -right
+
+		return numpy.column_stack( ( right, up, front ) )
+
+
+	def GetUpVector( self ):
+		return abs( self._up ), 1 if self._up > 0 else -1
+
+
+	def GetFrontVector( self ):
+		return abs( self._front ), 1 if self._front > 0 else -1
+
+
+	def GetCoorSystem( self ):
+		return self._coord
+
+
+	def ConvertScene( self, scene ):
+		"""
+		Convert the scene to this axis system, the transforms of the root node children are updated
+
+		*Arguments:*
+			* ``scene`` FbxScene
+		"""
+
+		settings = scene.GetGlobalSettings( )
+		if settings._axis_system == self:
+			return
+
+		conversion = numpy.identity( 4 )
+		conversion[ : 3, : 3 ] = numpy.dot( self._basis( ), numpy.linalg.inv( settings._axis_system._basis( ) ) )
+		if scene._conversion is not None:
+			conversion = numpy.dot( conversion, scene._conversion )
+
+		scene._conversion = conversion
+		settings._axis_system = FbxAxisSystem( self._up, self._front, self._coord )
+
+
+	def __eq__( self, other ):
+		if not isinstance( other, FbxAxisSystem ):
+			return False
+
+		return ( self._up, self._front, self._coord ) == ( other._up, other._front, other._coord )
+
+
+	def __ne__( self, other ):
+		return not self.__eq__( other )
+
+FbxAxisSystem.Max = FbxAxisSystem( FbxAxisSystem.eZAxis, -FbxAxisSystem.eParityOdd, FbxAxisSystem.eRightHanded )
+FbxAxisSystem.MayaYUp = FbxAxisSystem( FbxAxisSystem.eYAxis, FbxAxisSystem.eParityOdd, FbxAxisSystem.eRightHanded )
+FbxAxisSystem.MayaZUp = FbxAxisSystem( FbxAxisSystem.eZAxis, -FbxAxisSystem.eParityOdd, FbxAxisSystem.eRightHanded )
+
+
+
+class FbxGlobalSettings( object ):
+	"""
+	Scene axis system and units, FbxCommon.FbxGlobalSettings
+	"""
+
+	def __init__( self ):
+		self._axis_system = FbxAxisSystem( FbxAxisSystem.eYAxis, FbxAxisSystem.eParityOdd, FbxAxisSystem.eRightHanded )
+		self._system_unit = FbxSystemUnit( 1.0 )
+
+
+	def GetAxisSystem( self ):
+		return FbxAxisSystem( self._axis_system._up, self._axis_system._front, self._axis_system._coord )
+
+
+	def GetSystemUnit( self ):
+		return FbxSystemUnit( self._system_unit.GetScaleFactor( ) )
+
+
+
+#---------------------------------------------------------------------------
+# Properties
+#---------------------------------------------------------------------------
+
+class FbxDataType( object ):
+	"""
+	Property data type, FbxCommon.FbxDataType
+	"""
+
+	__slots__ = ( '_type', '_name' )
+
+	def __init__( self, data_type, name ):
+		self._type = data_type
+		self._name = name
+
+
+	def GetType( self ):
+		return self._type
+
+
+	def GetName( self ):
+		return self._name
+
+
+
+class Fbx_Property_Record( object ):
+	"""
+	Stored values for a single Properties70 entry
+
+	*Arguments:*
+		* ``name`` Property name
+		* ``type_name`` Property type name from the file
+		* ``flags`` FbxPropertyAttr flags
+		* ``value`` Property value
+	"""
+
+	__slots__ = ( 'name', 'type_name', 'flags', 'value' )
+
+	def __init__( self, name, type_name, flags, value ):
+		self.name = name
+		self.type_name = type_name
+		self.flags = flags
+		self.value = value
+
+
+	@classmethod
+	def from_element( cls, element ):
+		"""
+		Build a record from a "P" element
+		"""
+
+		props = element.props
+		name = props[ 0 ]
+		type_name = props[ 1 ]
+		flag_string = props[ 3 ] if len( props ) > 3 else ''
+		values = props[ 4 : ]
+
+		flags = FbxPropertyAttr.eNone
+		if 'U' in flag_string:
+			flags |= FbxPropertyAttr.eUserDefined
+		if 'A' in flag_string:
+			flags |= FbxPropertyAttr.eAnimatable
+		if 'H' in flag_string:
+			flags |= FbxPropertyAttr.eHidden
+
+		data_type = PROPERTY_DATA_TYPES.get( type_name, eFbxUndefined )
+		if data_type in ( eFbxDouble2, eFbxDouble3, eFbxDouble4 ):
+			value = tuple( float( value ) for value in values )
+		elif not values:
+			value = None
+		elif data_type == eFbxBool:
+			value = bool( values[ 0 ] )
+		elif data_type in ( eFbxInt, eFbxShort, eFbxEnum ):
+			value = int( values[ 0 ] )
+		elif data_type in ( eFbxFloat, eFbxDouble ):
+			value = float( values[ 0 ] )
+		else:
+			value = values[ 0 ]
+
+		return cls( name, type_name, flags, value )
+
+
+
+class FbxProperty( object ):
+	"""
+	A property on an object, FbxCommon.FbxProperty
+
+	*Arguments:*
+		* ``owner`` FbxObject the property belongs to
+		* ``index`` Index of the property on the owner, -1 for an invalid property
+	"""
+
+	__slots__ = ( '_owner', '_index' )
+
+	def __init__( self, owner, index ):
+		self._owner = owner
+		self._index = index
+
+
+	def _record( self ):
+		return self._owner._properties[ self._index ]
+
+
+	def IsValid( self ):
+		return 0 <= self._index < len( self._owner._properties )
+
+
+	def GetName( self ):
+		if not self.IsValid( ):
+			return ''
+		return self._record( ).name
+
+
+	def GetFlag( self, flag ):
+		return bool( self._record( ).flags & flag )
+
+
+	def GetPropertyDataType( self ):
+		record = self._record( )
+		return FbxDataType( PROPERTY_DATA_TYPES.get( record.type_name, eFbxUndefined ), record.type_name )
+
+
+	def Get( self ):
+		return self._record( ).value
+
+
+	def _sources( self, class_id = None ):
+		sources = self._owner._property_sources.get( self.GetName( ), [ ] )
+		if class_id is None:
+			return sources
+		return [ source for source in sources if isinstance( source, class_id ) ]
+
+
+	def GetSrcObjectCount( self, class_id = None ):
+		return len( self._sources( class_id ) )
+
+
+	def GetSrcObject( self, class_id = None, index = 0 ):
+		sources = self._sources( class_id )
+		if index < len( sources ):
+			return sources[ index ]
+		return None
+
+
+
+#---------------------------------------------------------------------------
+# Scene Objects
+#---------------------------------------------------------------------------
+
+class FbxObject( object ):
+	"""
+	Base for every object in the scene, FbxCommon.FbxObject
+
+	*Arguments:*
+		* ``scene`` FbxScene the object belongs to
+		* ``object_id`` Unique id from the file
+		* ``name`` Object name
+		* ``element`` FbxReader.Fbx_Element the object was read from
+	"""
+
+	def __init__( self, scene, object_id, name, element = None ):
+		self._scene = scene
+		self._id = object_id
+		self._name = name
+		self._element = element
+		self._properties = [ ]
+		self._property_lookup = { }
+		self._property_sources = { }
+		self._sources = [ ]
+		self._destinations = [ ]
+
+
+	def _set_properties( self, template, element ):
+		"""
+		Merge the class template properties with the properties stored on the object
+		"""
+
+		records = list( template ) if template else [ ]
+		lookup = dict( ( record.name, index ) for index, record in enumerate( records ) )
+
+		properties = element.find( 'Properties70' ) if element is not None else None
+		if properties is not None:
+			for property_element in properties.elems:
+				record = Fbx_Property_Record.from_element( property_element )
+				index = lookup.get( record.name )
+				if index is None:
+					lookup[ record.name ] = len( records )
+					records.append( record )
+				else:
+					records[ index ] = record
+
+		self._properties = records
+		self._property_lookup = lookup
+
+
+	def _get_property_value( self, name, default = None ):
+		index = self._property_lookup.get( name )
+		if index is None:
+			return default
+
+		value = self._properties[ index ].value
+		if value is None:
+			return default
+
+		return value
+
+
+	def GetName( self ):
+		return self._name
+
+
+	def GetUniqueID( self ):
+		return self._id
+
+
+	def GetFirstProperty( self ):
+		return FbxProperty( self, 0 )
+
+
+	def GetNextProperty( self, fbx_property ):
+		return FbxProperty( self, fbx_property._index + 1 )
+
+
+	def FindProperty( self, name ):
+		index = self._property_lookup.get( name )
+		if index is None:
+			return FbxProperty( self, -1 )
+
+		return FbxProperty( self, index )
+
+
+	def _get_sources( self, class_id ):
+		return [ source for source in self._sources if isinstance( source, class_id ) ]
+
+
+	def _get_destinations( self, class_id ):
+		return [ destination for destination in self._destinations if isinstance( destination, class_id ) ]
+
+
+	def __repr__( self ):
+		return '{0}( {1} )'.format( self.__class__.__name__, self._name )
+
+
+
+class FbxNodeAttribute( FbxObject ):
+	"""
+	Data attached to a node, FbxCommon.FbxNodeAttribute
+	"""
+
+	( eUnknown, eNull, eMarker, eSkeleton, eMesh, eNurbs, ePatch, eCamera, eCameraStereo,
+	  eCameraSwitcher, eLight, eOpticalReference, eOpticalMarker, eNurbsCurve,
+	  eTrimNurbsSurface, eBoundary, eNurbsSurface, eShape, eLODGroup, eSubDiv,
+	  eCachedEffect, eLine ) = range( 22 )
+
+	ATTRIBUTE_TYPES = { 'Null'       : eNull,
+	                    'Marker'     : eMarker,
+	                    'LimbNode'   : eSkeleton,
+	                    'Limb'       : eSkeleton,
+	                    'Root'       : eSkeleton,
+	                    'Mesh'       : eMesh,
+	                    'Camera'     : eCamera,
+	                    'Light'      : eLight,
+	                    'NurbsCurve' : eNurbsCurve,
+	                    'Line'       : eLine,
+	                    'Shape'      : eShape }
+
+	def __init__( self, scene, object_id, name, element = None, sub_type = '' ):
+		FbxObject.__init__( self, scene, object_id, name, element )
+		self._attribute_type = self.ATTRIBUTE_TYPES.get( sub_type, self.eUnknown )
+
+
+	def GetAttributeType( self ):
+		return self._attribute_type
+
+
+	def GetNode( self ):
+		nodes = self._get_destinations( FbxNode )
+		if nodes:
+			return nodes[ 0 ]
+		return None
+
+
+
+class FbxNull( FbxNodeAttribute ):
+	"""
+	Null/group node attribute, FbxCommon.FbxNull
+	"""
+	pass
+
+
+
+class FbxSkeleton( FbxNodeAttribute ):
+	"""
+	Skeleton/bone node attribute, FbxCommon.FbxSkeleton
+	"""
+	pass
+
+
+
+class FbxNode( FbxObject ):
+	"""
+	Scene node, FbxCommon.FbxNode
+	"""
+
+	eSourcePivot, eDestinationPivot = range( 2 )
+
+	def __init__( self, scene, object_id, name, element = None ):
+		FbxObject.__init__( self, scene, object_id, name, element )
+		self._parent = None
+		self._children = [ ]
+		self._attribute = None
+		self._materials = [ ]
+
+
+	def GetParent( self ):
+		return self._parent
+
+
+	def GetChildCount( self ):
+		return len( self._children )
+
+
+	def GetChild( self, index ):
+		return self._children[ index ]
+
+
+	def GetNodeAttribute( self ):
+		return self._attribute
+
+
+	def GetMesh( self ):
+		if isinstance( self._attribute, FbxMesh ):
+			return self._attribute
+		return None
+
+
+	def GetMaterialCount( self ):
+		return len( self._materials )
+
+
+	def GetMaterial( self, index ):
+		return self._materials[ index ]
+
+
+	def _get_vector( self, name, default ):
+		value = self._get_property_value( name, default )
+		return [ float( component ) for component in value[ : 3 ] ]
+
+
+	def GetGeometricTranslation( self, pivot_set = 0 ):
+		return FbxVector4( self._get_vector( 'GeometricTranslation', ( 0.0, 0.0, 0.0 ) ) )
+
+
+	def GetGeometricRotation( self, pivot_set = 0 ):
+		return FbxVector4( self._get_vector( 'GeometricRotation', ( 0.0, 0.0, 0.0 ) ) )
+
+
+	def GetGeometricScaling( self, pivot_set = 0 ):
+		return FbxVector4( self._get_vector( 'GeometricScaling', ( 1.0, 1.0, 1.0 ) ) )
+
+
+	def _local_matrix( self ):
+		"""
+		Build the local transform, column vector convention
+		T * Roff * Rp * Rpre * R * Rpost^-1 * Rp^-1 * Soff * Sp * S * Sp^-1
+		"""
+
+		def translate( values ):
+			matrix = numpy.identity( 4 )
+			matrix[ : 3, 3 ] = values
+			return matrix
+
+		def rotate( values, order = 'xyz' ):
+			matrix = numpy.identity( 4 )
+			matrix[ : 3, : 3 ] = _euler_to_matrix( values, order )
+			return matrix
+
+		zero = ( 0.0, 0.0, 0.0 )
+		rotation_order = ROTATION_ORDERS.get( int( self._get_property_value( 'RotationOrder', 0 ) ), 'xyz' )
+		rotation_active = bool( self._get_property_value( 'RotationActive', False ) )
+
+		rotation_pivot = self._get_vector( 'RotationPivot', zero )
+		scaling_pivot = self._get_vector( 'ScalingPivot', zero )
+
+		scaling = numpy.identity( 4 )
+		scaling[ : 3, : 3 ] = numpy.diag( self._get_vector( 'Lcl Scaling', ( 1.0, 1.0, 1.0 ) ) )
+
+		pre_rotation = numpy.identity( 4 )
+		post_rotation = numpy.identity( 4 )
+		if rotation_active:
+			pre_rotation = rotate( self._get_vector( 'PreRotation', zero ) )
+			post_rotation = rotate( self._get_vector( 'PostRotation', zero ) )
+
+		matrices = [ translate( self._get_vector( 'Lcl Translation', zero ) ),
+		             translate( self._get_vector( 'RotationOffset', zero ) ),
+		             translate( rotation_pivot ),
+		             pre_rotation,
+		             rotate( self._get_vector( 'Lcl Rotation', zero ), rotation_order ),
+		             numpy.linalg.inv( post_rotation ),
+		             translate( [ -value for value in rotation_pivot ] ),
+		             translate( self._get_vector( 'ScalingOffset', zero ) ),
+		             translate( scaling_pivot ),
+		             scaling,
+		             translate( [ -value for value in scaling_pivot ] ) ]
+
+		local = numpy.identity( 4 )
+		for matrix in matrices:
+			local = numpy.dot( local, matrix )
+
+		# the axis conversion is applied to the nodes directly under the root
+		if self._parent is not None and self._parent._parent is None and self._scene._conversion is not None:
+			local = numpy.dot( self._scene._conversion, local )
+
+		return local
+
+
+	def _global_matrix( self ):
+		if self._parent is None:
+			return numpy.identity( 4 )
+
+		return numpy.dot( self._parent._global_matrix( ), self._local_matrix( ) )
+
+
+	def EvaluateLocalTransform( self, *args ):
+		if self._parent is None:
+			return FbxAMatrix( )
+
+		return FbxAMatrix._from_math( self._local_matrix( ) )
+
+
+	def EvaluateGlobalTransform( self, *args ):
+		return FbxAMatrix._from_math( self._global_matrix( ) )
+
+
+
+class FbxSurfaceMaterial( FbxObject ):
+	"""
+	Material, FbxCommon.FbxSurfaceMaterial
+	"""
+	pass
+
+
+
+class FbxTexture( FbxObject ):
+	"""
+	Texture, FbxCommon.FbxTexture
+	"""
+	pass
+
+FbxTexture.ClassId = FbxTexture
+
+
+
+class FbxFileTexture( FbxTexture ):
+	"""
+	Texture that references a file on disk, FbxCommon.FbxFileTexture
+	"""
+
+	def __init__( self, scene, object_id, name, element = None ):
+		FbxTexture.__init__( self, scene, object_id, name, element )
+
+		filename = element.get_value( 'FileName', '' ) if element is not None else ''
+		relative_filename = element.get_value( 'RelativeFilename', '' ) if element is not None else ''
+
+		# the same as the SDK, fall back to the path relative to the fbx file when the absolute path is missing
+		if relative_filename and ( not filename or not os.path.lexists( filename ) ):
+			relative_path = os.path.normpath( os.path.join( os.path.dirname( scene._filename ), relative_filename.replace( '\\', os.sep ) ) )
+			if os.path.lexists( relative_path ) or not filename:
+				filename = relative_path
+
+		self._filename = filename
+		self._relative_filename = relative_filename
+
+
+	def GetFileName( self ):
+		return self._filename
+
+
+	def GetRelativeFileName( self ):
+		return self._relative_filename
+
+
+
+#---------------------------------------------------------------------------
+# Geometry
+#---------------------------------------------------------------------------
+
+class FbxLayerElementArray( object ):
+	"""
+	Direct or index array of a layer element, FbxCommon.FbxLayerElementArray
+
+	*Arguments:*
+		* ``array`` numpy array of the values, rows are vectors
+		* ``item_type`` Class used to return a single item, FbxVector4, FbxVector2 or int
+	"""
+
+	def __init__( self, array, item_type ):
+		self.array = array
+		self._item_type = item_type
+
+
+	def GetCount( self ):
+		return len( self.array )
+
+
+	def GetAt( self, index ):
+		if self._item_type is int:
+			return int( self.array[ index ] )
+		return self._item_type( *self.array[ index ] )
+
+
+	def GetValuesArray( self ):
+		"""
+		Built-in reader only, the values as a numpy array
+		"""
+
+		return self.array
+
+
+	def __len__( self ):
+		return len( self.array )
+
+
+
+class FbxLayerElementTemplate( object ):
+	"""
+	Normals, UVs or material ids of a layer, FbxCommon.FbxLayerElement
+
+	*Arguments:*
+		* ``name`` Element name
+		* ``mapping_mode`` FbxLayerElement mapping mode
+		* ``reference_mode`` FbxLayerElement reference mode
+		* ``direct_array`` FbxLayerElementArray of values or None
+		* ``index_array`` FbxLayerElementArray of indices or None
+	"""
+
+	def __init__( self, name, mapping_mode, reference_mode, direct_array = None, index_array = None ):
+		self._name = name
+		self._mapping_mode = mapping_mode
+		self._reference_mode = reference_mode
+		self._direct_array = direct_array
+		self._index_array = index_array
+
+
+	def GetName( self ):
+		return self._name
+
+
+	def GetMappingMode( self ):
+		return self._mapping_mode
+
+
+	def GetReferenceMode( self ):
+		return self._reference_mode
+
+
+	def GetDirectArray( self ):
+		return self._direct_array
+
+
+	def GetIndexArray( self ):
+		return self._index_array
+
+
+	def _remap( self, polygon_vertex_map, polygon_map ):
+		"""
+		Update the element after the polygons of the mesh were rebuilt
+
+		*Arguments:*
+			* ``polygon_vertex_map`` Old polygon vertex index for every new polygon vertex
+			* ``polygon_map`` Old polygon index for every new polygon
+		"""
+
+		if self._mapping_mode == FbxLayerElement.eByPolygonVertex:
+			index_map = polygon_vertex_map
+		elif self._mapping_mode == FbxLayerElement.eByPolygon:
+			index_map = polygon_map
+		else:
+			return
+
+		if self._reference_mode == FbxLayerElement.eDirect:
+			self._direct_array.array = self._direct_array.array[ index_map ]
+		else:
+			self._index_array.array = self._index_array.array[ index_map ]
+
+
+	def _value_index( self, mesh, polygon_index, vertex_index ):
+		"""
+		Get the direct array index for a polygon vertex
+		"""
+
+		if self._mapping_mode == FbxLayerElement.eByControlPoint:
+			index = mesh.GetPolygonVertex( polygon_index, vertex_index )
+		elif self._mapping_mode == FbxLayerElement.eByPolygonVertex:
+			index = mesh._polygon_starts[ polygon_index ] + vertex_index
+		elif self._mapping_mode == FbxLayerElement.eByPolygon:
+			index = polygon_index
+		else:
+			index = 0
+
+		if self._reference_mode != FbxLayerElement.eDirect:
+			index = self._index_array.array[ index ]
+
+		return index
+
+
+
+class FbxLayer( object ):
+	"""
+	A layer of mesh elements, FbxCommon.FbxLayer
+	"""
+
+	def __init__( self ):
+		self._normals = None
+		self._uvs = [ ]
+		self._materials = None
+
+
+	def GetNormals( self ):
+		return self._normals
+
+
+	def GetUVs( self ):
+		if self._uvs:
+			return self._uvs[ 0 ]
+		return None
+
+
+	def GetUVSets( self ):
+		return list( self._uvs )
+
+
+	def GetMaterials( self ):
+		return self._materials
+
+
+	def _elements( self ):
+		elements = [ self._normals, self._materials ] + self._uvs
+		return [ element for element in elements if element is not None ]
+
+
+
+class FbxGeometry( FbxNodeAttribute ):
+	"""
+	Base for the meshes and shapes with control points and deformers, FbxCommon.FbxGeometry
+	"""
+
+	def __init__( self, scene, object_id, name, element = None, sub_type = '' ):
+		FbxNodeAttribute.__init__( self, scene, object_id, name, element, sub_type )
+		self._control_points = numpy.zeros( ( 0, 4 ) )
+		self._layers = [ ]
+
+
+	def _read_control_points( self, array ):
+		points = numpy.asarray( array, dtype = numpy.float64 ).reshape( -1, 3 )
+		self._control_points = numpy.hstack( ( points, numpy.ones( ( len( points ), 1 ) ) ) )
+
+
+	def GetControlPointsCount( self ):
+		return len( self._control_points )
+
+
+	def GetControlPoints( self ):
+		return [ FbxVector4( *point ) for point in self._control_points.tolist( ) ]
+
+
+	def GetControlPointAt( self, index ):
+		return FbxVector4( *self._control_points[ index ] )
+
+
+	def GetControlPointsArray( self ):
+		"""
+		Built-in reader only, the control points as an ( N, 4 ) float64 array
+		"""
+
+		return self._control_points
+
+
+	def GetLayerCount( self ):
+		return len( self._layers )
+
+
+	def GetLayer( self, index ):
+		if index < len( self._layers ):
+			return self._layers[ index ]
+		return None
+
+
+	def _deformers( self, deformer_type = None ):
+		deformers = self._get_sources( FbxDeformerBase )
+		if deformer_type is None:
+			return deformers
+		return [ deformer for deformer in deformers if deformer.GetDeformerType( ) == deformer_type ]
+
+
+	def GetDeformerCount( self, deformer_type = None ):
+		return len( self._deformers( deformer_type ) )
+
+
+	def GetDeformer( self, index, deformer_type = None ):
+		deformers = self._deformers( deformer_type )
+		if index < len( deformers ):
+			return deformers[ index ]
+		return None
+
+
+
+class FbxMesh( FbxGeometry ):
+	"""
+	Polygon mesh, FbxCommon.FbxMesh
+	"""
+
+	def __init__( self, scene, object_id, name, element = None, sub_type = 'Mesh' ):
+		FbxGeometry.__init__( self, scene, object_id, name, element, sub_type )
+		self._polygon_vertices = numpy.zeros( 0, dtype = numpy.int32 )
+		self._polygon_starts = numpy.zeros( 0, dtype = numpy.int64 )
+		self._polygon_sizes = numpy.zeros( 0, dtype = numpy.int64 )
+
+		if element is not None:
+			self._read_mesh( element )
+
+
+	def _read_mesh( self, element ):
+		"""
+		Read the control points, polygons and layer elements from the file
+		"""
+
+		self._read_control_points( element.get_value( 'Vertices', numpy.zeros( 0 ) ) )
+
+		# the last vertex of a polygon is stored as -( index + 1 )
+		polygon_vertex_index = numpy.asarray( element.get_value( 'PolygonVertexIndex', numpy.zeros( 0 ) ), dtype = numpy.int32 )
+		polygon_ends = polygon_vertex_index < 0
+		self._polygon_vertices = numpy.where( polygon_ends, ~polygon_vertex_index, polygon_vertex_index )
+
+		ends = numpy.flatnonzero( polygon_ends )
+		self._polygon_starts = numpy.concatenate( ( [ 0 ], ends[ : -1 ] + 1 ) ).astype( numpy.int64 ) if len( ends ) else numpy.zeros( 0, dtype = numpy.int64 )
+		self._polygon_sizes = ends + 1 - self._polygon_starts
+
+		elements = { }
+		for child in element.elems:
+			layer_element = None
+			if child.name == 'LayerElementNormal':
+				layer_element = self._read_layer_element( child, 'Normals', 'NormalsIndex', 3 )
+				weights = child.get_value( 'NormalsW' )
+				if weights is not None and len( weights ) == len( layer_element._direct_array.array ):
+					layer_element._direct_array.array[ :, 3 ] = weights
+
+			elif child.name == 'LayerElementUV':
+				layer_element = self._read_layer_element( child, 'UV', 'UVIndex', 2 )
+
+			elif child.name == 'LayerElementMaterial':
+				layer_element = self._read_layer_element( child, None, 'Materials', 0 )
+
+				# a single material for the whole mesh is stored per polygon, the same as a triangulated mesh from the SDK
+				if layer_element._mapping_mode == FbxLayerElement.eAllSame:
+					material_id = layer_element._index_array.array[ 0 ] if len( layer_element._index_array.array ) else 0
+					layer_element._mapping_mode = FbxLayerElement.eByPolygon
+					layer_element._index_array.array = numpy.full( len( self._polygon_starts ), material_id, dtype = numpy.int32 )
+
+			if layer_element is not None:
+				elements[ ( child.name, child.props[ 0 ] if child.props else 0 ) ] = layer_element
+
+		for layer_element in element.find_all( 'Layer' ):
+			layer = FbxLayer( )
+			for entry in layer_element.find_all( 'LayerElement' ):
+				key = ( entry.get_value( 'Type' ), entry.get_value( 'TypedIndex', 0 ) )
+				found = elements.get( key )
+				if found is None:
+					continue
+
+				if key[ 0 ] == 'LayerElementNormal':
+					layer._normals = found
+				elif key[ 0 ] == 'LayerElementUV':
+					layer._uvs.append( found )
+				elif key[ 0 ] == 'LayerElementMaterial':
+					layer._materials = found
+
+			self._layers.append( layer )
+
+
+	def _read_layer_element( self, element, direct_name, index_name, width ):
+		"""
+		Build a layer element from a LayerElement record
+
+		*Arguments:*
+			* ``element`` FbxReader.Fbx_Element
+			* ``direct_name`` Name of the direct array record or None
+			* ``index_name`` Name of the index array record
+			* ``width`` Number of values per item in the direct array
+
+		*Returns:*
+			* ``layer_element`` FbxLayerElementTemplate
+		"""
+
+		mapping_mode = FbxLayerElement.MAPPING_MODES.get( element.get_value( 'MappingInformationType', '' ), FbxLayerElement.eNone )
+		reference_mode = FbxLayerElement.REFERENCE_MODES.get( element.get_value( 'ReferenceInformationType', '' ), FbxLayerElement.eDirect )
+
+		direct_array = None
+		if direct_name:
+			values = numpy.asarray( element.get_value( direct_name, numpy.zeros( 0 ) ), dtype = numpy.float64 ).reshape( -1, width )
+			if width == 3:
+				values = numpy.hstack( ( values, numpy.ones( ( len( values ), 1 ) ) ) )
+				direct_array = FbxLayerElementArray( values, FbxVector4 )
+			else:
+				direct_array = FbxLayerElementArray( values, FbxVector2 )
+
+		index_array = None
+		indices = element.get_value( index_name )
+		if indices is not None:
+			index_array = FbxLayerElementArray( numpy.array( indices, dtype = numpy.int32 ), int )
+		elif not direct_name:
+			index_array = FbxLayerElementArray( numpy.zeros( 0, dtype = numpy.int32 ), int )
+
+		if not direct_name:
+			reference_mode = FbxLayerElement.eIndexToDirect
+
+		return FbxLayerElementTemplate( element.get_value( 'Name', '' ), mapping_mode, reference_mode, direct_array, index_array )
+
+
+	def GetPolygonCount( self ):
+		return len( self._polygon_starts )
+
+
+	def GetPolygonSize( self, polygon_index ):
+		if 0 <= polygon_index < len( self._polygon_sizes ):
+			return int( self._polygon_sizes[ polygon_index ] )
+		return -1
+
+
+	def GetPolygonVertexCount( self ):
+		return len( self._polygon_vertices )
+
+
+	def GetPolygonVertices( self ):
+		return self._polygon_vertices.tolist( )
+
+
+	def GetPolygonVertex( self, polygon_index, vertex_index ):
+		if 0 <= polygon_index < len( self._polygon_starts ) and 0 <= vertex_index < self._polygon_sizes[ polygon_index ]:
+			return int( self._polygon_vertices[ self._polygon_starts[ polygon_index ] + vertex_index ] )
+		return -1
+
+
+	def GetPolygonVertexNormal( self, polygon_index, vertex_index, normal ):
+		layer = self.GetLayer( 0 )
+		if layer is None or layer._normals is None or self.GetPolygonVertex( polygon_index, vertex_index ) == -1:
+			return False
+
+		index = layer._normals._value_index( self, polygon_index, vertex_index )
+		normal.Set( *layer._normals._direct_array.array[ index ] )
+		return True
+
+
+	def GetPolygonVertexUV( self, polygon_index, vertex_index, uv_name, uv ):
+		for layer in self._layers:
+			for uv_element in layer._uvs:
+				if uv_element.GetName( ) != uv_name:
+					continue
+
+				if self.GetPolygonVertex( polygon_index, vertex_index ) == -1:
+					return False
+
+				index = uv_element._value_index( self, polygon_index, vertex_index )
+				uv.Set( *uv_element._direct_array.array[ index ] )
+				return True
+
+		return False
+
+
+	def IsTriangleMesh( self ):
+		return bool( numpy.all( self._polygon_sizes == 3 ) )
+
+
+	def _triangulate( self ):
+		"""
+		Split every polygon into a triangle fan and remap the layer elements to the new triangles
+		"""
+
+		if self.IsTriangleMesh( ):
+			return
+
+		triangle_counts = numpy.maximum( self._polygon_sizes - 2, 0 )
+		num_triangles = int( triangle_counts.sum( ) )
+
+		polygon_map = numpy.repeat( numpy.arange( len( self._polygon_starts ) ), triangle_counts )
+		fan_offsets = numpy.arange( num_triangles ) - numpy.repeat( numpy.cumsum( triangle_counts ) - triangle_counts, triangle_counts )
+		fan_starts = self._polygon_starts[ polygon_map ]
+
+		polygon_vertex_map = numpy.column_stack( ( fan_starts, fan_starts + fan_offsets + 1, fan_starts + fan_offsets + 2 ) ).ravel( )
+
+		self._polygon_vertices = self._polygon_vertices[ polygon_vertex_map ]
+		self._polygon_starts = numpy.arange( 0, num_triangles * 3, 3, dtype = numpy.int64 )
+		self._polygon_sizes = numpy.full( num_triangles, 3, dtype = numpy.int64 )
+
+		for layer in self._layers:
+			for layer_element in layer._elements( ):
+				layer_element._remap( polygon_vertex_map, polygon_map )
+
+
+
+class FbxShape( FbxGeometry ):
+	"""
+	Blendshape target, FbxCommon.FbxShape
+	The control points are the full mesh, the same as the SDK, not the sparse offsets stored in the file.
+	"""
+
+	def __init__( self, scene, object_id, name, element = None, sub_type = 'Shape' ):
+		FbxGeometry.__init__( self, scene, object_id, name, element, sub_type )
+
+
+	def _expand( self, base_mesh ):
+		"""
+		Apply the sparse offsets stored in the file to the control points of the base mesh
+		"""
+
+		element = self._element
+		indices = numpy.asarray( element.get_value( 'Indexes', numpy.zeros( 0 ) ), dtype = numpy.int64 )
+		offsets = numpy.asarray( element.get_value( 'Vertices', numpy.zeros( 0 ) ), dtype = numpy.float64 ).reshape( -1, 3 )
+
+		self._control_points = base_mesh._control_points.copy( )
+		self._control_points[ indices, : 3 ] += offsets
+
+		normals = numpy.zeros( ( len( self._control_points ), 4 ) )
+		normal_offsets = element.get_value( 'Normals' )
+		if normal_offsets is not None:
+			normals[ indices, : 3 ] = numpy.asarray( normal_offsets, dtype = numpy.float64 ).reshape( -1, 3 )
+
+		layer = FbxLayer( )
+		layer._normals = FbxLayerElementTemplate( '', FbxLayerElement.eByControlPoint, FbxLayerElement.eDirect, FbxLayerElementArray( normals, FbxVector4 ) )
+		self._layers = [ layer ]
+
+
+
+class FbxDeformerBase( FbxObject ):
+	"""
+	Base for the deformers attached to a geometry
+	"""
+
+	deformer_type = FbxDeformer.eUnknown
+
+	def GetDeformerType( self ):
+		return self.deformer_type
+
+
+
+class FbxCluster( FbxObject ):
+	"""
+	Skin cluster, the weights of a single bone, FbxCommon.FbxCluster
+	"""
+
+	def __init__( self, scene, object_id, name, element = None ):
+		FbxObject.__init__( self, scene, object_id, name, element )
+
+		self._indices = numpy.zeros( 0, dtype = numpy.int32 )
+		self._weights = numpy.zeros( 0 )
+		if element is not None:
+			self._indices = numpy.asarray( element.get_value( 'Indexes', self._indices ), dtype = numpy.int32 )
+			self._weights = numpy.asarray( element.get_value( 'Weights', self._weights ), dtype = numpy.float64 )
+
+
+	def GetLink( self ):
+		links = self._get_sources( FbxNode )
+		if links:
+			return links[ 0 ]
+		return None
+
+
+	def GetControlPointIndicesCount( self ):
+		return len( self._indices )
+
+
+	def GetControlPointIndices( self ):
+		return self._indices.tolist( )
+
+
+	def GetControlPointWeights( self ):
+		return self._weights.tolist( )
+
+
+
+class FbxSkin( FbxDeformerBase ):
+	"""
+	Skin deformer, FbxCommon.FbxSkin
+	"""
+
+	deformer_type = FbxDeformer.eSkin
+
+	def GetClusterCount( self ):
+		return len( self._get_sources( FbxCluster ) )
+
+
+	def GetCluster( self, index ):
+		return self._get_sources( FbxCluster )[ index ]
+
+
+
+class FbxBlendShapeChannel( FbxObject ):
+	"""
+	Blendshape channel, FbxCommon.FbxBlendShapeChannel
+	"""
+
+	def GetTargetShapeCount( self ):
+		return len( self._get_sources( FbxShape ) )
+
+
+	def GetTargetShape( self, index ):
+		return self._get_sources( FbxShape )[ index ]
+
+
+
+class FbxBlendShape( FbxDeformerBase ):
+	"""
+	Blendshape deformer, FbxCommon.FbxBlendShape
+	"""
+
+	deformer_type = FbxDeformer.eBlendShape
+
+	def GetBlendShapeChannelCount( self ):
+		return len( self._get_sources( FbxBlendShapeChannel ) )
+
+
+	def GetBlendShapeChannel( self, index ):
+		return self._get_sources( FbxBlendShapeChannel )[ index ]
+
+
+
+#---------------------------------------------------------------------------
+# Scene
+#---------------------------------------------------------------------------
+
+class FbxManager( object ):
+	"""
+	Stand in for the SDK manager, FbxCommon.FbxManager
+	"""
+
+	def Destroy( self ):
+		pass
+
+
+
+class FbxScene( object ):
+	"""
+	Scene read from an FBX file, FbxCommon.FbxScene
+	"""
+
+	def __init__( self ):
+		self._filename = ''
+		self._version = 0
+		self._objects = { }
+		self._root = FbxNode( self, 0, 'RootNode' )
+		self._settings = FbxGlobalSettings( )
+		self._conversion = None
+
+
+	def GetRootNode( self ):
+		return self._root
+
+
+	def GetGlobalSettings( self ):
+		return self._settings
+
+
+	def GetGeometries( self ):
+		return [ scene_object for scene_object in self._objects.values( ) if isinstance( scene_object, FbxMesh ) ]
+
+
+	def Destroy( self ):
+		self._objects = { }
+
+
+
+class FbxGeometryConverter( object ):
+	"""
+	Geometry conversion, FbxCommon.FbxGeometryConverter
+
+	*Arguments:*
+		* ``manager`` FbxManager
+	"""
+
+	def __init__( self, manager = None ):
+		self._manager = manager
+
+
+	def Triangulate( self, target, replace = True, legacy = False ):
+		"""
+		Triangulate a single mesh attribute or every mesh in a scene
+
+		*Arguments:*
+			* ``target`` FbxMesh node attribute or FbxScene
+
+		*Returns:*
+			* ``FbxMesh`` the triangulated mesh when given a mesh
+			* ``bool`` True when all meshes in a scene were triangulated
+		"""
+
+		if isinstance( target, FbxMesh ):
+			target._triangulate( )
+			return target
+
+		for mesh in target.GetGeometries( ):
+			mesh._triangulate( )
+
+		return True
+
+
+
+# Object record name, sub type -> scene object class
+OBJECT_CLASSES = { ( 'Model', None )                   : FbxNode,
+                   ( 'Geometry', 'Mesh' )              : FbxMesh,
+                   ( 'Geometry', 'Shape' )             : FbxShape,
+                   ( 'NodeAttribute', 'Null' )         : FbxNull,
+                   ( 'NodeAttribute', 'LimbNode' )     : FbxSkeleton,
+                   ( 'NodeAttribute', 'Limb' )         : FbxSkeleton,
+                   ( 'NodeAttribute', 'Root' )         : FbxSkeleton,
+                   ( 'NodeAttribute', None )           : FbxNodeAttribute,
+                   ( 'Deformer', 'Skin' )              : FbxSkin,
+                   ( 'Deformer', 'Cluster' )           : FbxCluster,
+                   ( 'Deformer', 'BlendShape' )        : FbxBlendShape,
+                   ( 'Deformer', 'BlendShapeChannel' ) : FbxBlendShapeChannel,
+                   ( 'Material', None )                : FbxSurfaceMaterial,
+                   ( 'Texture', None )                 : FbxFileTexture }
+
+# Object record name -> name of the class property template in Definitions
+TEMPLATE_NAMES = { 'Model' : 'FbxNode', 'Geometry' : 'FbxMesh', 'Material' : 'FbxSurfacePhong', 'Texture' : 'FbxFileTexture' }
+
+
+def _get_object_name( value ):
+	"""
+	Strip the class from an object name, "Model::Name" -> "Name"
+	"""
+
+	if '::' in value:
+		return value.split( '::', 1 )[ 1 ]
+	return value
+
+
+def _read_templates( root ):
+	"""
+	Get the default property records of each object type from the Definitions
+
+	*Returns:*
+		* ``templates`` dict of object record name -> list of Fbx_Property_Record
+	"""
+
+	templates = { }
+	definitions = root.find( 'Definitions' )
+	if definitions is None:
+		return templates
+
+	for object_type in definitions.find_all( 'ObjectType' ):
+		type_name = object_type.props[ 0 ] if object_type.props else ''
+		for template in object_type.find_all( 'PropertyTemplate' ):
+			template_name = template.props[ 0 ] if template.props else ''
+			if type_name in templates and template_name != TEMPLATE_NAMES.get( type_name ):
+				continue
+
+			properties = template.find( 'Properties70' )
+			if properties is not None:
+				templates[ type_name ] = [ Fbx_Property_Record.from_element( element ) for element in properties.elems ]
+
+	return templates
+
+
+def _build_scene( scene, root ):
+	"""
+	Create the scene objects from the records read from the file and connect them
+
+	*Arguments:*
+		* ``scene`` FbxScene to fill out
+		* ``root`` FbxReader.Fbx_Element of the file
+	"""
+
+	# scene axis and units
+	settings = root.find( 'GlobalSettings' )
+	if settings is not None:
+		settings_object = FbxObject( scene, -1, 'GlobalSettings' )
+		settings_object._set_properties( None, settings )
+		value = settings_object._get_property_value
+
+		scene._settings._axis_system = FbxAxisSystem._from_settings( value( 'UpAxis', 1 ), value( 'UpAxisSign', 1 ),
+		                                                             value( 'FrontAxis', 2 ), value( 'FrontAxisSign', 1 ),
+		                                                             value( 'CoordAxis', 0 ), value( 'CoordAxisSign', 1 ) )
+		scene._settings._system_unit = FbxSystemUnit( value( 'UnitScaleFactor', 1.0 ) )
+
+	templates = _read_templates( root )
+
+	# objects
+	objects = { 0 : scene._root }
+	objects_element = root.find( 'Objects' )
+	if objects_element is not None:
+		for element in objects_element.elems:
+			if len( element.props ) < 3:
+				continue
+
+			object_id, name, sub_type = element.props[ : 3 ]
+			object_class = OBJECT_CLASSES.get( ( element.name, sub_type ), OBJECT_CLASSES.get( ( element.name, None ) ) )
+			if object_class is None:
+				continue
+
+			if issubclass( object_class, FbxNodeAttribute ):
+				scene_object = object_class( scene, object_id, _get_object_name( name ), element, sub_type )
+			else:
+				scene_object = object_class( scene, object_id, _get_object_name( name ), element )
+
+			scene_object._set_properties( templates.get( element.name ), element )
+			objects[ object_id ] = scene_object
+
+	# connections
+	connections = root.find( 'Connections' )
+	if connections is not None:
+		for connection in connections.elems:
+			if len( connection.props ) < 3:
+				continue
+
+			source = objects.get( connection.props[ 1 ] )
+			destination = objects.get( connection.props[ 2 ] )
+			if source is None or destination is None:
+				continue
+
+			if connection.props[ 0 ] == 'OP' and len( connection.props ) > 3:
+				property_name = connection.props[ 3 ]
+				destination._property_sources.setdefault( property_name, [ ] ).append( source )
+				if property_name not in destination._property_lookup:
+					destination._property_lookup[ property_name ] = len( destination._properties )
+					destination._properties.append( Fbx_Property_Record( property_name, 'object', FbxPropertyAttr.eNone, None ) )
+			else:
+				destination._sources.append( source )
+				source._destinations.append( destination )
+
+	# hierarchy, attributes and materials
+	for scene_object in objects.values( ):
+		if not isinstance( scene_object, FbxNode ):
+			continue
+
+		scene_object._children = scene_object._get_sources( FbxNode )
+		for child in scene_object._children:
+			if child._parent is None:
+				child._parent = scene_object
+
+		attributes = scene_object._get_sources( FbxNodeAttribute )
+		if attributes:
+			scene_object._attribute = attributes[ 0 ]
+
+		scene_object._materials = scene_object._get_sources( FbxSurfaceMaterial )
+
+	# blendshape targets are stored as offsets from the mesh they deform
+	for scene_object in objects.values( ):
+		if isinstance( scene_object, FbxMesh ):
+			for blendshape in scene_object._deformers( FbxDeformer.eBlendShape ):
+				for channel in blendshape._get_sources( FbxBlendShapeChannel ):
+					for shape in channel._get_sources( FbxShape ):
+						shape._expand( scene_object )
+
+	scene._objects = objects
+
+
+def InitializeSdkObjects( ):
+	"""
+	Create the manager and an empty scene, FbxCommon.InitializeSdkObjects
+
+	*Returns:*
+		* ``manager`` FbxManager
+		* ``scene`` FbxScene
+	"""
+
+	return FbxManager( ), FbxScene( )
+
+
+def LoadScene( manager, scene, filename ):
+	"""
+	Read an FBX file into the scene, FbxCommon.LoadScene
+
+	*Arguments:*
+		* ``manager`` FbxManager
+		* ``scene`` FbxScene to fill out
+		* ``filename`` FBX filename
+
+	*Returns:*
+		* ``bool`` True if the file was loaded
+	"""
+
+	try:
+		root, version = FbxReader.read_fbx( filename )
+	except ( IOError, FbxReader.Fbx_Read_Error ) as error:
+		print 'Failed to read the FBX file: {0}'.format( error )
+		return False
+
+	scene._filename = os.path.abspath( filename )
+	scene._version = version
+	_build_scene( scene, root )
+
+	return True
@@ -0,0 +1,529 @@
+"""
+Volition FBX Reader
+
+Low level readers for FBX 7.x files that do not need the Autodesk FBX SDK.
+The file is parsed into a tree of Fbx_Element records ( name, properties, children ),
+the same layout the SDK uses internally.  Large property arrays are decoded
+straight into NumPy buffers.
+
+- Kaydara FBX Binary ( Maya templates )
+- FBX 7.x ASCII ( 3dsmax templates ), streamed in chunks
+"""
+
+import io
+import os
+import re
+import struct
+import zlib
+
+import numpy
+
+
+# Binary file header
+FBX_BINARY_MAGIC = b'Kaydara FBX Binary  \x00'
+FBX_BINARY_HEADER_SIZE = 27
+
+# Binary array property types and their NumPy element types
+FBX_ARRAY_TYPES = { b'f' : numpy.dtype( '<f4' ),
+                    b'd' : numpy.dtype( '<f8' ),
+                    b'l' : numpy.dtype( '<i8' ),
+                    b'i' : numpy.dtype( '<i4' ),
+                    b'b' : numpy.dtype( '<u1' ) }
+
+# Binary scalar property types
+FBX_SCALAR_TYPES = { b'Y' : struct.Struct( '<h' ),
+                     b'C' : struct.Struct( '<?' ),
+                     b'I' : struct.Struct( '<i' ),
+                     b'F' : struct.Struct( '<f' ),
+                     b'D' : struct.Struct( '<d' ),
+                     b'L' : struct.Struct( '<q' ) }
+
+# Name separator used by the binary format, "name\x00\x01Class"
+FBX_BINARY_NAME_SEPARATOR = b'\x00\x01'
+
+# Number of bytes read from an ascii file at a time
+FBX_ASCII_CHUNK_SIZE = 1024 * 1024
+
+# Ascii array records that hold integer values, every other array is read as doubles
+FBX_ASCII_INT_ARRAYS = { 'PolygonVertexIndex' : numpy.int32,
+                         'Edges'              : numpy.int32,
+                         'Indexes'            : numpy.int32,
+                         'UVIndex'            : numpy.int32,
+                         'NormalsIndex'       : numpy.int32,
+                         'BinormalsIndex'     : numpy.int32,
+                         'TangentsIndex'      : numpy.int32,
+                         'ColorIndex'         : numpy.int32,
+                         'Materials'          : numpy.int32,
+                         'TextureId'          : numpy.int32,
+                         'Smoothing'          : numpy.int32,
+                         'KeyAttrFlags'       : numpy.int32,
+                         'KeyAttrRefCount'    : numpy.int32,
+                         'KeyTime'            : numpy.int64 }
+
+# Single property value in an ascii record, a quoted string or a bare token
+FBX_ASCII_PROPERTY = re.compile( r'"([^"]*)"|([^,\s][^,]*)' )
+
+
+class Fbx_Read_Error( Exception ):
+	"""
+	Raised when an FBX file cannot be parsed
+	"""
+	pass
+
+
+
+class Fbx_Element( object ):
+	"""
+	A single record from an FBX file
+
+	*Arguments:*
+		* ``name`` Name of the record ( Objects, Model, Vertices, P, etc. )
+		* ``props`` List of property values, arrays are NumPy arrays
+		* ``elems`` List of child Fbx_Element records
+	"""
+
+	__slots__ = ( 'name', 'props', 'elems' )
+
+	def __init__( self, name, props = None, elems = None ):
+		self.name = name
+		self.props = props if props is not None else [ ]
+		self.elems = elems if elems is not None else [ ]
+
+
+	def find( self, name ):
+		"""
+		Get the first child record with the given name
+
+		*Arguments:*
+			* ``name`` Record name
+
+		*Returns:*
+			* ``Fbx_Element`` The child record or None
+		"""
+
+		for elem in self.elems:
+			if elem.name == name:
+				return elem
+
+		return None
+
+
+	def find_all( self, name ):
+		"""
+		Get all of the child records with the given name
+
+		*Arguments:*
+			* ``name`` Record name
+
+		*Returns:*
+			* ``list`` List of Fbx_Element records
+		"""
+
+		return [ elem for elem in self.elems if elem.name == name ]
+
+
+	def get_value( self, name, default = None ):
+		"""
+		Get the first property value of the first child record with the given name
+
+		*Arguments:*
+			* ``name`` Record name
+
+		*Keyword Arguments:*
+			* ``default`` Value returned when the record is missing
+
+		*Returns:*
+			* ``Value`` The property value
+		"""
+
+		elem = self.find( name )
+		if elem is None or not elem.props:
+			return default
+
+		return elem.props[ 0 ]
+
+
+	def __repr__( self ):
+		return 'Fbx_Element( {0}, {1} props, {2} children )'.format( self.name, len( self.props ), len( self.elems ) )
+
+
+
+def to_str( value ):
+	"""
+	Convert a raw byte string from the file into a native string
+
+	*Arguments:*
+		* ``value`` bytes
+
+	*Returns:*
+		* ``string`` native str
+	"""
+
+	if isinstance( value, str ):
+		return value
+
+	return value.decode( 'utf-8', 'replace' )
+
+
+def is_fbx_binary( filename ):
+	"""
+	Check the header of the file for the binary FBX signature
+
+	*Arguments:*
+		* ``filename`` FBX filename
+
+	*Returns:*
+		* ``bool`` True if the file is a binary FBX file
+	"""
+
+	with open( filename, 'rb' ) as fbx_file:
+		header = fbx_file.read( len( FBX_BINARY_MAGIC ) )
+
+	return header == FBX_BINARY_MAGIC
+
+
+def _read_binary_array( data, offset, type_code ):
+	"""
+	Read an array property, decompressing it if needed
+
+	*Arguments:*
+		* ``data`` File buffer
+		* ``offset`` Offset of the array header
+		* ``type_code`` Array property type code
+
+	*Returns:*
+		* ``array`` NumPy array of the values
+		* ``offset`` Offset after the array
+	"""
+
+	length, encoding, compressed_length = struct.unpack_from( '<III', data, offset )
+	offset += 12
+	dtype = FBX_ARRAY_TYPES[ type_code ]
+
+	if encoding == 0:
+		array = numpy.frombuffer( data, dtype = dtype, count = length, offset = offset )
+	elif encoding == 1:
+		buffer_ = zlib.decompress( data[ offset : offset + compressed_length ] )
+		array = numpy.frombuffer( buffer_, dtype = dtype, count = length )
+	else:
+		raise Fbx_Read_Error( 'Unknown array encoding {0} at offset {1}'.format( encoding, offset ) )
+
+	if type_code == b'b':
+		array = array.astype( bool )
+
+	return array, offset + compressed_length
+
+
+def _read_binary_element( data, offset, wide ):
+	"""
+	Read a single node record and all of its children
+
+	*Arguments:*
+		* ``data`` File buffer
+		* ``offset`` Offset of the node record
+		* ``wide`` True if the file uses 64 bit record headers ( FBX 7.5+ )
+
+	*Returns:*
+		* ``element`` Fbx_Element or None for a null record
+		* ``offset`` Offset after the record
+	"""
+
+	if wide:
+		end_offset, num_props, prop_list_len = struct.unpack_from( '<QQQ', data, offset )
+		offset += 24
+	else:
+		end_offset, num_props, prop_list_len = struct.unpack_from( '<III', data, offset )
+		offset += 12
+
+	name_len = struct.unpack_from( '<B', data, offset )[ 0 ]
+	offset += 1
+
+	# null record marks the end of a child list
+	if end_offset == 0:
+		return None, offset
+
+	name = to_str( data[ offset : offset + name_len ] )
+	offset += name_len
+
+	props = [ ]
+	for prop_index in range( num_props ):
+		type_code = data[ offset : offset + 1 ]
+		offset += 1
+
+		scalar_type = FBX_SCALAR_TYPES.get( type_code )
+		if scalar_type:
+			props.append( scalar_type.unpack_from( data, offset )[ 0 ] )
+			offset += scalar_type.size
+
+		elif type_code in FBX_ARRAY_TYPES:
+			array, offset = _read_binary_array( data, offset, type_code )
+			props.append( array )
+
+		elif type_code == b'S' or type_code == b'R':
+			length = struct.unpack_from( '<I', data, offset )[ 0 ]
+			offset += 4
+			value = data[ offset : offset + length ]
+			offset += length
+
+			if type_code == b'S':
+				# "Name\x00\x01Class" -> "Class::Name", the same form the ascii files use
+				if FBX_BINARY_NAME_SEPARATOR in value:
+					value_name, value_class = value.split( FBX_BINARY_NAME_SEPARATOR, 1 )
+					value = value_class + b'::' + value_name
+				value = to_str( value )
+
+			props.append( value )
+
+		else:
+			raise Fbx_Read_Error( 'Unknown property type {0!r} at offset {1}'.format( type_code, offset - 1 ) )
+
+	elems = [ ]
+	while offset < end_offset:
+		child, offset = _read_binary_element( data, offset, wide )
+		if child is None:
+			break
+		elems.append( child )
+
+	return Fbx_Element( name, props, elems ), end_offset
+
+
+def read_fbx_binary( filename ):
+	"""
+	Read a "Kaydara FBX Binary" file
+
+	*Arguments:*
+		* ``filename`` FBX filename
+
+	*Returns:*
+		* ``root`` Fbx_Element holding all of the top level records
+		* ``version`` FBX file version, 7400 etc.
+	"""
+
+	with open( filename, 'rb' ) as fbx_file:
+		data = fbx_file.read( )
+
+	if data[ : len( FBX_BINARY_MAGIC ) ] != FBX_BINARY_MAGIC:
+		raise Fbx_Read_Error( 'Not a binary FBX file: {0}'.format( filename ) )
+
+	version = struct.unpack_from( '<I', data, FBX_BINARY_HEADER_SIZE - 4 )[ 0 ]
+	wide = version >= 7500
+
+	root = Fbx_Element( '' )
+	offset = FBX_BINARY_HEADER_SIZE
+	while offset < len( data ):
+		element, offset = _read_binary_element( data, offset, wide )
+		if element is None:
+			break
+		root.elems.append( element )
+
+	return root, version
+
+
+def _iter_ascii_lines( fbx_file, chunk_size ):
+	"""
+	Read the file in chunks and yield it a line at a time
+
+	*Arguments:*
+		* ``fbx_file`` Open file object
+		* ``chunk_size`` Number of bytes to read at a time
+
+	*Returns:*
+		* ``generator`` Lines of the file without line endings
+	"""
+
+	remainder = ''
+	while True:
+		chunk = fbx_file.read( chunk_size )
+		if not chunk:
+			break
+
+		lines = ( remainder + chunk ).split( '\n' )
+		remainder = lines.pop( )
+		for line in lines:
+			yield line
+
+	if remainder:
+		yield remainder
+
+
+def _parse_ascii_value( token ):
+	"""
+	Convert a bare ascii token to an int, float or bool
+
+	*Arguments:*
+		* ``token`` Token text
+
+	*Returns:*
+		* ``value`` Converted value, or the token when it is not a number
+	"""
+
+	try:
+		return int( token )
+	except ValueError:
+		pass
+
+	try:
+		return float( token )
+	except ValueError:
+		pass
+
+	if token in ( 'T', 'Y' ):
+		return True
+	elif token in ( 'F', 'N' ):
+		return False
+
+	return token
+
+
+def _parse_ascii_properties( text ):
+	"""
+	Split the properties of an ascii record
+
+	*Arguments:*
+		* ``text`` Text after the record name
+
+	*Returns:*
+		* ``list`` Property values
+	"""
+
+	props = [ ]
+	for match in FBX_ASCII_PROPERTY.finditer( text ):
+		string, token = match.groups( )
+		if string is not None:
+			props.append( string.replace( '&quot;', '"' ).replace( '&cr;', '\r' ).replace( '&lf;', '\n' ) )
+		else:
+			props.append( _parse_ascii_value( token.strip( ) ) )
+
+	return props
+
+
+def _parse_ascii_array( name, parts ):
+	"""
+	Convert the text of an ascii array record into a NumPy array in a single pass
+
+	*Arguments:*
+		* ``name`` Record name, used to pick the array type
+		* ``parts`` List of the text lines between the braces
+
+	*Returns:*
+		* ``array`` NumPy array of the values
+	"""
+
+	text = ','.join( part.rstrip( ',' ) for part in parts if part )
+	dtype = FBX_ASCII_INT_ARRAYS.get( name, numpy.float64 )
+	if not text.strip( ):
+		return numpy.zeros( 0, dtype = dtype )
+
+	return numpy.fromstring( text, dtype = dtype, sep = ',' )
+
+
+def read_fbx_ascii( filename, chunk_size = FBX_ASCII_CHUNK_SIZE ):
+	"""
+	Read an ascii FBX 7.x file.
+	The file is streamed in chunks and the large numeric arrays are collected as text
+	and converted with a single NumPy call, instead of a python object per value.
+
+	*Arguments:*
+		* ``filename`` FBX filename
+
+	*Keyword Arguments:*
+		* ``chunk_size`` Number of bytes to read at a time
+
+	*Returns:*
+		* ``root`` Fbx_Element holding all of the top level records
+		* ``version`` FBX file version, 7400 etc.
+	"""
+
+	root = Fbx_Element( '' )
+	stack = [ root ]
+	array_element = None
+	array_parts = None
+
+	if str is bytes:
+		fbx_file = open( filename, 'rb' )
+	else:
+		fbx_file = io.open( filename, 'r', encoding = 'utf-8', errors = 'replace' )
+
+	with fbx_file:
+		for line in _iter_ascii_lines( fbx_file, chunk_size ):
+			line = line.strip( )
+			if not line or line[ 0 ] == ';':
+				continue
+
+			# numeric array values, collected until the closing brace
+			if array_element is not None:
+				closed = line.endswith( '}' )
+				if closed:
+					line = line[ : -1 ]
+				if line.startswith( 'a:' ):
+					line = line[ 2 : ]
+				array_parts.append( line.strip( ) )
+
+				if closed:
+					array_element.props.append( _parse_ascii_array( array_element.name, array_parts ) )
+					array_element = None
+					array_parts = None
+				continue
+
+			if line == '}':
+				if len( stack ) > 1:
+					stack.pop( )
+				continue
+
+			# values continued from the previous record, embedded media "Content: ," etc.
+			if line[ 0 ] in '",' and stack[ -1 ].elems:
+				stack[ -1 ].elems[ -1 ].props.extend( _parse_ascii_properties( line ) )
+				continue
+
+			name, separator, text = line.partition( ':' )
+			if not separator:
+				raise Fbx_Read_Error( 'Unexpected line in {0}: {1}'.format( filename, line[ : 80 ] ) )
+
+			text = text.strip( )
+			has_children = text.endswith( '{' )
+			if has_children:
+				text = text[ : -1 ].strip( )
+
+			element = Fbx_Element( name.strip( ) )
+			stack[ -1 ].elems.append( element )
+
+			# "*count {" starts an array record
+			if text.startswith( '*' ) and has_children:
+				array_element = element
+				array_parts = [ ]
+				continue
+
+			element.props = _parse_ascii_properties( text )
+			if has_children:
+				stack.append( element )
+
+	if array_element is not None:
+		raise Fbx_Read_Error( 'Unterminated array {0} in {1}'.format( array_element.name, filename ) )
+
+	version = 0
+	header = root.find( 'FBXHeaderExtension' )
+	if header is not None:
+		version = header.get_value( 'FBXVersion', 0 )
+
+	return root, version
+
+
+def read_fbx( filename ):
+	"""
+	Read an FBX file into an Fbx_Element tree
+
+	*Arguments:*
+		* ``filename`` FBX filename
+
+	*Returns:*
+		* ``root`` Fbx_Element holding all of the top level records
+		* ``version`` FBX file version, 7400 etc.
+	"""
+
+	if not os.path.lexists( filename ):
+		raise Fbx_Read_Error( 'FBX file does not exist: {0}'.format( filename ) )
+
+	if is_fbx_binary( filename ):
+		return read_fbx_binary( filename )
+
+	return read_fbx_ascii( filename )
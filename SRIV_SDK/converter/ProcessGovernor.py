@@ -0,0 +1,397 @@
+"""
+Volition Process Governor
+
+Tracks the running cruncher processes and limits how many are started at the same time.
+
+- Processes are listed through Psapi.dll on Windows and the /proc folder on Linux
+- The cpu time and resident memory of every cruncher process are sampled
+- A new cruncher is only started when there is a free cpu and enough available memory for it
+"""
+
+import multiprocessing
+import ntpath
+import os
+import time
+
+import ctypes
+if os.name == 'nt':
+	import ctypes.wintypes
+
+
+# Memory a cruncher is expected to need before one has been sampled, in bytes
+CRUNCHER_MEMORY_ESTIMATE = 256 * 1024 * 1024
+
+# Memory kept free for the rest of the machine, in bytes
+MEMORY_RESERVE = 512 * 1024 * 1024
+
+# Seconds a process sample is reused before the processes are listed again
+SAMPLE_INTERVAL = 0.5
+
+
+class Process_Sample( object ):
+	"""
+	Usage of a running process
+
+	*Arguments:*
+		* ``pid`` Process id
+		* ``name`` Lower case image filename, ie. texture_crunch_wd.exe
+		* ``cpu_time`` Seconds of cpu time used
+		* ``rss`` Resident memory in bytes
+	"""
+
+	def __init__( self, pid, name, cpu_time, rss ):
+
+		self.pid = pid
+		self.name = name
+		self.cpu_time = cpu_time
+		self.rss = rss
+		self.cpu_percent = 0.0
+
+
+class Win32_Process_Memory_Counters( ctypes.Structure ):
+	"""
+	PROCESS_MEMORY_COUNTERS filled by GetProcessMemoryInfo
+	"""
+
+	_fields_ = [ ( 'cb', ctypes.c_ulong ),
+	             ( 'PageFaultCount', ctypes.c_ulong ),
+	             ( 'PeakWorkingSetSize', ctypes.c_size_t ),
+	             ( 'WorkingSetSize', ctypes.c_size_t ),
+	             ( 'QuotaPeakPagedPoolUsage', ctypes.c_size_t ),
+	             ( 'QuotaPagedPoolUsage', ctypes.c_size_t ),
+	             ( 'QuotaPeakNonPagedPoolUsage', ctypes.c_size_t ),
+	             ( 'QuotaNonPagedPoolUsage', ctypes.c_size_t ),
+	             ( 'PagefileUsage', ctypes.c_size_t ),
+	             ( 'PeakPagefileUsage', ctypes.c_size_t ) ]
+
+
+class Win32_Memory_Status( ctypes.Structure ):
+	"""
+	MEMORYSTATUSEX filled by GlobalMemoryStatusEx
+	"""
+
+	_fields_ = [ ( 'dwLength', ctypes.c_ulong ),
+	             ( 'dwMemoryLoad', ctypes.c_ulong ),
+	             ( 'ullTotalPhys', ctypes.c_ulonglong ),
+	             ( 'ullAvailPhys', ctypes.c_ulonglong ),
+	             ( 'ullTotalPageFile', ctypes.c_ulonglong ),
+	             ( 'ullAvailPageFile', ctypes.c_ulonglong ),
+	             ( 'ullTotalVirtual', ctypes.c_ulonglong ),
+	             ( 'ullAvailVirtual', ctypes.c_ulonglong ),
+	             ( 'ullAvailExtendedVirtual', ctypes.c_ulonglong ) ]
+
+
+def get_win32_processes( process_names = None ):
+	"""
+	List the running processes on Windows
+
+	*Arguments:*
+		* ``none``
+
+	*Keyword Arguments:*
+		* ``process_names`` Lower case image filenames to list, None lists every process
+
+	*Returns:*
+		* ``list`` Process_Sample of each process
+	"""
+
+	ps_api = ctypes.WinDLL( 'Psapi.dll' )
+
+	ps_api.EnumProcesses.restype = ctypes.wintypes.BOOL
+	ps_api.GetProcessImageFileNameA.restype = ctypes.wintypes.DWORD
+	ps_api.GetProcessMemoryInfo.restype = ctypes.wintypes.BOOL
+
+	kernel32 = ctypes.WinDLL( 'kernel32.dll' )
+
+	kernel32.OpenProcess.restype = ctypes.wintypes.HANDLE
+	kernel32.GetProcessTimes.restype = ctypes.wintypes.BOOL
+
+	MAX_PATH = 260
+	PROCESS_QUERY_INFORMATION = 0x0400
+	PROCESS_VM_READ = 0x0010
+
+	count = 32
+
+	while True:
+		process_ids = ( ctypes.wintypes.DWORD * count )( )
+		cb = ctypes.sizeof( process_ids )
+		bytes_returned = ctypes.wintypes.DWORD( )
+
+		if ps_api.EnumProcesses( ctypes.byref( process_ids ), cb, ctypes.byref( bytes_returned ) ):
+			if bytes_returned.value < cb:
+				break
+
+			else:
+				count *= 2
+		else:
+			raise IOError( 'Call to EnumProcesses failed' )
+
+	processes = [ ]
+	for index in range( bytes_returned.value / ctypes.sizeof( ctypes.wintypes.DWORD ) ):
+		process_id = process_ids[ index ]
+		h_process = kernel32.OpenProcess( PROCESS_QUERY_INFORMATION | PROCESS_VM_READ, False, process_id )
+		if h_process:
+			image_filename = ( ctypes.c_char*MAX_PATH )( )
+
+			if ps_api.GetProcessImageFileNameA( h_process, image_filename, MAX_PATH ) > 0:
+				filename = os.path.basename( image_filename.value ).lower( )
+
+				if process_names is None or filename in process_names:
+					# process times are in 100 nanosecond intervals
+					cpu_time = 0.0
+					creation_time = ctypes.wintypes.FILETIME( )
+					exit_time = ctypes.wintypes.FILETIME( )
+					kernel_time = ctypes.wintypes.FILETIME( )
+					user_time = ctypes.wintypes.FILETIME( )
+					if kernel32.GetProcessTimes( h_process, ctypes.byref( creation_time ), ctypes.byref( exit_time ), ctypes.byref( kernel_time ), ctypes.byref( user_time ) ):
+						for filetime in ( kernel_time, user_time ):
+							cpu_time += ( ( filetime.dwHighDateTime << 32 ) + filetime.dwLowDateTime ) / 10000000.0
+
+					rss = 0
+					counters = Win32_Process_Memory_Counters( )
+					counters.cb = ctypes.sizeof( counters )
+					if ps_api.GetProcessMemoryInfo( h_process, ctypes.byref( counters ), counters.cb ):
+						rss = counters.WorkingSetSize
+
+					processes.append( Process_Sample( process_id, filename, cpu_time, rss ) )
+
+			kernel32.CloseHandle( h_process )
+
+	return processes
+
+
+def get_proc_processes( process_names = None ):
+	"""
+	List the running processes from the /proc folder on Linux
+	Crunchers run through wine keep their windows path in the command line, the image name is taken from there
+
+	*Arguments:*
+		* ``none``
+
+	*Keyword Arguments:*
+		* ``process_names`` Lower case image filenames to list, None lists every process
+
+	*Returns:*
+		* ``list`` Process_Sample of each process
+	"""
+
+	clock_ticks = float( os.sysconf( 'SC_CLK_TCK' ) )
+	page_size = os.sysconf( 'SC_PAGE_SIZE' )
+
+	processes = [ ]
+	for pid_name in os.listdir( '/proc' ):
+		if not pid_name.isdigit( ):
+			continue
+
+		proc_dir = os.path.join( '/proc', pid_name )
+		try:
+			with open( os.path.join( proc_dir, 'cmdline' ), 'rb' ) as cmdline_file:
+				command = cmdline_file.read( ).split( '\0' )[ 0 ]
+			if not command:
+				# kernel threads have no command line
+				continue
+
+			filename = ntpath.basename( command ).lower( )
+			if not process_names is None and not filename in process_names:
+				continue
+
+			# utime and stime follow the command name, which can hold spaces and brackets
+			with open( os.path.join( proc_dir, 'stat' ), 'rb' ) as stat_file:
+				stat_fields = stat_file.read( ).rsplit( ')', 1 )[ 1 ].split( )
+			cpu_time = ( int( stat_fields[ 11 ] ) + int( stat_fields[ 12 ] ) ) / clock_ticks
+
+			with open( os.path.join( proc_dir, 'statm' ), 'rb' ) as statm_file:
+				rss = int( statm_file.read( ).split( )[ 1 ] ) * page_size
+
+		except ( IOError, OSError, IndexError, ValueError ):
+			# the process exited while it was read
+			continue
+
+		processes.append( Process_Sample( int( pid_name ), filename, cpu_time, rss ) )
+
+	return processes
+
+
+def get_processes( process_names = None ):
+	"""
+	List the running processes
+
+	*Arguments:*
+		* ``none``
+
+	*Keyword Arguments:*
+		* ``process_names`` Lower case image filenames to list, None lists every process
+
+	*Returns:*
+		* ``list`` Process_Sample of each process, empty if processes can not be listed on this platform
+	"""
+
+	if os.name == 'nt':
+		return get_win32_processes( process_names )
+
+	if os.path.isdir( '/proc' ):
+		return get_proc_processes( process_names )
+
+	return [ ]
+
+
+def get_process_count( process_name ):
+	"""
+	Count the running processes with an image filename
+
+	*Arguments:*
+		* ``process_name`` Lower case image filename, ie. texture_crunch_wd.exe
+
+	*Keyword Arguments:*
+		* ``none``
+
+	*Returns:*
+		* ``int`` number of processes
+	"""
+
+	return len( get_processes( [ process_name ] ) )
+
+
+def get_available_memory( ):
+	"""
+	Get the physical memory available to new processes
+
+	*Arguments:*
+		* ``none``
+
+	*Keyword Arguments:*
+		* ``none``
+
+	*Returns:*
+		* ``int`` available memory in bytes, None if it can not be read on this platform
+	"""
+
+	if os.name == 'nt':
+		memory_status = Win32_Memory_Status( )
+		memory_status.dwLength = ctypes.sizeof( memory_status )
+		if ctypes.windll.kernel32.GlobalMemoryStatusEx( ctypes.byref( memory_status ) ):
+			return memory_status.ullAvailPhys
+		return None
+
+	try:
+		with open( '/proc/meminfo', 'r' ) as meminfo_file:
+			meminfo = dict( line.split( ':', 1 ) for line in meminfo_file if ':' in line )
+	except IOError:
+		return None
+
+	# kernels older than 3.14 have no MemAvailable
+	try:
+		if 'MemAvailable' in meminfo:
+			return int( meminfo[ 'MemAvailable' ].split( )[ 0 ] ) * 1024
+		return sum( int( meminfo[ name ].split( )[ 0 ] ) for name in ( 'MemFree', 'Buffers', 'Cached' ) ) * 1024
+	except ( KeyError, IndexError, ValueError ):
+		return None
+
+
+class Process_Governor( object ):
+	"""
+	Tracks the running cruncher processes and decides when another one can be started
+	Crunchers are counted machine wide, so crunchers started by other converters are taken into account
+
+	*Arguments:*
+		* ``process_names`` Lower case image filenames of the crunchers
+
+	*Keyword Arguments:*
+		* ``max_processes`` Crunchers run at the same time at most, defaults to the number of cpus
+		* ``memory_reserve`` Memory in bytes kept free for the rest of the machine
+
+	*Examples:* ::
+
+		governor = Process_Governor( [ 'texture_crunch_wd.exe' ] )
+		if governor.can_start( running_count ):
+			start_cruncher( )
+	"""
+
+	def __init__( self, process_names, max_processes = None, memory_reserve = MEMORY_RESERVE ):
+
+		self.process_names = [ name.lower( ) for name in process_names ]
+		self.max_processes = max( 1, max_processes or multiprocessing.cpu_count( ) )
+		self.memory_reserve = memory_reserve
+		self.processes = [ ]
+		self.available_memory = None
+		self.sample_time = None
+		self.peak_rss = 0
+
+
+	def update( self, force = False ):
+		"""
+		Sample the running crunchers and the available memory, the previous sample is reused for SAMPLE_INTERVAL seconds
+
+		*Arguments:*
+			* ``none``
+
+		*Keyword Arguments:*
+			* ``force`` Sample even if the previous sample is recent
+
+		*Returns:*
+			* ``list`` Process_Sample of each running cruncher
+		"""
+
+		now = time.time( )
+		if not force and self.sample_time and now - self.sample_time < SAMPLE_INTERVAL:
+			return self.processes
+
+		try:
+			processes = get_processes( self.process_names )
+		except ( IOError, OSError ):
+			processes = [ ]
+
+		# cpu usage since the previous sample
+		previous_samples = dict( ( process.pid, process ) for process in self.processes )
+		for process in processes:
+			previous = previous_samples.get( process.pid )
+			if previous and process.name == previous.name and now > self.sample_time:
+				process.cpu_percent = 100.0 * max( process.cpu_time - previous.cpu_time, 0.0 ) / ( now - self.sample_time )
+			self.peak_rss = max( self.peak_rss, process.rss )
+
+		self.processes = processes
+		self.available_memory = get_available_memory( )
+		self.sample_time = now
+
+		return processes
+
+
+	def get_memory_estimate( self ):
+		"""
+		Get the memory a new cruncher is expected to need, the largest cruncher seen so far
+
+		*Arguments:*
+			* ``none``
+
+		*Keyword Arguments:*
+			* ``none``
+
+		*Returns:*
+			* ``int`` memory in bytes
+		"""
+
+		return self.peak_rss or CRUNCHER_MEMORY_ESTIMATE
+
+
+	def can_start( self, running_count = 0 ):
+		"""
+		Check if another cruncher can be started without oversubscribing the machine
+
+		*Arguments:*
+			* ``none``
+
+		*Keyword Arguments:*
+			* ``running_count`` Crunchers the caller started, they may not be listed yet
+
+		*Returns:*
+			* ``bool`` True if there is a free cpu and enough available memory
+		"""
+
+		processes = self.update( )
+		if max( running_count, len( processes ) ) >= self.max_processes:
+			return False
+
+		if self.available_memory is None:
+			return True
+
+		return self.available_memory - self.memory_reserve >= self.get_memory_estimate( )
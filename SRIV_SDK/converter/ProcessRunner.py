@@ -0,0 +1,263 @@
+"""
+Volition Process Runner
+
+Runs the cruncher and vpkg command lines for the converter.
+
+- The output of a process is read line by line as it is written, into a job log and an output callback
+- A process that runs longer than its timeout is killed
+- Processes that time out or fail to start are retried after a delay that doubles with every attempt
+- Every process is waited on by its own reader and timer threads, so many can run at the same time
+"""
+
+import os
+import subprocess
+import threading
+import time
+
+
+# Seconds before the first retry of a failed process, doubled for every retry after it
+RETRY_DELAY = 1.0
+
+# Seconds between wait callbacks while a process runs
+POLL_INTERVAL = 0.05
+
+# Seconds to wait on the output of a killed process, a child process it started can keep the output open
+READER_JOIN_TIMEOUT = 1.0
+
+
+class Process_Result( object ):
+	"""
+	Outcome of a command run by run_process
+
+	*Arguments:*
+		* ``returncode`` Exit code of the last attempt, None if it could not be started
+		* ``timed_out`` If the last attempt was killed after its timeout
+		* ``attempts`` Number of times the command was run
+	"""
+
+	def __init__( self, returncode, timed_out, attempts ):
+
+		self.returncode = returncode
+		self.timed_out = timed_out
+		self.attempts = attempts
+
+
+	def succeeded( self ):
+		"""
+		Check if the command ran and exited with 0
+
+		*Arguments:*
+			* ``None``
+
+		*Keyword Arguments:*
+			* ``none``
+
+		*Returns:*
+			* ``Bool`` If the command succeeded
+		"""
+
+		return self.returncode == 0 and not self.timed_out
+
+
+class Process_Output( object ):
+	"""
+	Receives the output lines of a process, writes them to the job log and passes them to the output callback
+	Lines come from the reader thread of the process, writes are locked
+
+	*Arguments:*
+		* ``log_file`` Open job log, or None
+		* ``output_callback`` Called with every output line, or None
+	"""
+
+	def __init__( self, log_file, output_callback ):
+
+		self.log_file = log_file
+		self.output_callback = output_callback
+		self.lock = threading.Lock( )
+
+
+	def write_line( self, line ):
+		"""
+		Write an output line
+
+		*Arguments:*
+			* ``line`` Output line without the line ending
+
+		*Keyword Arguments:*
+			* ``none``
+
+		*Returns:*
+			* ``none``
+		"""
+
+		with self.lock:
+			if self.log_file:
+				self.log_file.write( line + '\n' )
+				self.log_file.flush( )
+
+		if self.output_callback:
+			self.output_callback( line )
+
+
+def read_output( stream, output ):
+	"""
+	Reader thread, pass the lines of a process output stream on until the process closes it
+
+	*Arguments:*
+		* ``stream`` stdout of the process
+		* ``output`` Process_Output the lines are written to
+
+	*Keyword Arguments:*
+		* ``none``
+
+	*Returns:*
+		* ``none``
+	"""
+
+	try:
+		# iter over readline, iterating the file itself reads ahead and holds back lines
+		for line in iter( stream.readline, b'' ):
+			output.write_line( line.rstrip( '\r\n' ) )
+	except ( IOError, ValueError ):
+		pass
+	finally:
+		stream.close( )
+
+
+def run_process_once( command, output, timeout = None, wait_callback = None ):
+	"""
+	Run a command once, streaming its output until it exits or is killed after its timeout
+
+	*Arguments:*
+		* ``command`` Command line
+		* ``output`` Process_Output the output lines are written to
+
+	*Keyword Arguments:*
+		* ``timeout`` Seconds the process may run, None waits until it exits
+		* ``wait_callback`` Called while the process runs, ie. wx.Yield to keep the ui responsive
+
+	*Returns:*
+		* ``Tuple`` exit code or None if the process could not be started, if the process timed out
+	"""
+
+	# crunchers never read input, give them an empty stdin instead of the console of the converter
+	null_input = open( os.devnull, 'rb' )
+	try:
+		process = subprocess.Popen( command, stdin = null_input, stdout = subprocess.PIPE, stderr = subprocess.STDOUT, bufsize = 1 )
+	except ( OSError, ValueError ) as error:
+		output.write_line( 'Could not start the process: {0}'.format( error ) )
+		return None, False
+	finally:
+		null_input.close( )
+
+	reader = threading.Thread( target = read_output, args = ( process.stdout, output ) )
+	reader.daemon = True
+	reader.start( )
+
+	timed_out = threading.Event( )
+	def kill_process( ):
+		timed_out.set( )
+		try:
+			process.kill( )
+		except OSError:
+			pass
+
+	timer = None
+	if timeout:
+		timer = threading.Timer( timeout, kill_process )
+		timer.daemon = True
+		timer.start( )
+
+	try:
+		if wait_callback:
+			while process.poll( ) is None:
+				wait_callback( )
+				time.sleep( POLL_INTERVAL )
+		returncode = process.wait( )
+	finally:
+		# wait for the timer thread to exit, a timer thread left waiting can raise when the interpreter shuts down
+		if timer:
+			timer.cancel( )
+			timer.join( )
+
+	reader.join( READER_JOIN_TIMEOUT if timed_out.is_set( ) else None )
+
+	if timed_out.is_set( ):
+		output.write_line( 'Process was stopped after {0} seconds'.format( timeout ) )
+
+	return returncode, timed_out.is_set( )
+
+
+def run_process( command, log_filename = None, timeout = None, retries = 0, retry_delay = RETRY_DELAY, output_callback = None, wait_callback = None ):
+	"""
+	Run a command, streaming its output line by line into a job log and an output callback
+	Attempts that time out or can not start the process are retried, a process that exits with an error is not,
+	crunchers fail the same way again on the same rule
+
+	*Arguments:*
+		* ``command`` Command line
+
+	*Keyword Arguments:*
+		* ``log_filename`` Job log the output is written to, replaced on every run
+		* ``timeout`` Seconds an attempt may run before the process is killed, None waits until it exits
+		* ``retries`` Number of times a timed out or not started process is run again
+		* ``retry_delay`` Seconds before the first retry, doubled for every retry after it
+		* ``output_callback`` Called with every output line, from the reader thread of the process
+		* ``wait_callback`` Called while the process runs, ie. wx.Yield to keep the ui responsive
+
+	*Returns:*
+		* ``Process_Result`` Outcome of the last attempt
+
+	*Examples:* ::
+
+		result = run_process( '"texture_crunch_wd.exe" "texture_crunch_wd_pc_diffuse.rule"', log_filename = 'texture_crunch_wd_pc_diffuse_output.txt', timeout = 600, retries = 2 )
+		if not result.succeeded( ):
+			print 'Crunch failed'
+	"""
+
+	log_file = None
+	log_error = None
+	if log_filename:
+		try:
+			log_dir = os.path.dirname( log_filename )
+			if log_dir and not os.path.isdir( log_dir ):
+				os.makedirs( log_dir )
+			log_file = open( log_filename, 'w' )
+		except ( IOError, OSError ) as error:
+			log_error = 'Could not write the job log: {0} {1}'.format( log_filename, error )
+
+	output = Process_Output( log_file, output_callback )
+	if log_error:
+		if output_callback:
+			output.write_line( log_error )
+		else:
+			print log_error
+	attempt = 0
+
+	try:
+		while True:
+			attempt += 1
+			if log_file:
+				with output.lock:
+					log_file.write( '# Attempt {0}: {1}\n'.format( attempt, command ) )
+
+			returncode, timed_out = run_process_once( command, output, timeout = timeout, wait_callback = wait_callback )
+
+			# only a hung or locked out process is worth another try
+			if ( returncode is not None and not timed_out ) or attempt > retries:
+				break
+
+			delay = retry_delay * 2 ** ( attempt - 1 )
+			output.write_line( 'Retrying in {0:.1f} seconds'.format( delay ) )
+			retry_time = time.time( ) + delay
+			while time.time( ) < retry_time:
+				if wait_callback:
+					wait_callback( )
+				time.sleep( min( POLL_INTERVAL, max( retry_time - time.time( ), 0 ) ) )
+	finally:
+		if log_file:
+			with output.lock:
+				log_file.close( )
+				output.log_file = None
+
+	return Process_Result( returncode, timed_out, attempt )
@@ -14,22 +14,35 @@ The main mesh must have a -90 degree rotation on the X axis
 import os
 import sys
 import struct
+import binascii
+import itertools
 import xml.dom.minidom
 import xml.etree.cElementTree
 import wx
 import wx.grid as gridlib
 import wx.lib.agw.pyprogress
-import subprocess
 import stat
 import time
 import json
+import multiprocessing
+import multiprocessing.pool
+import threading
+import Queue
 import webbrowser
 import shutil
-import ctypes
-import ctypes.wintypes
-import copy
 
-import FbxCommon
+import numpy
+
+try:
+	import FbxCommon
+except ImportError:
+	FbxCommon = None
+
+import FbxNative
+import FbxCache
+import ArtifactStore
+import ProcessGovernor
+import ProcessRunner
 
 # Debug Print Flags
 DEBUG_VERTS = False
@@ -42,6 +55,11 @@ DEBUG_BLENDSHAPES = False
 # Globals
 WORKING_DIR = None
 SMALL_LARGE_TEXTURES = { }
+# Folder of the shared store of crunched files, None turns the store off
+ARTIFACT_STORE_DIR = None
+
+# User defined properties of the scene objects, fbx object -> { property name : ( data type, value ) }
+NODE_PROPERTY_INDEX = { }
 
 # Crunchers
 PEG_CRUNCHER = 'peg_assemble_wd'
@@ -51,6 +69,30 @@ MESH_CRUNCHER = 'mesh_crunch_wd'
 TEXTURE_CRUNCHER = 'texture_crunch_wd'
 MORPH_CRUNCHER = 'morph_crunch_wd'
 CRUNCHERS = [ PEG_CRUNCHER, RIG_CRUNCHER, MAT_CRUNCHER, MESH_CRUNCHER, TEXTURE_CRUNCHER, MORPH_CRUNCHER ]
+CRUNCHER_PROCESS_NAMES = [ cruncher + '.exe' for cruncher in CRUNCHERS ]
+# cruncher processes the crunch scheduler runs at the same time, seconds between ui updates while it waits on them
+CRUNCH_WORKERS = multiprocessing.cpu_count( )
+CRUNCH_POLL_INTERVAL = 0.05
+# build plans written by the crunch scheduler for external build tools, one of each per converted mesh in the logs folder
+BUILD_PLAN_NINJA = 'ninja'
+BUILD_PLAN_MAKEFILE = 'make'
+BUILD_PLAN_FILENAMES = { BUILD_PLAN_NINJA : 'build_{0}.ninja', BUILD_PLAN_MAKEFILE : 'build_{0}.mk' }
+# textures crunched by one batched texture rule at most, a failed batch re-crunches all of its textures
+CRUNCH_BATCH_MAX_SIZE = 16
+# manifest kept in the output folder with the input hashes of every rule that crunched, unchanged rules are not crunched again
+CRUNCH_MANIFEST_NAME = 'crunch_manifest.json'
+CRUNCH_MANIFEST_VERSION = 1
+CRUNCH_MANIFEST_LOCK = threading.Lock( )
+# seconds a cruncher may run on one rule before it is killed, hung or timed out crunchers are retried with a growing delay
+CRUNCH_TIMEOUTS = { PEG_CRUNCHER : 300, RIG_CRUNCHER : 120, MAT_CRUNCHER : 300, MESH_CRUNCHER : 900, TEXTURE_CRUNCHER : 900, MORPH_CRUNCHER : 900 }
+CRUNCH_RETRIES = 2
+PACKAGE_TIMEOUT = 600
+
+# FBX Backends
+# sdk - Autodesk FbxCommon bindings, native - built-in FbxNative reader
+FBX_BACKEND_SDK = 'sdk'
+FBX_BACKEND_NATIVE = 'native'
+FBX_API = FbxCommon if FbxCommon else FbxNative
 
 # Conversion Values
 COORD_SYS_TRANSFORM = None
@@ -65,6 +107,18 @@ IS_MAYAYUP = False
 SCALE_VALUE = MAX_SCALE_VALUE
 SCENE_SCALE_CONVERSION = 0.01
 
+# Xml Writing
+# characters buffered before they are written to disk, temp file extension used while a file is written
+XML_WRITE_BUFFER_SIZE = 4 * 1024 * 1024
+XML_TEMP_EXTENSION = '.tmp'
+# threads writing the intermediate files of a conversion, the rigx, cmeshx/morphx and matlibx are written at the same time
+XML_WRITER_THREADS = 3
+
+# Skin Weights
+# cmeshx verts hold at most 4 bone/weight pairs, weights below the prune threshold are dropped before quantizing
+MAX_BONE_INFLUENCES = 4
+BONE_WEIGHT_PRUNE_THRESHOLD = 0.5 / 255.0
+
 BLENDSHAPE_NAMES = { "body_gender_female":"body gender female",
                      "body_gender_male":"body gender male",
                      "body_fat_plus":"body fat +",
@@ -416,72 +470,190 @@ class Node_Tag( object ):
 
 
 
-class Vertex_Info( object ):
+class Mesh_Buffers( object ):
 	"""
-	Store off all the data relative to a vertex
+	Store off the vertex and triangle data of a mesh as contiguous arrays
 
 	*Arguments:*
-		* ``Argument`` Enter a description for the argument here.
+		* ``positions`` Nx3 float64 vertex positions
+		* ``normals`` Nx3 float32 vertex normals
+		* ``uvs`` Nx2 float32 vertex uvs
+		* ``original_index`` N int32 control point each vertex was made from, -1 if the control point is unused
+		* ``triangles`` Mx3 uint32 vertex index of each triangle corner
+		* ``material_ids`` M uint16 material id of each triangle
+		* ``face_uvs`` Mx3x2 float32 uvs of each triangle corner
 
 	*Keyword Arguments:*
-		* ``Argument`` Enter a description for the keyword argument here.
+		* ``none``
+	"""
 
-	*Examples:* ::
+	def __init__( self, positions, normals, uvs, original_index, triangles, material_ids, face_uvs ):
 
-		Enter code examples here. (optional field)
+		self.positions = positions
+		self.normals = normals
+		self.uvs = uvs
+		self.original_index = original_index
+		self.triangles = triangles
+		self.material_ids = material_ids
+		self.face_uvs = face_uvs
 
-	*Todo:*
-		* Enter thing to do. (optional field)
 
-	*Author:*
-		* Randall Hess,   12/23/2013 9:48:50 PM
+	def get_vertex_count( self ):
+		"""
+		Get the number of verts, split verts included
+
+		*Arguments:*
+			* ``None``
+
+		*Keyword Arguments:*
+			* ``None``
+
+		*Returns:*
+			* ``int`` number of verts
+		"""
+
+		return len( self.positions )
+
+
+	def get_triangle_count( self ):
+		"""
+		Get the number of triangles
+
+		*Arguments:*
+			* ``None``
+
+		*Keyword Arguments:*
+			* ``None``
+
+		*Returns:*
+			* ``int`` number of triangles
+		"""
+
+		return len( self.triangles )
+
+
+
+class Blend_Target( object ):
 	"""
+	Store off the vert offsets of a blendshape target as arrays sorted by vert index
 
-	def __init__( self, vertex_index ):
+	*Arguments:*
+		* ``vertex_indices`` K int32 mesh vert indices, sorted
+		* ``delta_positions`` Kx3 float64 position offset of each vert
+		* ``delta_normals`` Kx3 float32 normal offset of each vert
 
-		self.index = -1
-		self.positions = [ 0, 0, 0, 0 ]
-		self.normal = [ 0, 0, 0 ]
-		self.uvs = [ 0, 0 ]
-		self.original_index = -1
+	*Keyword Arguments:*
+		* ``order`` Order the target name was first found in, the cache uses it to rebuild the blendshapes in the same order
+	"""
 
+	def __init__( self, vertex_indices, delta_positions, delta_normals, order = 0 ):
 
+		self.vertex_indices = vertex_indices
+		self.delta_positions = delta_positions
+		self.delta_normals = delta_normals
+		self.order = order
 
-class Node_Info( object ):
+
+	def get_vertex_count( self ):
+		"""
+		Get the number of verts with an offset
+
+		*Arguments:*
+			* ``None``
+
+		*Keyword Arguments:*
+			* ``None``
+
+		*Returns:*
+			* ``int`` number of verts
+		"""
+
+		return len( self.vertex_indices )
+
+
+
+class Bone_Weights( object ):
 	"""
-	Structure to hold triangle/face data for a mesh
+	Store off the skin weights of a mesh as dense per vert influence slots
+	Slots are filled in the order the clusters were read, unused slots have a bone index of -1
 
 	*Arguments:*
-	* ``node`` fbx object
-		* ``node_index`` Index of the object in the scene heirarchy
+		* ``bone_names`` List of the bone names the bone indices point to
+		* ``bone_indices`` VxK int32 bone index of each influence slot
+		* ``weights`` VxK float64 weight of each influence slot
 
 	*Keyword Arguments:*
-		* ``Argument`` Enter a description for the keyword argument here.
+		* ``none``
+	"""
 
-	*Examples:* ::
+	def __init__( self, bone_names, bone_indices, weights ):
 
-		Enter code examples here. (optional field)
+		self.bone_names = bone_names
+		self.bone_indices = bone_indices
+		self.weights = weights
 
-	*Todo:*
-		* Enter thing to do. (optional field)
 
-	*Author:*
-		* Randall Hess,   12/17/2013 8:58:16 PM
+	def get_influence_counts( self ):
+		"""
+		Get the number of bones weighting each vert
+
+		*Arguments:*
+			* ``None``
+
+		*Keyword Arguments:*
+			* ``None``
+
+		*Returns:*
+			* ``numpy.ndarray`` V int number of used influence slots of each vert
+		"""
+
+		return ( self.bone_indices >= 0 ).sum( axis = 1 )
+
+
+
+class Mesh_Snapshot( object ):
 	"""
+	Store off the raw fbx arrays of a mesh, read from the scene before the mesh is extracted
+	Only holds arrays and plain values so it can be sent to a worker process
 
-	def __init__( self, node, node_index ):
+	*Arguments:*
+		* ``name`` Name of the mesh
+		* ``vert_xform_rows`` 4x4 rows of the transform used to orient and scale the vertices
+		* ``control_points`` Nx4 fbx control points
+		* ``polygon_vertices`` Control point index of every triangle corner, None if the mesh is not triangulated
+		* ``polygon_normals`` Cx4 normal of every triangle corner
+		* ``polygon_uvs`` Cx2 uv of every triangle corner
+		* ``material_ids`` Material id of every triangle or None
+		* ``skin_clusters`` List of bone name, control point indices and weights of each skin cluster
+		* ``has_bones`` True if any skin cluster is linked to a bone
+		* ``blend_targets`` List of blendshape name and Nx4 control points of each blendshape channel
 
-		self.index = node_index
-		self.node = node
-		self.parent = node.GetParent()
+	*Keyword Arguments:*
+		* ``none``
+	"""
+
+	def __init__( self, name, vert_xform_rows, control_points, polygon_vertices, polygon_normals, polygon_uvs, material_ids, skin_clusters, has_bones, blend_targets ):
+
+		self.name = name
+		self.vert_xform_rows = vert_xform_rows
+		self.control_points = control_points
+		self.polygon_vertices = polygon_vertices
+		self.polygon_normals = polygon_normals
+		self.polygon_uvs = polygon_uvs
+		self.material_ids = material_ids
+		self.skin_clusters = skin_clusters
+		self.has_bones = has_bones
+		self.blend_targets = blend_targets
 
 
-class Face_Info( object ):
+
+class Node_Info( object ):
 	"""
 	Structure to hold triangle/face data for a mesh
 
 	*Arguments:*
-		* ``face_index`` Index of the triangle/face in the mesh
+	* ``node`` fbx object
+		* ``node_index`` Index of the object in the scene heirarchy
 
 	*Keyword Arguments:*
 		* ``Argument`` Enter a description for the keyword argument here.
@@ -497,13 +669,11 @@ class Face_Info( object ):
 		* Randall Hess,   12/17/2013 8:58:16 PM
 	"""
 
-	def __init__( self, face_index ):
-
-		self.index = face_index
-		self.material_id = 0
-		self.verts = [ 0, 0, 0 ]
-		self.indices = [ 0, 0, 0 ]
+	def __init__( self, node, node_index ):
 
+		self.index = node_index
+		self.node = node
+		self.parent = node.GetParent()
 
 
 class Material_Info( object ):
@@ -562,69 +732,238 @@ class Material_Info( object ):
 		self.pattern_map = os.path.join( WORKING_DIR, 'missing-black.tga' )
 
 
+class Xml_File_Writer( object ):
+	"""
+	Buffered writer for the converted xml files
+	Text is collected in memory and written to disk in large blocks.
+	The file can be written to a temp file first and renamed into place once it is complete,
+	so a failed conversion never leaves a partial file behind for the crunchers
+
+	*Arguments:*
+		* ``filename`` File to write
+
+	*Keyword Arguments:*
+		* ``atomic`` Write to a temp file and rename it to filename when closed
+		* ``buffer_size`` Number of characters collected before they are written to disk
+	"""
+
+	def __init__( self, filename, atomic = True, buffer_size = XML_WRITE_BUFFER_SIZE ):
+
+		self.name = filename
+		self.atomic = atomic
+		self.buffer_size = buffer_size
+		self.chunks = [ ]
+		self.chunks_size = 0
+
+		self.write_filename = filename
+		if atomic:
+			self.write_filename = filename + XML_TEMP_EXTENSION
+		self.file = open( self.write_filename, 'w' )
+
+
+	def __enter__( self ):
+		return self
+
+
+	def __exit__( self, exc_type, exc_value, traceback ):
+		if exc_type is None:
+			self.close( )
+		else:
+			self.discard( )
+		return False
+
+
+	def write( self, text ):
+		"""
+		Add text to the write buffer, the buffer is written to disk once it is full
+
+		*Arguments:*
+			* ``text`` String to write
+
+		*Keyword Arguments:*
+			* ``none``
+
+		*Returns:*
+			* ``none``
+		"""
+
+		self.chunks.append( text )
+		self.chunks_size += len( text )
+		if self.chunks_size >= self.buffer_size:
+			self.flush( )
+
+
+	def writelines( self, lines ):
+		"""
+		Add a whole section of lines to the write buffer
+
+		*Arguments:*
+			* ``lines`` List of strings to write
+
+		*Keyword Arguments:*
+			* ``none``
+
+		*Returns:*
+			* ``none``
+		"""
+
+		self.write( ''.join( lines ) )
+
+
+	def flush( self ):
+		"""
+		Write the buffered text to disk
+
+		*Arguments:*
+			* ``none``
+
+		*Keyword Arguments:*
+			* ``none``
+
+		*Returns:*
+			* ``none``
+		"""
+
+		if self.chunks:
+			self.file.write( ''.join( self.chunks ) )
+			self.chunks = [ ]
+			self.chunks_size = 0
+
+
+	def close( self ):
+		"""
+		Write the rest of the buffer and move the temp file into place
+
+		*Arguments:*
+			* ``none``
+
+		*Keyword Arguments:*
+			* ``none``
+
+		*Returns:*
+			* ``none``
+		"""
+
+		try:
+			self.flush( )
+		finally:
+			self.file.close( )
+
+		if self.atomic:
+			try:
+				# windows can not rename over an existing file
+				if os.path.lexists( self.name ):
+					os.remove( self.name )
+				os.rename( self.write_filename, self.name )
+			except OSError as error:
+				self.discard( )
+				raise IOError( error.errno, error.strerror, self.name )
+
+
+	def discard( self ):
+		"""
+		Close the file without moving it into place, the temp file is removed
+
+		*Arguments:*
+			* ``none``
+
+		*Keyword Arguments:*
+			* ``none``
+
+		*Returns:*
+			* ``none``
+		"""
+
+		self.chunks = [ ]
+		self.chunks_size = 0
+		self.file.close( )
+
+		if self.atomic and os.path.lexists( self.write_filename ):
+			try:
+				os.remove( self.write_filename )
+			except OSError:
+				pass
+
+
 def get_process( process_name ):
+	"""
+	Count the running processes of an executable, ie. crunchers still running
 
-	ps_api = ctypes.WinDLL( 'Psapi.dll' )
+	*Arguments:*
+		* ``process_name`` Executable filename, ie. texture_crunch_wd.exe
 
-	ps_api.EnumProcesses.restype = ctypes.wintypes.BOOL
-	ps_api.GetProcessImageFileNameA.restype = ctypes.wintypes.DWORD
+	*Keyword Arguments:*
+		* ``none``
 
-	kernel32 = ctypes.WinDLL( 'kernel32.dll' )
+	*Returns:*
+		* ``Int`` Number of running processes
+	"""
 
-	kernel32.OpenProcess.restype = ctypes.wintypes.HANDLE
-	kernel32.TerminateProcess.restype = ctypes.wintypes.BOOL
+	return ProcessGovernor.get_process_count( process_name.lower( ) )
 
-	MAX_PATH = 260
-	PROCESS_TERMINATE = 0x0001
-	PROCESS_QUERY_INFORMATION = 0x0400
 
-	count = 32
+def get_package_files( output_folder ):
+	"""
+	Get the unpacked asm_pc and str2_pc files of the game folder
 
-	process_count = 0
+	*Arguments:*
+		* ``output_folder`` Location of destination *_asm_pc, *_str2_pc files
 
-	while True:
-		process_ids = ( ctypes.wintypes.DWORD * count )( )
-		cb = ctypes.sizeof( process_ids )
-		bytes_returned = ctypes.wintypes.DWORD( )
+	*Keyword Arguments:*
+		* ``none``
 
-		if ps_api.EnumProcesses( ctypes.byref( process_ids ), cb, ctypes.byref( bytes_returned ) ):
-			if bytes_returned.value < cb:
-				break
+	*Returns:*
+		* ``Tuple`` asm filenames, str2 filenames
+	"""
 
-			else:
-				count *= 2
-		else:
-			raise IOError( 'Call to EnumProcesses failed' )
+	asm_files = [ ]
+	str2_files = [ ]
+	for dirpath, dirnames, filenames in os.walk( output_folder ):
+		for filename in filenames:
+			if filename.endswith( 'asm_pc' ):
+				asm_file = os.path.join( output_folder, filename )
+				if not asm_file in asm_files:
+					asm_files.append( asm_file )
+			elif filename.endswith( 'str2_pc' ):
+				str2_file = os.path.join( output_folder, filename )
+				if not str2_file in str2_files:
+					str2_files.append( str2_file )
+
+	return asm_files, str2_files
 
 
-	for index in range( bytes_returned.value / ctypes.sizeof( ctypes.wintypes.DWORD ) ):
-		process_id = process_ids[ index ]
-		h_process = kernel32.OpenProcess( PROCESS_QUERY_INFORMATION, False, process_id )
-		if h_process:
-			image_filename = ( ctypes.c_char*MAX_PATH )( )
+def get_package_command( output_folder, str2_file, asm_file, converted_folder, package_executable = 'vpkg_wd' ):
+	"""
+	Get the vpkg command line that updates a str2_pc package with the converted files
 
-			if ps_api.GetProcessImageFileNameA( h_process, image_filename, MAX_PATH ) > 0:
-				filename = os.path.basename( image_filename.value ).lower( )
+	*Arguments:*
+		* ``output_folder`` Location of destination *_asm_pc, *_str2_pc files
+		* ``str2_file`` str2_pc package to update
+		* ``asm_file`` asm_pc file of the package
+		* ``converted_folder`` Location of converted *_pc files
 
-				if filename == process_name:
-					process_count += 1
+	*Keyword Arguments:*
+		* ``package_executable`` vpkg executable to run
 
-			kernel32.CloseHandle( h_process )
+	*Returns:*
+		* ``String`` Command line
+	"""
 
-	return process_count
+	return '{0} -output_dir "{1}" -update_str2 "{2}" "{3}" "{4}\*"'.format( package_executable, output_folder, str2_file, asm_file, converted_folder )
 
 
-def package_files( converted_folder, output_folder ):
+def package_files( converted_folder, output_folder, output_callback = None, wait_callback = None ):
 	"""
 	Package the output files into str2_pc and asm_pc packages
-	Command line call to vpckg
+	Command line call to vpckg, the output of every call is written to a job log in the logs folder
 
 	*Arguments:*
 		* ``file_folder`` Location of converted *_pc files
 		* ``output_folder`` Location of destination *_asm_pc, *_str2_pc files
 
 	*Keyword Arguments:*
-		* ``Argument`` Enter a description for the keyword argument here.
+		* ``output_callback`` Called with every output line of vpkg
+		* ``wait_callback`` Called while vpkg runs, ie. wx.Yield to keep the ui responsive
 
 	*Returns:*
 		* ``Boolean`` Succeed
@@ -654,27 +993,15 @@ def package_files( converted_folder, output_folder ):
 			#if filename.endswith( '_pc' ):
 				#print ' adding converted file: {0}'.format( filename )
 
+	asm_files, str2_files = get_package_files( output_folder )
+
 	print 'Getting asm files'
-	asm_files = [ ]
-	filenames = [ ]
-	for dirpath, dirnames, filenames in os.walk( output_folder ):
-		for filename in filenames:
-			if filename.endswith( 'asm_pc' ):
-				asm_file = os.path.join( output_folder, filename )
-				if not asm_file in asm_files:
-					asm_files.append( asm_file )
-					print ' adding asm file: {0}'.format( asm_file )
+	for asm_file in asm_files:
+		print ' adding asm file: {0}'.format( asm_file )
 
 	print 'Getting str2 files'
-	str2_files = [ ]
-	filenames = [ ]
-	for dirpath, dirnames, filenames in os.walk( output_folder ):
-		for filename in filenames:
-			if filename.endswith( 'str2_pc' ):
-				str2_file = os.path.join( output_folder, filename )
-				if not str2_file in str2_files:
-					str2_files.append( str2_file )
-					print ' adding str2 file: {0}'.format( str2_file )
+	for str2_file in str2_files:
+		print ' adding str2 file: {0}'.format( str2_file )
 
 	# Backup Original Str2 and Asm files
 	backup_path = os.path.join( output_folder, 'backup' )
@@ -709,24 +1036,27 @@ def package_files( converted_folder, output_folder ):
 		for asm_file in asm_files:
 
 			command_index += 1
-			cmd = 'vpkg_wd -output_dir "{0}" -update_str2 "{1}" "{2}" "{3}\*"'.format( output_folder, str2_file, asm_file, converted_folder )
+			cmd = get_package_command( output_folder, str2_file, asm_file, converted_folder )
 			output_cmds.append( cmd )
 			print cmd
 
-			try:
-				subprocess.check_call( cmd, shell = False, stderr = subprocess.STDOUT)
-			except subprocess.CalledProcessError as error:
-				code = error.returncode
+			def on_output( line ):
+				sys.stdout.write( '  {0}\n'.format( line ) )
+				if output_callback:
+					output_callback( line )
+
+			log_filename = os.path.join( os.path.dirname( converted_folder ), 'logs', 'vpkg_wd_{0}_output.txt'.format( command_index ) )
+			result = ProcessRunner.run_process( cmd, log_filename = log_filename, timeout = PACKAGE_TIMEOUT, retries = CRUNCH_RETRIES,
+			                                    output_callback = on_output, wait_callback = wait_callback )
+			if not result.succeeded( ):
+				code = result.returncode
 				command_failed.append( command_index )
-				if code in ( 1, 2 ):
+				if code in ( 1, 2 ) or result.timed_out or code is None:
 					print 'The command failed\n  {0}'.format( cmd )
 				elif code in ( 3, 4, 5 ):
 					print 'The command had some issues\n  {0}'.format( cmd )
 
-			finally:
-				processed = True
-
-			time.sleep( 0.25 )
+			processed = True
 
 	# print out the commands that were run
 	for index in range( 0, len( output_cmds ) ):
@@ -740,22 +1070,272 @@ def package_files( converted_folder, output_folder ):
 	return False
 
 
-def crunch_rule( filename, ):
+def get_crunch_manifest_filename( rule_file ):
 	"""
-	Call the specific cruncher based on the prefix of the given filename
+	Get the crunch manifest of a rule, rules are written to the logs folder and the manifest is kept in the output folder next to it
 
 	*Arguments:*
-		* ``filename`` .rule filename
+		* ``rule_file`` Rule filename
 
 	*Keyword Arguments:*
 		* ``none``
 
 	*Returns:*
-		* ``Bool`` If the file crunched
+		* ``String`` Manifest filename
+	"""
 
-	*Examples:* ::
+	return os.path.join( os.path.dirname( os.path.dirname( rule_file ) ), 'output', CRUNCH_MANIFEST_NAME )
 
-		crunch_rule( mesh_crunch_wd_pc_Clip.rule )
+
+def load_crunch_manifest( manifest_file ):
+	"""
+	Read the crunched rule entries of a manifest
+
+	*Arguments:*
+		* ``manifest_file`` Manifest filename
+
+	*Keyword Arguments:*
+		* ``none``
+
+	*Returns:*
+		* ``Dict`` Rule name -> crunch inputs, empty if the manifest is missing, unreadable or from another version
+	"""
+
+	try:
+		with open( manifest_file, 'r' ) as manifest:
+			contents = json.load( manifest )
+	except ( IOError, ValueError ):
+		return { }
+
+	if not isinstance( contents, dict ) or contents.get( 'version' ) != CRUNCH_MANIFEST_VERSION:
+		return { }
+
+	return contents.get( 'rules', { } )
+
+
+def get_crunched_targets( manifest_file ):
+	"""
+	Get the target files of every rule recorded in a manifest, these are what lets an unchanged rule skip the cruncher
+
+	*Arguments:*
+		* ``manifest_file`` Manifest filename
+
+	*Keyword Arguments:*
+		* ``none``
+
+	*Returns:*
+		* ``Set`` Normalized target filenames
+	"""
+
+	with CRUNCH_MANIFEST_LOCK:
+		rules = load_crunch_manifest( manifest_file )
+
+	crunched_targets = set( )
+	for crunch_inputs in rules.values( ):
+		for target in crunch_inputs.get( 'targets', [ ] ):
+			crunched_targets.add( os.path.normcase( os.path.abspath( target ) ) )
+
+	return crunched_targets
+
+
+def set_crunch_manifest_entry( rule_file, crunch_inputs ):
+	"""
+	Record or remove the crunch inputs of a rule in its manifest
+	Rules can crunch at the same time, the manifest is updated under CRUNCH_MANIFEST_LOCK
+
+	*Arguments:*
+		* ``rule_file`` Rule filename
+		* ``crunch_inputs`` Inputs the rule crunched with, None removes the entry
+
+	*Keyword Arguments:*
+		* ``none``
+
+	*Returns:*
+		* ``none``
+	"""
+
+	manifest_file = get_crunch_manifest_filename( rule_file )
+	rule_name = os.path.basename( rule_file )
+
+	with CRUNCH_MANIFEST_LOCK:
+		rules = load_crunch_manifest( manifest_file )
+		if crunch_inputs is None:
+			if not rule_name in rules:
+				return
+			del rules[ rule_name ]
+		else:
+			rules[ rule_name ] = crunch_inputs
+
+		try:
+			with Xml_File_Writer( manifest_file ) as manifest:
+				manifest.write( json.dumps( { 'version' : CRUNCH_MANIFEST_VERSION, 'rules' : rules }, indent = 1, sort_keys = True ) )
+		except ( IOError, ValueError ) as error:
+			print 'WARNING: Could not update the crunch manifest: {0}\n{1}'.format( manifest_file, error )
+
+
+def get_rule_files( rule_file ):
+	"""
+	Read the source and target files of a rule
+
+	*Arguments:*
+		* ``rule_file`` Rule filename
+
+	*Keyword Arguments:*
+		* ``none``
+
+	*Returns:*
+		* ``Tuple`` Source filenames, target filenames. Raises IOError or SyntaxError if the rule can not be read
+	"""
+
+	rule = xml.etree.cElementTree.parse( rule_file ).getroot( )
+	sources = [ element.text for element in rule.iter( 'source' ) ]
+	targets = [ element.text for element in rule.iter( 'target' ) ]
+
+	return sources, targets
+
+
+def get_crunch_command( rule_file ):
+	"""
+	Get the command line that crunches a rule, the cruncher is picked by the prefix of the rule filename
+
+	*Arguments:*
+		* ``rule_file`` Rule filename
+
+	*Keyword Arguments:*
+		* ``none``
+
+	*Returns:*
+		* ``Tuple`` Command line, files the cruncher runs with. None, [ ] if no cruncher matches the rule
+	"""
+
+	shaders_file = os.path.join( WORKING_DIR, 'shaders.vpp_pc' )
+	base_filename = os.path.basename( rule_file )
+	for cruncher in CRUNCHERS:
+		if base_filename.startswith( cruncher ):
+			cruncher_file = os.path.join( WORKING_DIR, ( cruncher + '.exe' ) )
+			if cruncher in ( MESH_CRUNCHER, MAT_CRUNCHER ):
+				return '"{0}" -p "{1}" "{2}"'.format( cruncher_file, shaders_file, rule_file ), [ cruncher_file, shaders_file ]
+
+			return '"{0}" "{1}"'.format( cruncher_file, rule_file ), [ cruncher_file ]
+
+	return None, [ ]
+
+
+def get_crunch_inputs( rule_file, tool_files ):
+	"""
+	Hash everything a rule crunches from, the rule xml, every source file of the rule and the tools that crunch it
+
+	*Arguments:*
+		* ``rule_file`` Rule filename
+		* ``tool_files`` Cruncher executable and any other file the cruncher is passed, ie. shaders.vpp_pc
+
+	*Keyword Arguments:*
+		* ``none``
+
+	*Returns:*
+		* ``Dict`` Hashes and the targets of the rule, None if a file could not be read
+	"""
+
+	try:
+		sources, targets = get_rule_files( rule_file )
+
+		crunch_inputs = { 'rule' : FbxCache.get_file_hash( rule_file ),
+		                  'sources' : dict( ( source, FbxCache.get_file_hash( source ) ) for source in sources ),
+		                  'tools' : dict( ( tool_file, FbxCache.get_file_hash( tool_file ) ) for tool_file in tool_files ),
+		                  'targets' : targets }
+	except ( IOError, SyntaxError ):
+		return None
+
+	return crunch_inputs
+
+
+def get_rule_artifact_key( rule_file, crunch_inputs ):
+	"""
+	Get the artifact store key of a rule
+	The rule is normalized so the same rule written in another project folder has the same key,
+	folders are dropped from the source and target paths and the log is removed
+
+	*Arguments:*
+		* ``rule_file`` Rule filename
+		* ``crunch_inputs`` Current inputs of the rule, from get_crunch_inputs
+
+	*Keyword Arguments:*
+		* ``none``
+
+	*Returns:*
+		* ``String`` Store key, None if the rule could not be read
+	"""
+
+	try:
+		rule = xml.etree.cElementTree.parse( rule_file ).getroot( )
+	except ( IOError, SyntaxError ):
+		return None
+
+	input_hashes = [ ]
+	for element in rule.iter( ):
+		if element.tag == 'source':
+			input_hashes.append( crunch_inputs[ 'sources' ][ element.text ] )
+			element.text = os.path.basename( element.text )
+		elif element.tag == 'target':
+			element.text = os.path.basename( element.text )
+
+	for log in rule.findall( 'log' ):
+		rule.remove( log )
+
+	for tool_file in sorted( crunch_inputs[ 'tools' ], key = os.path.basename ):
+		input_hashes.append( crunch_inputs[ 'tools' ][ tool_file ] )
+
+	return ArtifactStore.get_artifact_key( xml.etree.cElementTree.tostring( rule ), input_hashes )
+
+
+def is_rule_crunched( rule_file, crunch_inputs ):
+	"""
+	Check if a rule already crunched with the same inputs and its targets are still there
+
+	*Arguments:*
+		* ``rule_file`` Rule filename
+		* ``crunch_inputs`` Current inputs of the rule, from get_crunch_inputs
+
+	*Keyword Arguments:*
+		* ``none``
+
+	*Returns:*
+		* ``Bool`` If the rule does not need to be crunched
+	"""
+
+	if not crunch_inputs:
+		return False
+
+	with CRUNCH_MANIFEST_LOCK:
+		crunched_inputs = load_crunch_manifest( get_crunch_manifest_filename( rule_file ) ).get( os.path.basename( rule_file ) )
+
+	if crunched_inputs != crunch_inputs:
+		return False
+
+	for target in crunch_inputs[ 'targets' ]:
+		if not os.path.lexists( target ):
+			return False
+
+	return True
+
+
+def crunch_rule( filename, output_callback = None ):
+	"""
+	Call the specific cruncher based on the prefix of the given filename
+	The cruncher output is written to a job log next to the rule, ie. mesh_crunch_wd_pc_Clip_output.txt
+
+	*Arguments:*
+		* ``filename`` .rule filename
+
+	*Keyword Arguments:*
+		* ``output_callback`` Called with the rule filename and every output line of the cruncher, from the cruncher thread
+
+	*Returns:*
+		* ``Bool`` If the file crunched
+
+	*Examples:* ::
+
+		crunch_rule( mesh_crunch_wd_pc_Clip.rule )
 		  mesh_crunch_wd.exe -p shaders.vpp_pc "mesh_crunch_wd_pc_Clip.rule"
 
 
@@ -785,18 +1365,62 @@ def crunch_rule( filename, ):
 
 						copied_cruncher_file = cruncher_file
 						if os.path.lexists( cruncher_file ):
-							if base_filename.startswith( MESH_CRUNCHER ) or base_filename.startswith( MAT_CRUNCHER ):
+							use_shaders = base_filename.startswith( MESH_CRUNCHER ) or base_filename.startswith( MAT_CRUNCHER )
+							crunch_command, tool_files = get_crunch_command( filename )
+
+							# skip the cruncher when the rule, its sources and the cruncher are unchanged since the rule last crunched
+							crunch_inputs = get_crunch_inputs( filename, tool_files )
+							if is_rule_crunched( filename, crunch_inputs ):
+								print ' Rule is up to date: {0}'.format( filename )
+								return True
+
+							# the targets are about to be overwritten, forget the previous crunch until this one succeeds
+							set_crunch_manifest_entry( filename, None )
+
+							# reuse the targets of the same rule crunched with the same inputs in any project
+							artifact_key = None
+							if crunch_inputs and ARTIFACT_STORE_DIR:
+								artifact_key = get_rule_artifact_key( filename, crunch_inputs )
+								if artifact_key and ArtifactStore.fetch_artifacts( ARTIFACT_STORE_DIR, artifact_key, crunch_inputs[ 'targets' ] ):
+									print ' Reused crunched files from the artifact store: {0}'.format( filename )
+									set_crunch_manifest_entry( filename, crunch_inputs )
+									return True
+
+							# targets fetched from the store are hard links, remove them so the cruncher does not write into the store
+							if crunch_inputs:
+								for target in crunch_inputs[ 'targets' ]:
+									try:
+										if os.path.lexists( target ):
+											os.remove( target )
+									except OSError:
+										pass
+
+							if use_shaders:
 								print '{0} -p {1} {2}'.format( copied_cruncher_file, shaders_file, filename )
-								retval = subprocess.call( '"{0}" -p "{1}" "{2}"'.format( copied_cruncher_file, shaders_file, filename ) )
-							else:
-								retval = subprocess.call( '"{0}" "{1}"'.format( copied_cruncher_file, filename ) )
+
+							def on_output( line ):
+								# one write per line so the output of crunchers running at the same time does not interleave
+								sys.stdout.write( '  {0}\n'.format( line ) )
+								if output_callback:
+									output_callback( filename, line )
+
+							result = ProcessRunner.run_process( crunch_command, log_filename = os.path.splitext( filename )[ 0 ] + '_output.txt',
+							                                    timeout = CRUNCH_TIMEOUTS.get( cruncher ), retries = CRUNCH_RETRIES, output_callback = on_output )
 
 							# remove the file
 							#os.remove( copied_cruncher_file )
-							if retval != 0:
-								print 'ERROR: Crunch failed.\n{0}'.format( cruncher_file )
+							if not result.succeeded( ):
+								if result.timed_out:
+									print 'ERROR: Crunch timed out after {0} attempts.\n{1}'.format( result.attempts, cruncher_file )
+								else:
+									print 'ERROR: Crunch failed.\n{0}'.format( cruncher_file )
 								return False
 
+							if crunch_inputs:
+								set_crunch_manifest_entry( filename, crunch_inputs )
+							if artifact_key:
+								ArtifactStore.store_artifacts( ARTIFACT_STORE_DIR, artifact_key, crunch_inputs[ 'targets' ] )
+
 							return True
 
 						else:
@@ -811,6 +1435,307 @@ def crunch_rule( filename, ):
 	return False
 
 
+def get_build_plan_paths( plan_format, paths ):
+	"""
+	Escape paths for the build and dependency lines of a build plan, ninja escapes with $ and make with a backslash
+
+	*Arguments:*
+		* ``plan_format`` BUILD_PLAN_NINJA or BUILD_PLAN_MAKEFILE
+		* ``paths`` Filenames
+
+	*Keyword Arguments:*
+		* ``none``
+
+	*Returns:*
+		* ``String`` Space separated escaped paths
+	"""
+
+	escaped_paths = [ ]
+	for path in paths:
+		path = path.replace( '$', '$$' )
+		if plan_format == BUILD_PLAN_NINJA:
+			path = path.replace( ' ', '$ ' ).replace( ':', '$:' )
+		else:
+			path = path.replace( '#', '\\#' ).replace( ' ', '\\ ' ).replace( ':', '\\:' )
+		escaped_paths.append( path )
+
+	return ' '.join( escaped_paths )
+
+
+class Crunch_Scheduler( object ):
+	"""
+	Crunches a set of rule files as a build graph
+	A rule is crunched once all the rules it depends on have crunched, independent rules
+	are crunched at the same time by up to max_workers cruncher processes.
+	The process governor holds back new crunchers while the machine has no free cpu or memory for them.
+	Rules that depend on a rule that failed to crunch are skipped.
+
+	*Arguments:*
+		* ``None``
+
+	*Keyword Arguments:*
+		* ``max_workers`` Number of cruncher processes run at the same time
+		* ``governor`` ProcessGovernor.Process_Governor watching the crunchers, None creates one for CRUNCHERS
+		* ``output_callback`` Called with the rule filename and every output line of its cruncher, from the cruncher threads
+
+	*Examples:* ::
+
+		scheduler = Crunch_Scheduler( )
+		texture_rule = scheduler.add_rule( write_crunch_rule( cmeshx_file, '.texture', textures = texture ) )
+		scheduler.add_rule( write_crunch_rule( cmeshx_file, '.peg', textures = [ texture ] ), depends_on = [ texture_rule ] )
+		scheduler.run( wait_callback = wx.Yield )
+	"""
+
+	def __init__( self, max_workers = CRUNCH_WORKERS, governor = None, output_callback = None ):
+
+		self.max_workers = max( 1, max_workers )
+		self.output_callback = output_callback
+		self.governor = governor or ProcessGovernor.Process_Governor( CRUNCHER_PROCESS_NAMES, max_processes = self.max_workers )
+		self.rules = [ ]
+		self.dependencies = { }
+		self.results = { }
+
+
+	def add_rule( self, rule_file, depends_on = None ):
+		"""
+		Add a rule file to crunch
+
+		*Arguments:*
+			* ``rule_file`` Rule filename
+
+		*Keyword Arguments:*
+			* ``depends_on`` Rule filenames that have to crunch before this rule, they must already be added
+
+		*Returns:*
+			* ``String`` The rule filename
+		"""
+
+		dependencies = [ ]
+		for dependency in depends_on or [ ]:
+			if not dependency in self.dependencies:
+				raise ValueError( 'Rule depends on a rule that was not added: {0}'.format( dependency ) )
+			if not dependency in dependencies:
+				dependencies.append( dependency )
+
+		# the same rule file can be requested more than once, ie. a texture used by two materials
+		if rule_file in self.dependencies:
+			for dependency in dependencies:
+				if not dependency in self.dependencies[ rule_file ]:
+					self.dependencies[ rule_file ].append( dependency )
+		else:
+			self.rules.append( rule_file )
+			self.dependencies[ rule_file ] = dependencies
+
+		return rule_file
+
+
+	def get_batch_size( self, job_count ):
+		"""
+		Get the number of jobs to batch into one rule
+		Every cruncher process pays its startup time, the jobs are split into one batch per worker
+		so every worker is kept busy with as few processes as possible
+
+		*Arguments:*
+			* ``job_count`` Number of jobs that can be batched together
+
+		*Keyword Arguments:*
+			* ``none``
+
+		*Returns:*
+			* ``Int`` Jobs per rule
+		"""
+
+		batch_size = ( job_count + self.max_workers - 1 ) // self.max_workers
+		return min( max( batch_size, 1 ), CRUNCH_BATCH_MAX_SIZE )
+
+
+	def crunch( self, rule_file, finished ):
+		"""
+		Worker thread, crunch a rule and report back when the cruncher process exits
+
+		*Arguments:*
+			* ``rule_file`` Rule filename
+			* ``finished`` Queue the rule filename and result are put on
+
+		*Keyword Arguments:*
+			* ``none``
+
+		*Returns:*
+			* ``none``
+		"""
+
+		did_crunch = False
+		try:
+			did_crunch = crunch_rule( rule_file, output_callback = self.output_callback )
+		finally:
+			finished.put( ( rule_file, did_crunch ) )
+
+
+	def run( self, wait_callback = None ):
+		"""
+		Crunch all the added rules in dependency order
+
+		*Arguments:*
+			* ``None``
+
+		*Keyword Arguments:*
+			* ``wait_callback`` Called while waiting on the cruncher processes, ie. wx.Yield to keep the ui responsive
+
+		*Returns:*
+			* ``Bool`` If every rule crunched
+		"""
+
+		finished = Queue.Queue( )
+		pending = [ rule_file for rule_file in self.rules if not rule_file in self.results ]
+		running = 0
+		start_time = time.time( )
+		rule_count = len( pending )
+
+		while pending or running:
+
+			# start the rules whose dependencies are done, at least one cruncher always runs so the rules finish
+			for rule_file in list( pending ):
+				if running >= self.max_workers:
+					break
+				if running and not self.governor.can_start( running ):
+					break
+
+				dependency_results = [ self.results.get( dependency ) for dependency in self.dependencies[ rule_file ] ]
+				if None in dependency_results:
+					continue
+
+				pending.remove( rule_file )
+				if all( dependency_results ):
+					worker = threading.Thread( target = self.crunch, args = ( rule_file, finished ) )
+					worker.daemon = True
+					worker.start( )
+					running += 1
+				else:
+					print ' Skipped crunching file: {0}\n  a rule it depends on failed to crunch'.format( rule_file )
+					self.results[ rule_file ] = False
+
+			if not running:
+				continue
+
+			# wait on a cruncher process to exit, look for room to start held back rules in between
+			self.governor.update( )
+			if wait_callback:
+				wait_callback( )
+			try:
+				rule_file, did_crunch = finished.get( True, CRUNCH_POLL_INTERVAL )
+			except Queue.Empty:
+				continue
+
+			running -= 1
+			self.results[ rule_file ] = did_crunch
+			if did_crunch:
+				print ' Crunched file: {0}'.format( rule_file )
+			else:
+				print ' Failed to crunch file: {0}'.format( rule_file )
+
+		if rule_count:
+			print 'Crunched {0} rules in {1:.2f} seconds, peak cruncher memory {2:.1f} MB'.format( rule_count, time.time( ) - start_time, self.governor.peak_rss / ( 1024.0 * 1024.0 ) )
+
+		return all( self.results.values( ) )
+
+
+	def get_build_steps( self ):
+		"""
+		Get the crunch steps of the added rules for a build plan
+
+		*Arguments:*
+			* ``None``
+
+		*Keyword Arguments:*
+			* ``none``
+
+		*Returns:*
+			* ``List`` ( rule filename, command line, input files, target files ) in dependency order,
+			  the inputs are the rule, its sources, the cruncher files and the targets of the rules it depends on
+		"""
+
+		steps = [ ]
+		rule_targets = { }
+		for rule_file in self.rules:
+			sources, targets = get_rule_files( rule_file )
+			crunch_command, tool_files = get_crunch_command( rule_file )
+			rule_targets[ rule_file ] = targets
+
+			inputs = [ rule_file ]
+			for input_file in sources + tool_files + [ target for dependency in self.dependencies[ rule_file ] for target in rule_targets[ dependency ] ]:
+				if not input_file in inputs:
+					inputs.append( input_file )
+
+			steps.append( ( rule_file, crunch_command, inputs, targets ) )
+
+		return steps
+
+
+	def write_build_plan( self, plan_dir, plan_name, package_commands = None ):
+		"""
+		Write the added rules as a ninja file and a makefile instead of crunching them
+		External build tools can then crunch them in parallel and only re-crunch what changed.
+		The default target crunches everything, the package target also runs the vpkg commands one after the other
+
+		*Arguments:*
+			* ``plan_dir`` Folder the build plans are written to
+			* ``plan_name`` Name of the build plans, ie. the converted mesh
+
+		*Keyword Arguments:*
+			* ``package_commands`` vpkg command lines that package the crunched files
+
+		*Returns:*
+			* ``List`` Build plan filenames
+		"""
+
+		steps = self.get_build_steps( )
+		package_commands = package_commands or [ ]
+		all_targets = [ target for rule_file, crunch_command, inputs, targets in steps for target in targets ]
+
+		if not os.path.isdir( plan_dir ):
+			os.makedirs( plan_dir )
+
+		ninja_file = os.path.join( plan_dir, BUILD_PLAN_FILENAMES[ BUILD_PLAN_NINJA ].format( plan_name ) )
+		with Xml_File_Writer( ninja_file ) as plan:
+			plan.write( '# Crunch plan written by the Volition FBX Converter\n\n' )
+			plan.write( 'rule crunch\n  command = $cmd\n  description = Crunching $rule_name\n\n' )
+			plan.write( 'rule package\n  command = $cmd\n  description = Packaging $str2_name\n\n' )
+
+			for rule_file, crunch_command, inputs, targets in steps:
+				plan.write( 'build {0}: crunch {1}\n'.format( get_build_plan_paths( BUILD_PLAN_NINJA, targets ), get_build_plan_paths( BUILD_PLAN_NINJA, inputs ) ) )
+				plan.write( '  cmd = {0}\n  rule_name = {1}\n\n'.format( crunch_command.replace( '$', '$$' ), os.path.basename( rule_file ).replace( '$', '$$' ) ) )
+
+			# the packages are updated in place one at a time, the steps have no output file so they always run
+			package_steps = [ ]
+			for index, package_command in enumerate( package_commands ):
+				package_step = 'package_{0}'.format( index )
+				plan.write( 'build {0}: package {1}\n'.format( package_step, get_build_plan_paths( BUILD_PLAN_NINJA, all_targets + package_steps[ -1: ] ) ) )
+				plan.write( '  cmd = {0}\n  str2_name = {1}\n\n'.format( package_command.replace( '$', '$$' ), package_step ) )
+				package_steps.append( package_step )
+
+			plan.write( 'build package: phony {0}\n\n'.format( get_build_plan_paths( BUILD_PLAN_NINJA, package_steps or all_targets ) ) )
+			plan.write( 'default {0}\n'.format( get_build_plan_paths( BUILD_PLAN_NINJA, all_targets ) ) )
+
+		makefile = os.path.join( plan_dir, BUILD_PLAN_FILENAMES[ BUILD_PLAN_MAKEFILE ].format( plan_name ) )
+		with Xml_File_Writer( makefile ) as plan:
+			plan.write( '# Crunch plan written by the Volition FBX Converter\n\n' )
+			plan.write( '.PHONY: all package\n\n' )
+			plan.write( 'all: {0}\n\n'.format( get_build_plan_paths( BUILD_PLAN_MAKEFILE, all_targets ) ) )
+
+			# the cruncher writes every target of a rule, the other targets come with the first one
+			for rule_file, crunch_command, inputs, targets in steps:
+				plan.write( '{0}: {1}\n\t{2}\n'.format( get_build_plan_paths( BUILD_PLAN_MAKEFILE, targets[ :1 ] ), get_build_plan_paths( BUILD_PLAN_MAKEFILE, inputs ), crunch_command.replace( '$', '$$' ) ) )
+				if len( targets ) > 1:
+					plan.write( '{0}: {1} ;\n'.format( get_build_plan_paths( BUILD_PLAN_MAKEFILE, targets[ 1: ] ), get_build_plan_paths( BUILD_PLAN_MAKEFILE, targets[ :1 ] ) ) )
+				plan.write( '\n' )
+
+			plan.write( 'package: all\n' )
+			for package_command in package_commands:
+				plan.write( '\t{0}\n'.format( package_command.replace( '$', '$$' ) ) )
+
+		return [ ninja_file, makefile ]
+
+
 def pretty_xml( element ):
 	"""
 	Format xml to pretty xml
@@ -878,7 +1803,7 @@ def get_shaders_from_xml( xml_file ):
 	return shader_names, material_elements
 
 
-def write_crunch_rule( filename, resource_type, textures = None ):
+def write_crunch_rule( filename, resource_type, textures = None, rule_name = None ):
 	"""
 	Write the rule to send to the cruncher
 
@@ -887,7 +1812,8 @@ def write_crunch_rule( filename, resource_type, textures = None ):
 		* ``resource_type`` The type of resource to create a rule for
 
 	*Keyword Arguments:*
-		* ``None``
+		* ``textures`` Texture of a texture rule, a list batches several textures into one rule. Textures of a peg rule
+		* ``rule_name`` Name of the rule and log file instead of the source name, ie. for batched texture rules
 
 	*Returns:*
 		* ``Value`` If any, enter a description for the return value here.
@@ -943,15 +1869,20 @@ def write_crunch_rule( filename, resource_type, textures = None ):
 	if not os.path.lexists( crunch_path ):
 		os.mkdir( crunch_path )
 
-	if not resource_type == '.peg':
+	if resource_type == '.texture':
+
+		# a batched rule lists every texture source, the targets of each texture follow in the same order
+		batch_textures = textures if isinstance( textures, list ) else [ textures ]
+		for texture in batch_textures:
+			source = xml.etree.cElementTree.SubElement( cur_platform, 'source' )
+			source.text = os.path.join( os.path.dirname( filename ), os.path.basename( texture ) )
+		base_no_ext = os.path.splitext( os.path.basename( batch_textures[ 0 ] ) )[ 0 ]
+
+	elif not resource_type == '.peg':
 
 		# write the source filename
 		source = xml.etree.cElementTree.SubElement( cur_platform, 'source' )
-		if resource_type == '.texture':
-			base_name = os.path.basename( textures )
-			source.text = os.path.join( os.path.dirname( filename ), base_name )
-
-		elif resource_type == '.morphx':
+		if resource_type == '.morphx':
 			morph_key_name = os.path.basename( filename ).replace( '_pc.morphx', '.morph_key_pc' )
 			source.text = os.path.join( crunch_path, morph_key_name )
 			source1 = xml.etree.cElementTree.SubElement( cur_platform, 'source' )
@@ -977,19 +1908,23 @@ def write_crunch_rule( filename, resource_type, textures = None ):
 
 	# output target files
 	targets = crunch_targets[ resource_type ]
-	for target in targets:
-		temp_target = xml.etree.cElementTree.SubElement( cur_platform, 'target' )
-		if resource_type == '.peg':
-			base_name = os.path.basename( filename )
-			base_no_ext = os.path.splitext( base_name )[ 0 ]
+	if resource_type == '.texture':
+		for texture in batch_textures:
+			texture_no_ext = os.path.splitext( os.path.basename( texture ) )[ 0 ]
+			for target in targets:
+				temp_target = xml.etree.cElementTree.SubElement( cur_platform, 'target' )
+				temp_target.text = os.path.join( os.path.dirname( filename ), texture_no_ext + target + platform )
+	else:
+		for target in targets:
+			temp_target = xml.etree.cElementTree.SubElement( cur_platform, 'target' )
+			if resource_type == '.peg':
+				base_name = os.path.basename( filename )
+				base_no_ext = os.path.splitext( base_name )[ 0 ]
 			target_filename = base_no_ext + target + platform
 			temp_target.text = os.path.join( crunch_path, target_filename )
-		else:
-			target_filename =  base_no_ext + target + platform
-			if resource_type == '.texture':
-				temp_target.text = os.path.join( os.path.dirname( filename ), target_filename )
-			else:
-				temp_target.text = os.path.join( crunch_path, target_filename )
+
+	if rule_name:
+		base_no_ext = rule_name
 
 	# make the log folder
 	log_path = os.path.join( os.path.dirname( filename ), 'logs' )
@@ -1049,7 +1984,7 @@ def write_matlibx( filename, materials ):
 		* Randall Hess,   11/19/2013 8:46:57 PM
 	"""
 
-	with open( filename, 'w' ) as matlibx_file:
+	with Xml_File_Writer( filename ) as matlibx_file:
 
 		# write header
 		matlibx_file.write( '<root>\n' )
@@ -1073,20 +2008,18 @@ def write_matlibx( filename, materials ):
 	return False
 
 
-def write_morphx( filename, cmeshx_filename, mesh, mesh_name, vertices, blendshapes, face_data, ordered_verts ):
+def write_morphx( filename, cmeshx_filename, mesh, mesh_name, mesh_buffers, blendshapes, ordered_verts ):
 	"""
 	Write the morphx xml file
 
 	*Arguments:*
-		* ``filename`` the *.cmeshx filepath and name
+		* ``filename`` the *.morphx filepath and name
+		* ``cmeshx_filename`` the *.cmeshx filepath and name
 		* ``mesh`` the fbx mesh node
 		* ``mesh_name`` name of the mesh
-		* ``face_data`` data identifying all of the triangles, verts, uvs and normals
-		* ``vertices`` list of vertices
-		* ``bone_order`` dictionary of fbx_nodes and the index of the bone
-		* ``tags`` list of tags or prop points on the mesh
-		* ``materials`` list of materials
-		* ``bone_weights`` list of bones, verts and their associated weight values
+		* ``mesh_buffers`` Mesh_Buffers with the triangles, verts, uvs and normals
+		* ``blendshapes`` dictionary of blendshape name -> Blend_Target
+		* ``ordered_verts`` vert indices in the order they were written to the cmeshx
 
 	*Keyword Arguments:*
 		* ``none``
@@ -1101,7 +2034,7 @@ def write_morphx( filename, cmeshx_filename, mesh, mesh_name, vertices, blendsha
 		* Randall Hess,   11/19/2013 8:46:57 PM
 	"""
 
-	with open( filename, 'w' ) as morphx_file:
+	with Xml_File_Writer( filename ) as morphx_file:
 
 		debug_output = False
 
@@ -1112,37 +2045,49 @@ def write_morphx( filename, cmeshx_filename, mesh, mesh_name, vertices, blendsha
 		morphx_file.write( '\t<compress>true</compress>\n' )
 
 
+		# map each mesh vert to the index it was written at in the cmeshx, -1 if it was not written
+		vert_order = numpy.empty( mesh_buffers.get_vertex_count( ), dtype = numpy.int64 )
+		vert_order.fill( -1 )
+		vert_order[ ordered_verts ] = numpy.arange( len( ordered_verts ) )
+
+		vert_format = '\t\t\t\t<vert>\n'
+		if DEBUG_OUTPUT:
+			vert_format += '\t\t\t\t\t%s         %s        %s\n\t\t\t\t\toriginal index: %d\n'
+		vert_format += '\t\t\t\t\t<orig_index>%d</orig_index>\n'
+		vert_format += '\t\t\t\t\t<delta_pos>%.5f %.5f %.5f</delta_pos>\n'
+		vert_format += '\t\t\t\t\t<delta_norms>%.5f %.5f %.5f</delta_norms>\n'
+		vert_format += '\t\t\t\t</vert>\n'
+
 		# write targets
 		morphx_file.write( '\t<targets>\n' )
-		for blend_name, blend_values in blendshapes.iteritems( ):
+		for blend_name, target in blendshapes.iteritems( ):
 
 			# target name, num > verts
 			morphx_file.write( '\t\t<target>\n' )
 			morphx_file.write( '\t\t\t<name>{0}</name>\n'.format( blend_name ) )
-			morphx_file.write( '\t\t\t<num_verts>{0}</num_verts>\n'.format( len( blend_values ) ) )
+			morphx_file.write( '\t\t\t<num_verts>{0}</num_verts>\n'.format( target.get_vertex_count( ) ) )
 			morphx_file.write( '\t\t\t<verts>\n' )
 
-			for vert_data in ordered_verts:
-				# vert index, pos, normal
-				for blendvert_index, blendvert_values in sorted( blend_values.iteritems( ) ):
-					if blendvert_index == vert_data.original_index:
-						morphx_file.write( '\t\t\t\t<vert>\n' )
-						vert = blendvert_values[0]
-						norm = blendvert_values[1]
+			# only the verts written to the cmeshx, in the order they were written
+			written_index = vert_order[ target.vertex_indices ]
+			keep = numpy.flatnonzero( written_index >= 0 )
+			keep = keep[ numpy.argsort( written_index[ keep ], kind = 'mergesort' ) ]
+			delta_pos = target.delta_positions[ keep ]
+			delta_norms = target.delta_normals[ keep ]
 
-						## convert the vertex floats into hex
-						#vert_x = get_float_as_hex( -vert[ 0 ] )
-						#vert_y = get_float_as_hex( vert[ 2 ] )
-						#vert_z = get_float_as_hex( -vert[ 1 ] )
+			# vert index, pos, normal
+			# adding 0.0 keeps the negated zero offsets from being written as -0.00000
+			values = numpy.column_stack( ( written_index[ keep ],
+			                               -delta_pos[ :, 0 ], delta_pos[ :, 2 ], -delta_pos[ :, 1 ],
+			                               -delta_norms[ :, 0 ], delta_norms[ :, 2 ], -delta_norms[ :, 1 ] ) ) + 0.0
+			rows = values.tolist( )
 
-						if DEBUG_OUTPUT:
-							morphx_file.write( '\t\t\t\t\t{0}         {1}        {2}\n'.format( round( -vert_data.positions[0], 5 ),  round( vert_data.positions[2], 5 ), round( -vert_data.positions[1], 5 ) ) )
-							morphx_file.write( '\t\t\t\t\toriginal index: {0}\n'.format( vert_data.original_index ) )
+			if DEBUG_OUTPUT:
+				mesh_verts = target.vertex_indices[ keep ].tolist( )
+				positions = mesh_buffers.positions[ mesh_verts ].tolist( )
+				rows = [ [ round( -pos[0], 5 ), round( pos[2], 5 ), round( -pos[1], 5 ), mesh_vert_index ] + row for pos, mesh_vert_index, row in zip( positions, mesh_verts, rows ) ]
 
-						morphx_file.write( '\t\t\t\t\t<orig_index>{0}</orig_index>\n'.format( vert_data.index ) )
-						morphx_file.write( '\t\t\t\t\t<delta_pos>{0:.5f} {1:.5f} {2:.5f}</delta_pos>\n'.format( -vert[0], vert[2], -vert[1] ) )
-						morphx_file.write( '\t\t\t\t\t<delta_norms>{0:.5f} {1:.5f} {2:.5f}</delta_norms>\n'.format( -norm[0], norm[2], -norm[1] ) )
-						morphx_file.write( '\t\t\t\t</vert>\n' )
+			morphx_file.write( get_formatted_lines( vert_format, rows ) )
 
 			morphx_file.write( '\t\t\t</verts>\n' )
 			morphx_file.write( '\t\t</target>\n' )
@@ -1155,7 +2100,7 @@ def write_morphx( filename, cmeshx_filename, mesh, mesh_name, vertices, blendsha
 	return False
 
 
-def write_cmeshx( filename, mesh, mesh_name, face_data, vertices, bone_order, tags, materials, bone_weights, static_mesh = True ):
+def write_cmeshx( filename, mesh, mesh_name, mesh_buffers, bone_order, tags, materials, bone_weights, static_mesh = True, max_influences = MAX_BONE_INFLUENCES ):
 	"""
 	Write the cmeshx xml file
 
@@ -1163,18 +2108,19 @@ def write_cmeshx( filename, mesh, mesh_name, face_data, vertices, bone_order, ta
 		* ``filename`` the *.cmeshx filepath and name
 		* ``mesh`` the fbx mesh node
 		* ``mesh_name`` name of the mesh
-		* ``face_data`` data identifying all of the triangles, verts, uvs and normals
-		* ``vertices`` list of vertices
+		* ``mesh_buffers`` Mesh_Buffers with the triangles, verts, uvs and normals
 		* ``bone_order`` dictionary of fbx_nodes and the index of the bone
 		* ``tags`` list of tags or prop points on the mesh
 		* ``materials`` list of materials
-		* ``bone_weights`` list of bones, verts and their associated weight values
+		* ``bone_weights`` Bone_Weights of the mesh verts
 
 	*Keyword Arguments:*
-		* ``none``
+		* ``static_mesh`` Write a static mesh without bones and weights
+		* ``max_influences`` Number of bones kept per vert, at most 4
 
 	*Returns:*
 		* ``bool`` bool if the file has successfully been written
+		* ``ordered_verts`` array of the vert indices in the order they were written
 
 	*Examples:* ::
 
@@ -1190,43 +2136,22 @@ def write_cmeshx( filename, mesh, mesh_name, face_data, vertices, bone_order, ta
 	global TWO_UV_SETS
 	TWO_UV_SETS= False
 
-	with open( filename, 'w' ) as cmeshx_file:
+	with Xml_File_Writer( filename ) as cmeshx_file:
 
 		debug_output = False
 
 		# **************************************************************
 		# Order (and count) the Verts
-		vert_index = 0
-		vert_indices = [ ]
-		ordered_verts = [ ]
-		for face in face_data:
-			vert_idx = 0
-			for vert_data in face.verts:
-				# make sure we haven't already written this vertex index
-				if not vert_data.index in vert_indices:
-					face.indices[ vert_idx ] = vert_index
-					vert_indices.append( vert_data.index )
-					vert = vert_data.positions
-
-					# update the indicie for the morph targets
-					ordered_vert_data = copy.deepcopy( vert_data )
-					ordered_vert_data.index = vert_index
-					ordered_vert_data.original_index = vert_data.index
-					ordered_verts.append( ordered_vert_data )
-
-					if DEBUG_OUTPUT:
-						cmeshx_file.write( '\t\t\t\tIndex: {0} Vert: {1}\n'.format( vert_index, vert_data.index ) )
-						cmeshx_file.write( '\t\t\t\t{0}         {1}        {2}\n'.format( round( -vert[0], 5 ),  round( vert[2], 5 ), round( -vert[1], 5 ) ) )
-
-					vert_index += 1
-
-				else:
-					face.indices[ vert_idx ] = vert_indices.index( vert_data.index )
-
-				vert_idx += 1
+		# ordered_verts holds the mesh vert index of each written vert, morph targets use it to remap their indices
+		ordered_verts, face_indices = get_vertex_order( mesh_buffers.triangles )
 
-			if DEBUG_OUTPUT:
-				print '\tFace: {0} Indices: {1}'.format( face.index, face.indices )
+		if DEBUG_OUTPUT:
+			for vert_index, mesh_vert_index in enumerate( ordered_verts.tolist( ) ):
+				vert = mesh_buffers.positions[ mesh_vert_index ]
+				cmeshx_file.write( '\t\t\t\tIndex: {0} Vert: {1}\n'.format( vert_index, mesh_vert_index ) )
+				cmeshx_file.write( '\t\t\t\t{0}         {1}        {2}\n'.format( round( -vert[0], 5 ),  round( vert[2], 5 ), round( -vert[1], 5 ) ) )
+			for face_index, indices in enumerate( face_indices.tolist( ) ):
+				print '\tFace: {0} Indices: {1}'.format( face_index, indices )
 
 		# write header
 		cmeshx_file.write( '<root>\n' )
@@ -1291,7 +2216,7 @@ def write_cmeshx( filename, mesh, mesh_name, face_data, vertices, bone_order, ta
 		cmeshx_file.write( '\t\t\t<name>{0}</name>\n'.format( mesh_name ) )
 		cmeshx_file.write( '\t\t\t<parentname>{0}</parentname>\n'.format( 'none' ) )
 		cmeshx_file.write( '\t\t\t<numverts>{0}</numverts>\n'.format( len( ordered_verts ) ) )
-		cmeshx_file.write( '\t\t\t<numfaces>{0}</numfaces>\n'.format( len( face_data ) ) )
+		cmeshx_file.write( '\t\t\t<numfaces>{0}</numfaces>\n'.format( len( face_indices ) ) )
 
 		# Materials
 		cmeshx_file.write( '\t\t\t<materials>\n' )
@@ -1311,17 +2236,12 @@ def write_cmeshx( filename, mesh, mesh_name, face_data, vertices, bone_order, ta
 		cmeshx_file.write( '\t\t\t\t<hex>1</hex>\n' )
 
 
-		# write the verts
-		for vert_data in ordered_verts:
-			vert = vert_data.positions
-
-			# convert the vertex floats into hex
-			vert_x = get_float_as_hex( -vert[ 0 ] )
-			vert_y = get_float_as_hex( vert[ 2 ] )
-			vert_z = get_float_as_hex( -vert[ 1 ] )
+		# convert the vertex floats into hex
+		ordered_positions = mesh_buffers.positions[ ordered_verts ]
+		verts_hex = get_floats_as_hex( numpy.column_stack( ( -ordered_positions[ :, 0 ], ordered_positions[ :, 2 ], -ordered_positions[ :, 1 ] ) ) )
 
-			# write out the converted vertex
-			cmeshx_file.write( '\t\t\t\t<v>{0} {1} {2}</v>\n'.format( vert_x, vert_y, vert_z ) )
+		# write the verts
+		cmeshx_file.writelines( [ '\t\t\t\t<v>' + vert_hex + '</v>\n' for vert_hex in verts_hex ] )
 
 		cmeshx_file.write( '\t\t\t</verts>\n' )
 
@@ -1331,74 +2251,44 @@ def write_cmeshx( filename, mesh, mesh_name, face_data, vertices, bone_order, ta
 		cmeshx_file.write( '\t\t\t<normals>\n' )
 		cmeshx_file.write( '\t\t\t\t<hex>1</hex>\n' )
 
-		# write the normals
-		vert_indices = [ ]
-		for face in face_data:
-			for vert_data in face.verts:
-				# make sure we haven't already written this vertex index
-				if not vert_data.index in vert_indices:
-					vert_indices.append( vert_data.index )
-					normal = vert_data.normal
-
-					if DEBUG_OUTPUT:
-						cmeshx_file.write( '\t\t\t\t{0}         {1}        {2}\n'.format( round( -normal[0], 5 ),  round( normal[2] , 5 ), round( -normal[1], 5 ) ) )
+		# convert the values into hex
+		ordered_normals = mesh_buffers.normals[ ordered_verts ]
+		normals_hex = get_floats_as_hex( numpy.column_stack( ( -ordered_normals[ :, 0 ], ordered_normals[ :, 2 ], -ordered_normals[ :, 1 ] ) ) )
 
-					# convert the values into hex
-					normal_x = get_float_as_hex( -normal[ 0 ] )
-					normal_y = get_float_as_hex( normal[ 2 ] )
-					normal_z = get_float_as_hex( -normal[ 1 ] )
+		if DEBUG_OUTPUT:
+			for normal in ordered_normals.tolist( ):
+				cmeshx_file.write( '\t\t\t\t{0}         {1}        {2}\n'.format( round( -normal[0], 5 ),  round( normal[2] , 5 ), round( -normal[1], 5 ) ) )
 
-					# write out the converted vertex
-					cmeshx_file.write( '\t\t\t\t<n>{0} {1} {2}</n>\n'.format( normal_x, normal_y, normal_z ) )
+		# write the normals
+		cmeshx_file.writelines( [ '\t\t\t\t<n>' + normal_hex + '</n>\n' for normal_hex in normals_hex ] )
 		cmeshx_file.write( '\t\t\t</normals>\n' )
 
 
 		# **************************************************************
 		# Faces
 		cmeshx_file.write( '\t\t\t<faces>\n' )
-		for face in face_data:
-			cmeshx_file.write( '\t\t\t\t<f>{0} {1} {2} {3}</f>\n'.format( face.indices[0], face.indices[2], face.indices[1], face.material_id ) )
-			#cmeshx_file.write( '\t\t\t\t<f>{0} {1} {2} {3}</f>\n'.format( face.indices[1], face.indices[0], face.indices[2], face.material_id ) )
+		faces = numpy.column_stack( ( face_indices[ :, 0 ], face_indices[ :, 2 ], face_indices[ :, 1 ], mesh_buffers.material_ids ) )
+		cmeshx_file.write( get_formatted_lines( '\t\t\t\t<f>%d %d %d %d</f>\n', faces ) )
 		cmeshx_file.write( '\t\t\t</faces>\n' )
 
+		# convert the uvs of every face to hex, corners are written in 0, 2, 1 order
+		face_uvs = mesh_buffers.face_uvs[ :, [ 0, 2, 1 ] ].reshape( -1, 6 )
+		face_uvs_lines = ''.join( [ '\t\t\t\t<uv>' + face_uv_hex + '</uv>\n' for face_uv_hex in get_floats_as_hex( face_uvs ) ] )
+
 		for repetition in range (0,int(TWO_UV_SETS)+1): #If TWO_UV_SETS == True -> duplicate uv data (would be better to write out an actual second uv set)
 			# **************************************************************
 			# FaceUvs
 			cmeshx_file.write( '\t\t\t<faceuvs>\n' )
 			cmeshx_file.write( '\t\t\t<hex>1</hex>\n' )
 
-			for face in face_data:
-
-				# build up the uv list for the current face, u and v for each face vertex
-				corner_index = 0
-				corner_uvs = [ 0, 0, 0, 0, 0, 0 ]
-				corner_floats = [ 0, 0, 0, 0, 0, 0 ]
-
-				for vert_data in face.verts:
-					uv = vert_data.uvs
-
-					if DEBUG_OUTPUT:
-						print 'face index: {0}, vert: {1} uvs: {2}'.format( face.index, vert_data.index, uv )
-
-					# store off the float values to print if debugging
-					corner_floats[ corner_index ] = round( uv[0], 5 )
-					corner_floats[ corner_index + 1 ] = round( uv[1], 5 )
-
-					# convert uv values to hex
-					uv_x = get_float_as_hex( uv[ 0 ] )
-					uv_y = get_float_as_hex( uv[ 1 ] )
-
-					# update the corner uv list with the proper indices
-					corner_uvs[ corner_index ] = uv_x
-					corner_uvs[ corner_index + 1 ] = uv_y
-					corner_index += 2
-
-				if DEBUG_OUTPUT:
-					cmeshx_file.write( '\t\t\t\t{0}\t\t{1}\n'.format( round( corner_floats[0], 5 ), round(  corner_floats[1], 5 ) ) )
-					cmeshx_file.write( '\t\t\t\t{0}\t\t{1}\n'.format( round( corner_floats[4], 5 ), round(  corner_floats[5], 5 ) ) )
-					cmeshx_file.write( '\t\t\t\t{0}\t\t{1}\n'.format( round( corner_floats[2], 5 ), round(  corner_floats[3], 5 ) ) )
+			if DEBUG_OUTPUT:
+				for face_index, corner_floats in enumerate( round_values( face_uvs ).tolist( ) ):
+					print 'face index: {0}, verts: {1} uvs: {2}'.format( face_index, face_indices[ face_index ], corner_floats )
+					cmeshx_file.write( '\t\t\t\t{0}\t\t{1}\n'.format( corner_floats[0], corner_floats[1] ) )
+					cmeshx_file.write( '\t\t\t\t{0}\t\t{1}\n'.format( corner_floats[2], corner_floats[3] ) )
+					cmeshx_file.write( '\t\t\t\t{0}\t\t{1}\n'.format( corner_floats[4], corner_floats[5] ) )
 
-				cmeshx_file.write( '\t\t\t\t<uv>{0} {1} {2} {3} {4} {5}</uv>\n'.format( corner_uvs[0], corner_uvs[1], corner_uvs[4], corner_uvs[5], corner_uvs[2], corner_uvs[3], face.index ) )
+			cmeshx_file.write( face_uvs_lines )
 			cmeshx_file.write( '\t\t\t</faceuvs>\n' )
 
 		if not static_mesh:
@@ -1412,51 +2302,41 @@ def write_cmeshx( filename, mesh, mesh_name, face_data, vertices, bone_order, ta
 			# **************************************************************
 			# Bone Weights
 
-			# get the vert/weight info
-			vert_indices = [ ]
-			for face in face_data:
-				vert_idx = 0
-				for vert_data in face.verts:
-					# make sure we haven't already written this vertex index
-					if not vert_data.index in vert_indices:
-
-						#face.indices[ vert_idx ] = vert_index
-						vert_indices.append( vert_data.index )
-
-						weight_info = bone_weights[ vert_data.index ]
-						if weight_info:
-
-							sorted_weight_info = sorted(weight_info.items( ), key=lambda x: -x[1])
-
-							if DEBUG_VERTS:
-								print 'Bone Weight: {2} VertIndex:{0} OriginalIndex:{1}'.format( vert_data.index, vert_data.original_index, weight_info )
-
-							# vertex weights have a max of 4 bones per vert
-							# values are paired - 0-255 to bone index
-							weight_values = [ 0, -1, 0, -1, 0, -1, 0, -1 ]
-
-							index = 0
-							for bone, weight in sorted_weight_info:
-								if index >= 8:
-									print "Warning: vert {0} has too many weights.".format( vert_data.original_index )
-									break
-
-								# get the bone_index
-								bone_index = bones[ bone ]
-
-								# get the weight value converted to a byte value
-								weight_byte = int( weight * 255.0 + 0.5 )
-
-								# replace the current index in the weight values list
-								weight_values[ index ] = weight_byte
-								weight_values[ index + 1 ] = bone_index
-
-								index += 2
-
-							cmeshx_file.write( '\t\t\t\t\t<weight>{0:d} {1:d} {2:d} {3:d} {4:d} {5:d} {6:d} {7:d}</weight>\n'.format( weight_values[0], weight_values[1], weight_values[2], weight_values[3], weight_values[4], weight_values[5], weight_values[6], weight_values[7] ) )
-
-				vert_idx += 1
-
+			# get the vert/weight info, verts without any weights are skipped
+			influence_counts = bone_weights.get_influence_counts( )[ ordered_verts ]
+			weighted_verts = ordered_verts[ influence_counts > 0 ]
+			influence_counts = influence_counts[ influence_counts > 0 ]
+
+			# vertex weights have a max of 4 bones per vert
+			vert_bone_indices, weight_bytes, clamped_count = condition_bone_weights( bone_weights, weighted_verts, max_influences = min( max_influences, 4 ) )
+			if clamped_count:
+				print "Warning: {0} verts have more than {1} weights and were clamped.".format( clamped_count, min( max_influences, 4 ) )
+
+			if DEBUG_VERTS:
+				for mesh_vert_index, vert_bones, vert_bytes in zip( weighted_verts.tolist( ), vert_bone_indices.tolist( ), weight_bytes.tolist( ) ):
+					weight_info = [ ( bone_weights.bone_names[ index ], weight_byte ) for index, weight_byte in zip( vert_bones, vert_bytes ) if index >= 0 ]
+					print 'Bone Weight: {2} VertIndex:{0} OriginalIndex:{1}'.format( mesh_vert_index, mesh_buffers.original_index[ mesh_vert_index ], weight_info )
+
+			# pad to 4 slots, unused slots have a bone index of -1
+			if vert_bone_indices.shape[ 1 ] < 4:
+				padding = 4 - vert_bone_indices.shape[ 1 ]
+				vert_bone_indices = numpy.hstack( ( vert_bone_indices, numpy.empty( ( len( weighted_verts ), padding ), dtype = vert_bone_indices.dtype ) ) )
+				vert_bone_indices[ :, -padding : ] = -1
+				weight_bytes = numpy.hstack( ( weight_bytes, numpy.zeros( ( len( weighted_verts ), padding ), dtype = weight_bytes.dtype ) ) )
+
+			# get the bone_index of each weight bone in the bone order
+			used_bones = numpy.unique( vert_bone_indices[ vert_bone_indices >= 0 ] )
+			bone_order_indices = numpy.empty( len( bone_weights.bone_names ) + 1, dtype = numpy.int64 )
+			bone_order_indices.fill( -1 )
+			for index in used_bones.tolist( ):
+				bone_order_indices[ index ] = bones[ bone_weights.bone_names[ index ] ]
+
+			# values are paired - 0-255 to bone index
+			vert_weights = numpy.empty( ( len( weighted_verts ), 8 ), dtype = numpy.int64 )
+			vert_weights[ :, 0 : : 2 ] = weight_bytes
+			vert_weights[ :, 1 : : 2 ] = bone_order_indices[ vert_bone_indices ]
+
+			cmeshx_file.write( get_formatted_lines( '\t\t\t\t\t<weight>%d %d %d %d %d %d %d %d</weight>\n', vert_weights ) )
 			cmeshx_file.write( '\t\t\t\t</vweights>\n' )
 			cmeshx_file.write( '\t\t\t</vertexweights>\n' )
 
@@ -1565,7 +2445,7 @@ def write_rigx( filename, bone_order, tags ):
 		* Randall Hess,   11/19/2013 8:46:57 PM
 	"""
 
-	with open( filename, 'w' ) as rig_file:
+	with Xml_File_Writer( filename ) as rig_file:
 
 		# write header
 		rig_file.write( '<rig>\n' )
@@ -1725,6 +2605,33 @@ def get_scaled_value( value, scale, round_val = 5 ):
 	return round( ( value / scale ), round_val )
 
 
+def round_values( values, round_val = 5 ):
+	"""
+	Round an array of values, vectorized version of get_scaled_value's rounding
+
+	numpy rounds halfway values to even where python rounds them away from zero,
+	the few values that land near a halfway point are rounded with python instead
+
+	*Arguments:*
+		* ``values`` numpy array of values
+
+	*Keyword Arguments:*
+		* ``round_val`` Number of decimals
+
+	*Returns:*
+		* ``numpy.ndarray`` rounded values
+	"""
+
+	rounded = numpy.round( values, round_val )
+
+	scaled = numpy.abs( values ) * ( 10.0 ** round_val )
+	near_half = numpy.abs( scaled - numpy.floor( scaled ) - 0.5 ) < 1e-6
+	for index in zip( *numpy.nonzero( near_half ) ):
+		rounded[ index ] = round( values[ index ], round_val )
+
+	return rounded
+
+
 def get_float_as_hex( value ):
 	"""
 	Do a conversion of the vertice float value
@@ -1757,41 +2664,169 @@ def get_float_as_hex( value ):
 	return hex_value
 
 
-def get_blendshapes( mesh, vertices, progress_dlg ):
+def get_floats_as_hex( values ):
 	"""
-	Get the blendshapes from the mesh and update the vert_dict
+	Convert an array of floats into big endian hex values, one string per row
+	Bulk version of get_float_as_hex, the whole array is packed and hexlified at once
 
 	*Arguments:*
-		* ``mesh`` The fbx mesh node
-		# ``vertices`` List of vert_infos
-		# ``progress_dlg`` dialog object
+		* ``values`` NxM array of float values
 
 	*Keyword Arguments:*
 		* ``none``
 
 	*Returns:*
-		* ``blendshapes`` dictionary of vert indices and their offset position values
+		* ``list`` space separated hex values of each row
+	"""
 
-	*Author:*
-		* Randall Hess,   11/19/2013 8:52:13 PM
+	values = numpy.ascontiguousarray( values, dtype = '>f4' )
+	if not len( values ):
+		return [ ]
+
+	hex_values = numpy.frombuffer( binascii.hexlify( values.tostring( ) ), dtype = 'S8' ).reshape( len( values ), -1 )
+
+	return [ ' '.join( row ) for row in hex_values.tolist( ) ]
+
+
+def get_formatted_lines( line_format, rows ):
 	"""
+	Format every row of values with the same line format in one pass
 
-	#blendshapes = [ ]
-	blendshapes = { }
+	*Arguments:*
+		* ``line_format`` % style format string of a single line
+		* ``rows`` List of value rows or 2D array, each row fills one line
 
-	# get the transform used to orient and scale the vertices
-	vertex_transform = compute_vertex_transform( mesh )
-	if IS_3DSMAX:
-		vert_xform_rows = [ vertex_transform.GetRow( 0 ), vertex_transform.GetRow( 2 ), vertex_transform.GetRow( 1 ), vertex_transform.GetRow( 3 ) ]
+	*Keyword Arguments:*
+		* ``none``
+
+	*Returns:*
+		* ``string`` all of the formatted lines
+	"""
+
+	if isinstance( rows, numpy.ndarray ):
+		rows = rows.tolist( )
+	if not rows:
+		return ''
+
+	return ( line_format * len( rows ) ) % tuple( itertools.chain.from_iterable( rows ) )
+
+
+def condition_bone_weights( bone_weights, vertex_indices, max_influences = MAX_BONE_INFLUENCES, prune_threshold = BONE_WEIGHT_PRUNE_THRESHOLD ):
+	"""
+	Get the heaviest bone weights of each vert ready to be written as byte values
+	The heaviest influences are kept, weights below the threshold are pruned,
+	the rest renormalized and quantized with error diffusion so the bytes sum to 255
+
+	*Arguments:*
+		* ``bone_weights`` Bone_Weights of the mesh verts
+		* ``vertex_indices`` Indices of the verts to condition
+
+	*Keyword Arguments:*
+		* ``max_influences`` Number of bones kept per vert
+		* ``prune_threshold`` Weights below this are dropped, the heaviest weight of a vert is always kept
+
+	*Returns:*
+		* ``bone_indices`` V x max_influences bone indices heaviest first, -1 for unused slots
+		* ``weight_bytes`` V x max_influences 0-255 weight of each slot
+		* ``clamped_count`` number of verts that had more than max_influences bones
+	"""
+
+	bone_indices = bone_weights.bone_indices[ vertex_indices ]
+	weights = bone_weights.weights[ vertex_indices ]
+	vertex_count = len( bone_indices )
+
+	# pad so every vert has at least max_influences slots
+	if bone_indices.shape[ 1 ] < max_influences:
+		padding = max_influences - bone_indices.shape[ 1 ]
+		bone_indices = numpy.hstack( ( bone_indices, numpy.empty( ( vertex_count, padding ), dtype = bone_indices.dtype ) ) )
+		bone_indices[ :, -padding : ] = -1
+		weights = numpy.hstack( ( weights, numpy.zeros( ( vertex_count, padding ) ) ) )
+
+	clamped_count = int( ( ( bone_indices >= 0 ).sum( axis = 1 ) > max_influences ).sum( ) )
+
+	# pick the heaviest influences, unused slots sort last
+	sort_keys = numpy.where( bone_indices >= 0, -weights, numpy.inf )
+	if sort_keys.shape[ 1 ] > max_influences:
+		heaviest = numpy.argpartition( sort_keys, max_influences - 1, axis = 1 )[ :, : max_influences ]
+		heaviest.sort( axis = 1 )
 	else:
-		vert_xform_rows = [ vertex_transform.GetRow( 0 ), -vertex_transform.GetRow( 2 ), -vertex_transform.GetRow( 1 ), vertex_transform.GetRow( 3 ) ]
+		heaviest = numpy.tile( numpy.arange( max_influences ), ( vertex_count, 1 ) )
 
-	lmesh = mesh.GetNodeAttribute( )
-	num_blendshape_deformers = lmesh.GetDeformerCount(FbxCommon.FbxDeformer.eBlendShape)
+	# heaviest first, equal weights stay in the order the clusters were read
+	rows = numpy.arange( vertex_count )[ :, numpy.newaxis ]
+	heaviest = heaviest[ rows, numpy.argsort( sort_keys[ rows, heaviest ], axis = 1, kind = 'mergesort' ) ]
+	bone_indices = bone_indices[ rows, heaviest ]
+	weights = numpy.where( bone_indices >= 0, weights[ rows, heaviest ], 0.0 )
+
+	# prune the light weights, always keeping the heaviest one
+	pruned = weights < prune_threshold
+	pruned[ :, 0 ] = False
+	bone_indices[ pruned ] = -1
+	weights[ pruned ] = 0.0
+
+	# renormalize, verts without any weight keep their zero weights
+	totals = weights.sum( axis = 1 )
+	weighted = totals > 0.0
+	weights[ weighted ] /= totals[ weighted, numpy.newaxis ]
+
+	# error diffusion, each byte is the rounded running total minus the bytes before it
+	running_bytes = numpy.floor( numpy.cumsum( weights * 255.0, axis = 1 ) + 0.5 )
+	running_bytes = numpy.minimum( running_bytes, 255.0 )
+	running_bytes[ weighted, -1 ] = 255.0
+	weight_bytes = numpy.diff( numpy.hstack( ( numpy.zeros( ( vertex_count, 1 ) ), running_bytes ) ), axis = 1 ).astype( numpy.int64 )
+
+	return bone_indices, weight_bytes, clamped_count
+
+
+def get_vertex_order( triangles ):
+	"""
+	Get the order the verts are first used in by the triangles
+	Every cmeshx section is written in this order
+
+	*Arguments:*
+		* ``triangles`` Mx3 array of vert indices
+
+	*Keyword Arguments:*
+		* ``none``
+
+	*Returns:*
+		* ``ordered_verts`` vert indices in the order they are first used
+		* ``face_indices`` Mx3 array of the triangle corners remapped to the ordered verts
+	"""
+
+	corners = numpy.asarray( triangles ).ravel( )
+	vert_indices, first_corners, corner_verts = numpy.unique( corners, return_index = True, return_inverse = True )
+
+	# sort the unique verts by the first corner that uses them
+	first_use = numpy.argsort( first_corners, kind = 'mergesort' )
+	vert_order = numpy.empty( len( first_use ), dtype = numpy.int64 )
+	vert_order[ first_use ] = numpy.arange( len( first_use ) )
+
+	return vert_indices[ first_use ], vert_order[ corner_verts ].reshape( -1, 3 )
+
+
+def get_blend_targets( lmesh ):
+	"""
+	Get the control points of the blendshape targets of a mesh
+	Only the last target shape of each channel is kept
+
+	*Arguments:*
+		* ``lmesh`` The fbx mesh
+
+	*Keyword Arguments:*
+		* ``none``
+
+	*Returns:*
+		* ``blend_targets`` List of blendshape name and Nx4 control points of each channel
+	"""
+
+	blend_targets = [ ]
+
+	num_blendshape_deformers = lmesh.GetDeformerCount(FBX_API.FbxDeformer.eBlendShape)
 	if DEBUG_BLENDSHAPES:
 		print '  Deformers: {0}'.format( num_blendshape_deformers )
 	for blendshape_index in range( num_blendshape_deformers ):
-		blendshape = lmesh.GetDeformer( blendshape_index, FbxCommon.FbxDeformer.eBlendShape )
+		blendshape = lmesh.GetDeformer( blendshape_index, FBX_API.FbxDeformer.eBlendShape )
 		if DEBUG_BLENDSHAPES:
 			print '  Blendshape: {0}'.format( blendshape.GetName( ) )
 
@@ -1806,151 +2841,155 @@ def get_blendshapes( mesh, vertices, progress_dlg ):
 				print '   Blendshape Channel: {0}'.format( blendshape_channel.GetName( ) )
 
 			num_target_shapes = blendshape_channel.GetTargetShapeCount( )
-			shape_dict = { }
-			for target_shape_index in range( num_target_shapes ):
-				target_blendshape = blendshape_channel.GetTargetShape( target_shape_index )
-				blendshape_name = target_blendshape.GetName( )
-
-				# get the blendshape mapped name if found
-				for key, value in BLENDSHAPE_NAMES.iteritems():
-					if key == blendshape_name:
-						blendshape_name = value
-						break
+			if not num_target_shapes:
+				continue
+
+			target_blendshape = blendshape_channel.GetTargetShape( num_target_shapes - 1 )
+			blendshape_name = target_blendshape.GetName( )
+
+			# get the blendshape mapped name if found
+			for key, value in BLENDSHAPE_NAMES.iteritems():
+				if key == blendshape_name:
+					blendshape_name = value
+					break
 
-				#if DEBUG_BLENDSHAPES:
-					#print '   TargetShape: {0}'.format( blendshape.GetName( ) )
-
-				num_control_points = target_blendshape.GetControlPointsCount( )
-				control_points = target_blendshape.GetControlPoints( )
-				normals = target_blendshape.GetLayer( 0 ).GetNormals( ).GetDirectArray( )
-
-				blend_verts = { }
+			blend_targets.append( ( blendshape_name, get_control_points_array( target_blendshape ) ) )
 
-					#if DEBUG_BLENDSHAPES:
-						#print '    Coordinates: {0}'.format( blend_pos )
+	return blend_targets
 
-				# compare the verts with the same index
-				vert_index = 0
-				for vert_ in vertices:
 
-					if vert_index % 5 == 0:
-							wx.Yield( )
-							progress_dlg._msg.SetLabelText( 'Getting blendshape:{0} Vert:{1}'.format( blendshape_name, vert_index ) )
-							progress_dlg.UpdatePulse( )
+def get_blendshapes( snapshot, mesh_buffers, progress_dlg, delta_tolerance = 0.0 ):
+	"""
+	Get the blendshapes from the mesh and update the vert_dict
+
+	*Arguments:*
+		* ``snapshot`` Mesh_Snapshot of the mesh
+		# ``mesh_buffers`` Mesh_Buffers of the mesh
+		# ``progress_dlg`` dialog object or None
+
+	*Keyword Arguments:*
+		* ``delta_tolerance`` Offsets this small or smaller are treated as unchanged, 0 for exact matches
+
+	*Returns:*
+		* ``blendshapes`` dictionary of blendshape name -> Blend_Target
 
-					for index in range( num_control_points ):
-						#if DEBUG_BLENDSHAPES:
-							#print '    Control Point: {0}'.format( index )
-							#print '    Coordinates: {0}'.format( control_points[ index ] )
+	*Author:*
+		* Randall Hess,   11/19/2013 8:52:13 PM
+	"""
 
-						blend_index = index
-						matched_index = False
+	#blendshapes = [ ]
+	blendshapes = { }
 
-						# Match the index to the current or duplicated original index
-						if vert_.original_index == index:
-							matched_index = True
-							blend_index = index
-						elif vert_.index == index:
-							matched_index = True
-							blend_index = index
+	# the base verts have no w value, compare them as points with a w of 0
+	base_points = numpy.column_stack( ( mesh_buffers.positions, numpy.zeros( mesh_buffers.get_vertex_count( ) ) ) )
+	original_index = mesh_buffers.original_index
 
+	for blendshape_name, control_points in snapshot.blend_targets:
 
-						if matched_index and not vert_.original_index == -1:
-							blend_index = vert_.index
+		if progress_dlg:
+			wx.Yield( )
+			progress_dlg._msg.SetLabelText( 'Getting blendshape:{0}'.format( blendshape_name ) )
+			progress_dlg.UpdatePulse( )
 
-						if matched_index:
-							if DEBUG_BLENDSHAPES:
-								#print '    Vert:  {0}'.format ( vert_index )
-								#print '    Control Point: {0} Vertice Index: {0}'.format( index, blend_index )
-								vert_index += 1
+		# convert the shape points the same way as the base mesh points
+		shape_points = transform_points( control_points, snapshot.vert_xform_rows )
 
-							vert = control_points[ index ]
+		# gather the shape point each vert was made from
+		vertex_indices = numpy.flatnonzero( ( original_index >= 0 ) & ( original_index < len( shape_points ) ) )
+		deltas = shape_points[ original_index[ vertex_indices ] ] - base_points[ vertex_indices ]
 
-							if IS_MAYAYUP:
-								vector = [ vert[0], vert[1], vert[2], vert[3] ]
-								vert_converted = matrix_multiply( vert_xform_rows, vector )
-								vert_x = get_scaled_value( vert_converted[0], 1 )
-								vert_y = get_scaled_value( vert_converted[1], 1 )
-								vert_z = get_scaled_value( vert_converted[2], 1 )
-								vert_w = get_scaled_value( vert_converted[3], 1 )
+		# only keep verts with a changed component, unchanged components get a 0 offset
+		changed = numpy.abs( deltas ) > delta_tolerance
+		touched = changed.any( axis = 1 )
+		vertex_indices = vertex_indices[ touched ].astype( numpy.int32 )
+		delta_positions = numpy.where( changed[ touched, : 3 ], deltas[ touched, : 3 ], 0.0 )
 
-							elif IS_3DSMAX:
-								scale_inches_to_meters = 39.3701
-								vert_x = get_scaled_value( vert[0], scale_inches_to_meters )
-								vert_y = get_scaled_value( vert[1], scale_inches_to_meters )
-								vert_z = get_scaled_value( vert[2], scale_inches_to_meters )
-								vert_w = get_scaled_value( vert[3], scale_inches_to_meters )
+		if DEBUG_BLENDSHAPES:
+			for vertex_index, delta in zip( vertex_indices.tolist( ), delta_positions.tolist( ) ):
+				print ''
+				print '    Control Point: {0} Vertice Index: {1}'.format( original_index[ vertex_index ], vertex_index )
+				print '    Base Vert:   {0}'.format( base_points[ vertex_index ].tolist( ) )
+				print '    Blend Vert:  {0}'.format( delta )
+
+		# keep the order the name was first found in when a later channel replaces it
+		if blendshape_name in blendshapes:
+			order = blendshapes[ blendshape_name ].order
+		else:
+			order = len( blendshapes )
 
+		# Normals are busted.  Just spit out zeroes.
+		delta_normals = numpy.zeros( delta_positions.shape, dtype = numpy.float32 )
 
-							blend_pos = [ vert_x, vert_y, vert_z, vert_w ]
+		blendshapes[ blendshape_name ] = Blend_Target( vertex_indices, delta_positions, delta_normals, order )
 
-							# only write out verts that have different values
-							if not vert_.positions == blend_pos:
+	return blendshapes
 
-								new_pos = [0,0,0]
-								for component in range(0, 3):
-									if not vert_.positions[component] == blend_pos[component]:
-										delta = blend_pos[component] - vert_.positions[component]
-										new_pos[component] = delta
 
-								blend_pos = new_pos
+def get_skin_clusters( lmesh, in_bones, get_weights = True ):
+	"""
+	Get the bone and the weighted control points of every skin cluster of a mesh
 
+	*Arguments:*
+		* ``lmesh`` The fbx mesh
+		* ``in_bones`` List of the scene bones the cluster links are matched with
 
-								#if not vert_.positions == blend_pos:
-								if DEBUG_BLENDSHAPES:
-									print ''
-									print '    Vert:  {0}'.format ( vert_index )
-									print '    Control Point: {0} Vertice Index: {0}'.format( index, blend_index )
-									print '    Base Vert:   {0}'.format( vert_.positions )
-									print '    Blend Vert:  {0}'.format( blend_pos )
-									#print '     ADDING Blend Vert: {0}'.format( index )
-									#print '     Normal Vector: {0}'.format( normals.GetAt( index ) )
+	*Keyword Arguments:*
+		* ``get_weights`` Read the control point indices and weights, off to only get the bones
 
-								# triangle, Normals
-								normal = normals.GetAt( index )
+	*Returns:*
+		* ``skin_clusters`` List of bone name, control point indices and weights of each cluster
+		* ``bones`` dictionary of bone name -> fbx link node
+	"""
 
-								if IS_MAYAYUP:
-									vector = [ normal[0], normal[1], normal[2], normal[3] ]
-									norm_converted = matrix_multiply( vert_xform_rows, vector )
-									norm_x = get_scaled_value( norm_converted[ 0 ], 1.0 )
-									norm_y = get_scaled_value( norm_converted[ 1 ], 1.0 )
-									norm_z = get_scaled_value( norm_converted[ 2 ], 1.0 )
-									norm_w = get_scaled_value( norm_converted[ 3 ], 1.0 )
+	# fbx link node -> name of the already found bone_node, first match wins
+	bone_node_names = { }
+	for bone in reversed( in_bones ):
+		bone_node_names[ bone.node ] = bone.name
 
-								elif IS_3DSMAX:
-									norm_x = get_scaled_value( normal[ 0 ], 1.0 )
-									norm_y = get_scaled_value( normal[ 1 ], 1.0 )
-									norm_z = get_scaled_value( normal[ 2 ], 1.0 )
-									norm_w = get_scaled_value( normal[ 3 ], 1.0 )
+	skin_clusters = [ ]
+	bones = {}
 
-								new_normal = [ norm_x, norm_y, norm_z, norm_w ]
+	number_skin_deformers= lmesh.GetDeformerCount( FBX_API.FbxDeformer.eSkin )
+	for skin_index in range( number_skin_deformers ):
+		cluster_count = lmesh.GetDeformer( skin_index, FBX_API.FbxDeformer.eSkin ).GetClusterCount( )
+		for cluster_index in range( cluster_count ):
+			cluster = lmesh.GetDeformer( skin_index, FBX_API.FbxDeformer.eSkin ).GetCluster( cluster_index )
 
-								delta_normal = [0,0,0]
+			# get the current bone/link name
+			if cluster.GetLink( ):
 
-								# Normals are busted.  Just spit out zeroes.
-								#for component in range(0, 3):
-									#delta_normal = new_normal[component] - vert_.normal[component]
+				# associate the link/bone with an already found bone_node
+				bone_node = cluster.GetLink( )
+				bone_name = bone_node_names.get( bone_node )
+				if bone_name is None:
+					bone_name = bone_node.GetName( )
 
-								blend_verts[ blend_index ] = [ blend_pos, delta_normal ]
+				# store off the current bone
+				if not bones.get( bone_name ):
+					bones[ bone_name ] = bone_node
 
-			blendshapes[ blendshape_name ] = blend_verts
+				if get_weights:
+					lIndices = numpy.array( cluster.GetControlPointIndices( ), dtype = numpy.int64 )
+					lWeights = numpy.array( cluster.GetControlPointWeights( ), dtype = numpy.float64 )
+					skin_clusters.append( ( bone_name, lIndices, lWeights ) )
 
-	return blendshapes
+	return skin_clusters, bones
 
 
-def get_boneweights( mesh, vertices, in_bones, progress_dlg ):
+def get_boneweights( skin_clusters, mesh_buffers, progress_dlg ):
 	"""
 	Get the bone weight values from the mesh and update the vert_dict
 
 	*Arguments:*
-		* ``mesh`` The fbx mesh node
-		# ``vertices`` List of vert_infos
+		* ``skin_clusters`` List of bone name, control point indices and weights of each cluster
+		# ``mesh_buffers`` Mesh_Buffers of the mesh
+		# ``progress_dlg`` dialog object or None
 
 	*Keyword Arguments:*
 		* ``none``
 
 	*Returns:*
-		* ``bone_weights`` dictionary of verts and their bone/weight values
+		* ``bone_weights`` Bone_Weights of the mesh verts
 
 	*Examples:* ::
 
@@ -1959,135 +2998,376 @@ def get_boneweights( mesh, vertices, in_bones, progress_dlg ):
 	*Todo:*
 		* Enter thing to do. (optional field)
 
-	*Author:*
-		* Randall Hess,   11/19/2013 8:52:13 PM
+	*Author:*
+		* Randall Hess,   11/19/2013 8:52:13 PM
+	"""
+
+	# control point -> verts made from it, the verts sorted by control point
+	original_index = mesh_buffers.original_index
+	control_point_verts = numpy.argsort( original_index, kind = 'mergesort' )
+	sorted_original_index = original_index[ control_point_verts ]
+
+	vertex_count = mesh_buffers.get_vertex_count( )
+	bone_names = [ ]
+	bone_name_lookup = { }
+	bone_indices = numpy.empty( ( vertex_count, 4 ), dtype = numpy.int32 )
+	bone_indices.fill( -1 )
+	weights = numpy.zeros( ( vertex_count, 4 ), dtype = numpy.float64 )
+	influence_counts = numpy.zeros( vertex_count, dtype = numpy.int64 )
+
+	do_pulse_update = progress_dlg and vertex_count > 500
+
+	for cluster_index, ( bone_name, lIndices, lWeights ) in enumerate( skin_clusters ):
+
+		if do_pulse_update:
+			wx.Yield( )
+			progress_dlg._msg.SetLabelText( 'Getting bone cluster:{0}'.format( cluster_index ) )
+			progress_dlg.UpdatePulse( )
+
+		if not len( lIndices ):
+			continue
+
+		# a control point listed twice keeps its last weight
+		lIndices, last_index = numpy.unique( lIndices[ : : -1 ], return_index = True )
+		lWeights = lWeights[ : : -1 ][ last_index ]
+
+		# weight the vert of each control point and any verts split from it
+		first = numpy.searchsorted( sorted_original_index, lIndices, side = 'left' )
+		vert_counts = numpy.searchsorted( sorted_original_index, lIndices, side = 'right' ) - first
+		total = vert_counts.sum( )
+		if not total:
+			continue
+		offsets = numpy.arange( total ) - numpy.repeat( numpy.cumsum( vert_counts ) - vert_counts, vert_counts )
+		vertex_indices = control_point_verts[ numpy.repeat( first, vert_counts ) + offsets ]
+		vertex_weights = numpy.repeat( lWeights, vert_counts )
+
+		if DEBUG_WEIGHTS:
+			for vertex_index, weight in zip( vertex_indices.tolist( ), vertex_weights.tolist( ) ):
+				print 'Vert {0} original index is indice: {1}'.format( vertex_index, original_index[ vertex_index ] )
+				print ' weighting vert {0} bone {1} weight {2}'.format( vertex_index, bone_name, weight )
+
+		bone_index = bone_name_lookup.get( bone_name )
+		if bone_index is None:
+			bone_index = bone_name_lookup[ bone_name ] = len( bone_names )
+			bone_names.append( bone_name )
+
+		# a bone already weighting the vert has its weight replaced, otherwise the next free slot is used
+		has_bone = bone_indices[ vertex_indices ] == bone_index
+		slots = numpy.where( has_bone.any( axis = 1 ), has_bone.argmax( axis = 1 ), influence_counts[ vertex_indices ] )
+
+		# grow the slots when a vert gets more bones than there are slots
+		if slots.max( ) >= bone_indices.shape[ 1 ]:
+			extra_slots = bone_indices.shape[ 1 ]
+			bone_indices = numpy.hstack( ( bone_indices, numpy.empty( ( vertex_count, extra_slots ), dtype = numpy.int32 ) ) )
+			bone_indices[ :, extra_slots : ] = -1
+			weights = numpy.hstack( ( weights, numpy.zeros( ( vertex_count, extra_slots ), dtype = numpy.float64 ) ) )
+
+		bone_indices[ vertex_indices, slots ] = bone_index
+		weights[ vertex_indices, slots ] = vertex_weights
+		influence_counts[ vertex_indices ] = numpy.maximum( influence_counts[ vertex_indices ], slots + 1 )
+
+	bone_weights = Bone_Weights( bone_names, bone_indices, weights )
+
+	if DEBUG_WEIGHTS:
+		print '\n----------------'
+		print 'Vertex Weights'
+		print '----------------'
+		for vertex_index in numpy.flatnonzero( original_index >= 0 ).tolist( ):
+			used = bone_indices[ vertex_index ] >= 0
+			print ' vert: {0}    weights: {1}'.format( vertex_index, zip( [ bone_names[ index ] for index in bone_indices[ vertex_index ][ used ].tolist( ) ], weights[ vertex_index ][ used ].tolist( ) ) )
+		print '\n'
+
+	return bone_weights
+
+
+def matrix_multiply( matrix, vector ):
+	"""
+	Matrix multiply a vector
+	found online, stack overflow i think :/
+
+	*Arguments:*
+		* ``matrix`` matrix
+		* ``vector`` vector to multiply
+
+	*Keyword Arguments:*
+		* ``none``
+
+	*Returns:*
+		* ``vector`` vector after being multiplied by a transform matrix
+
+	*Author:*
+		* Randall Hess, randall.hess@volition-inc.com, 4/28/2014 10:03:55 PM
+	"""
+
+	rows = len( matrix )
+	w = [0]*rows
+	irange = range( len( vector ) )
+	sum = 0
+	for j in range( rows ):
+		r = matrix[j]
+		for i in irange:
+			sum += r[i]*vector[i]
+		w[j],sum = sum,0
+	return w
+
+
+def get_control_points_array( geometry ):
+	"""
+	Get the control points of a mesh or shape as an array
+
+	*Arguments:*
+		* ``geometry`` Fbx mesh or shape
+
+	*Keyword Arguments:*
+		* ``none``
+
+	*Returns:*
+		* ``numpy.ndarray`` ( N, 4 ) array of control points
+	"""
+
+	# the built-in reader already stores the points as an array
+	if hasattr( geometry, 'GetControlPointsArray' ):
+		return geometry.GetControlPointsArray( )
+
+	control_points = geometry.GetControlPoints( )
+	return numpy.array( [ [ point[0], point[1], point[2], point[3] ] for point in control_points ], dtype = numpy.float64 ).reshape( -1, 4 )
+
+
+def transform_points( points, vert_xform_rows, scale_max_units = True ):
+	"""
+	Convert an array of fbx points into volition space and round them
+	Vectorized version of the matrix_multiply/get_scaled_value conversion
+
+	*Arguments:*
+		* ``points`` ( N, 4 ) array of fbx points
+		* ``vert_xform_rows`` Rows of the vertex transform
+
+	*Keyword Arguments:*
+		* ``scale_max_units`` Scale 3dsmax values from inches to meters, off for normals
+
+	*Returns:*
+		* ``numpy.ndarray`` ( N, 4 ) array of converted points
+	"""
+
+	points = numpy.asarray( points, dtype = numpy.float64 ).reshape( -1, 4 )
+
+	if IS_MAYAYUP:
+		# multiply every point by the vertex transform,
+		# summed column by column in the same order as matrix_multiply
+		matrix = numpy.array( [ [ row[0], row[1], row[2], row[3] ] for row in vert_xform_rows ], dtype = numpy.float64 )
+		converted = numpy.zeros( points.shape )
+		for column in range( 4 ):
+			converted += points[ :, column : column + 1 ] * matrix[ :, column ]
+
+	elif scale_max_units:
+		# 3dsmax points only need the inches to meters scale
+		converted = points / MAX_SCALE_VALUE
+
+	else:
+		converted = points
+
+	return round_values( converted )
+
+
+def get_fbx_array_values( fbx_array, width = 0 ):
+	"""
+	Read a layer element direct or index array into a numpy array
+
+	*Arguments:*
+		* ``fbx_array`` Fbx layer element array
+
+	*Keyword Arguments:*
+		* ``width`` Number of components per value, 0 for index arrays
+
+	*Returns:*
+		* ``numpy.ndarray`` ( N, width ) array of values or ( N, ) array of indices
+	"""
+
+	# the built-in reader already stores the values as an array
+	if hasattr( fbx_array, 'GetValuesArray' ):
+		return fbx_array.GetValuesArray( )
+
+	values = [ fbx_array.GetAt( index ) for index in range( fbx_array.GetCount( ) ) ]
+	if not width:
+		return numpy.array( values, dtype = numpy.int64 )
+
+	return numpy.array( [ [ value[ component ] for component in range( width ) ] for value in values ], dtype = numpy.float64 ).reshape( -1, width )
+
+
+def get_layer_element_indices( layer_element, polygon_vertices ):
+	"""
+	Get the direct array index of a layer element for every polygon vertex of a triangle mesh
+
+	*Arguments:*
+		* ``layer_element`` Fbx layer element, normals or uvs
+		* ``polygon_vertices`` Control point index of every polygon vertex
+
+	*Keyword Arguments:*
+		* ``none``
+
+	*Returns:*
+		* ``numpy.ndarray`` direct array indices
 	"""
 
-	bone_weights = { }
-	for vert in vertices:
-		bone_weights[ vert.index ] = { }
+	num_polygon_verts = len( polygon_vertices )
+	mapping_mode = layer_element.GetMappingMode( )
 
-	do_pulse_update = len( vertices ) > 500
+	if mapping_mode == FBX_API.FbxLayerElement.eByControlPoint:
+		indices = polygon_vertices
+	elif mapping_mode == FBX_API.FbxLayerElement.eByPolygonVertex:
+		indices = numpy.arange( num_polygon_verts )
+	elif mapping_mode == FBX_API.FbxLayerElement.eByPolygon:
+		indices = numpy.arange( num_polygon_verts ) // 3
+	else:
+		indices = numpy.zeros( num_polygon_verts, dtype = numpy.int64 )
 
-	bones = {}
+	if layer_element.GetReferenceMode( ) != FBX_API.FbxLayerElement.eDirect:
+		indices = get_fbx_array_values( layer_element.GetIndexArray( ) )[ indices ]
 
-	number_skin_deformers= mesh.GetDeformerCount( FbxCommon.FbxDeformer.eSkin )
-	for skin_index in range( number_skin_deformers ):
-		cluster_count = mesh.GetDeformer( skin_index, FbxCommon.FbxDeformer.eSkin ).GetClusterCount( )
-		for cluster_index in range( cluster_count ):
-			cluster = mesh.GetDeformer( skin_index, FbxCommon.FbxDeformer.eSkin ).GetCluster( cluster_index )
+	return indices
 
-			# get the current bone/link name
-			bone_name = None
-			if cluster.GetLink( ):
 
-				# associate the link/bone with an already found bone_node
-				found_bone = False
-				bone_node = cluster.GetLink( )
-				for bone in in_bones:
-					if bone.node == bone_node:
-						bone_name = bone.name
-						found_bone = True
-						break
+def get_polygon_vertex_data( lmesh, uv_name ):
+	"""
+	Get the control point, normal and uv of every triangle corner and the material id of every triangle
+	The layer element arrays are read once instead of querying each polygon vertex
 
-				if not found_bone:
-					bone_name = cluster.GetLink( ).GetName( )
+	*Arguments:*
+		* ``lmesh`` Fbx mesh, must be triangulated
+		* ``uv_name`` Name of the uv set to read
 
-				# store off the current bone
-				bone_key = None
-				try:
-					bone_key = bones[ bone_name ]
-				except KeyError:
-					pass
+	*Keyword Arguments:*
+		* ``none``
 
-				if not bone_key:
-					bones[ bone_name ] =  cluster.GetLink( )
+	*Returns:*
+		* ``polygon_vertices`` ( N * 3, ) control point indices
+		* ``normals`` ( N * 3, 4 ) array of normals
+		* ``uvs`` ( N * 3, 2 ) array of uvs
+		* ``material_ids`` ( N, ) array of material ids or None
+	"""
 
-				#lIndexCount = cluster.GetControlPointIndicesCount()
-				lIndices = cluster.GetControlPointIndices( )
-				lWeights = cluster.GetControlPointWeights( )
+	polygon_vertices = numpy.array( lmesh.GetPolygonVertices( ), dtype = numpy.int64 )
+	num_polygon_verts = len( polygon_vertices )
+	layer_element = lmesh.GetLayer( 0 )
 
-				# update the bone_weights with the associated bone & weight/values
-				index = 0
-				for indice in lIndices:
+	# normals, meshes without normals get the default vector
+	normals = numpy.tile( [ 0.0, 0.0, 0.0, 1.0 ], ( num_polygon_verts, 1 ) )
+	normal_element = layer_element.GetNormals( )
+	if normal_element:
+		normals = get_fbx_array_values( normal_element.GetDirectArray( ), 4 )[ get_layer_element_indices( normal_element, polygon_vertices ) ]
+
+	# uvs, from the first uv set with a matching name in any layer
+	uvs = numpy.zeros( ( num_polygon_verts, 2 ) )
+	uv_element = None
+	for layer_index in range( lmesh.GetLayerCount( ) ):
+		for layer_uv_element in lmesh.GetLayer( layer_index ).GetUVSets( ):
+			if layer_uv_element and layer_uv_element.GetName( ) == uv_name:
+				uv_element = layer_uv_element
+				break
+		if uv_element:
+			break
+	if uv_element:
+		uvs = get_fbx_array_values( uv_element.GetDirectArray( ), 2 )[ get_layer_element_indices( uv_element, polygon_vertices ) ]
+
+	# material ids
+	material_ids = None
+	material_element = layer_element.GetMaterials( )
+	if material_element:
+		material_ids = get_fbx_array_values( material_element.GetIndexArray( ) )
+		if material_element.GetMappingMode( ) == FBX_API.FbxLayerElement.eAllSame:
+			material_ids = numpy.repeat( material_ids[ : 1 ], num_polygon_verts // 3 )
+		else:
+			material_ids = material_ids[ : num_polygon_verts // 3 ]
 
-					if do_pulse_update:
-						if index % 5 == 0:
-							wx.Yield( )
-							progress_dlg._msg.SetLabelText( 'Getting bone cluster:{0} Vert:{1}'.format( cluster_index, index ) )
-							progress_dlg.UpdatePulse( )
+	return polygon_vertices, normals, uvs, material_ids
 
-					for vert in vertices:
-						if vert.index == indice:
-							if DEBUG_WEIGHTS:
-								print 'Vert index {0} is indice: {1}'.format( vert.index, indice )
-								print ' weighting vert {0} bone {1} weight {2}'.format( vert.index, bone_name, lWeights[ index ] )
-							bone_weights[ indice ][ bone_name ] = lWeights[ index ]
 
-						elif not vert.original_index == -1 and vert.original_index == indice:
-							if DEBUG_WEIGHTS:
-								print 'Vert original index {0} is indice: {1}'.format( vert.index, indice )
-								print ' weighting vert {0} bone {1} weight {2}'.format( vert.index, bone_name, lWeights[ index ] )
-							bone_weights[ vert.index ][ bone_name ] = lWeights[ index ]
-					index += 1
+def get_weld_keys( values, weld_epsilon = 0.0 ):
+	"""
+	Get a hashable key of the position, normal and uv values of each triangle corner
+	Corners with the same key are welded together
 
-	# print out the vert_dict
-	assert isinstance( bone_weights, dict )
+	*Arguments:*
+		* ``values`` Nx8 array of the position, normal and uv values of each corner
 
-	if DEBUG_WEIGHTS:
-		print '\n----------------'
-		print 'Vertex Weights'
-		print '----------------'
-		for key, value in bone_weights.iteritems( ):
-			print ' vert: {0}    weights: {1}'.format( key, value )
-		print '\n'
+	*Keyword Arguments:*
+		* ``weld_epsilon`` Tolerance the values are quantized to, 0 for exact values
+
+	*Returns:*
+		* ``list`` key tuple of each corner
+	"""
 
-	return bone_weights, bones
+	if weld_epsilon:
+		values = numpy.floor( values / weld_epsilon + 0.5 ).astype( numpy.int64 )
 
+	return [ tuple( row ) for row in values.tolist( ) ]
 
-def matrix_multiply( matrix, vector ):
+
+def get_mesh_snapshot( mesh, in_bones ):
 	"""
-	Matrix multiply a vector
-	found online, stack overflow i think :/
+	Read the raw arrays of a mesh, its skin clusters and blendshape targets out of the fbx scene
+	The rest of the extraction only works on the snapshot so it can run in a worker process
 
 	*Arguments:*
-		* ``matrix`` matrix
-		* ``vector`` vector to multiply
+		* ``mesh`` FBX mesh node, triangulated
+		* ``in_bones`` List of the scene bones the skin clusters are matched with
 
 	*Keyword Arguments:*
 		* ``none``
 
 	*Returns:*
-		* ``vector`` vector after being multiplied by a transform matrix
-
-	*Author:*
-		* Randall Hess, randall.hess@volition-inc.com, 4/28/2014 10:03:55 PM
+		* ``snapshot`` Mesh_Snapshot of the mesh
 	"""
 
-	rows = len( matrix )
-	w = [0]*rows
-	irange = range( len( vector ) )
-	sum = 0
-	for j in range( rows ):
-		r = matrix[j]
-		for i in irange:
-			sum += r[i]*vector[i]
-		w[j],sum = sum,0
-	return w
+	lmesh = mesh.GetNodeAttribute( )
+
+	# get the transform used to orient and scale the vertices
+	vertex_transform = compute_vertex_transform( mesh )
+	#3dsmax
+	if IS_3DSMAX:
+		vert_xform_rows = [ vertex_transform.GetRow( 0 ), vertex_transform.GetRow( 2 ), vertex_transform.GetRow( 1 ), vertex_transform.GetRow( 3 ) ]
+	else:
+		vert_xform_rows = [ vertex_transform.GetRow( 0 ), -vertex_transform.GetRow( 2 ), -vertex_transform.GetRow( 1 ), vertex_transform.GetRow( 3 ) ]
+	vert_xform_rows = numpy.array( [ [ row[0], row[1], row[2], row[3] ] for row in vert_xform_rows ], dtype = numpy.float64 )
+
+	# get the fbx verts
+	control_points = numpy.asarray( get_control_points_array( lmesh ), dtype = numpy.float64 )
+
+	# get the face data, meshes without a layer or triangles have none
+	polygon_vertices = polygon_normals = polygon_uvs = material_ids = None
+	# TODO - Handle Multiple Layers
+	layer_element = lmesh.GetLayer( 0 )
+	if layer_element and lmesh.IsTriangleMesh( ):
+
+		# get the uv channel name
+		uv_elements = layer_element.GetUVSets( )
+		uv_name = ''
+		for uv_element in uv_elements:
+			if uv_element:
+				uv_name = uv_element.GetName( )
 
+		polygon_vertices, polygon_normals, polygon_uvs, material_ids = get_polygon_vertex_data( lmesh, uv_name )
 
-def get_mesh_data( mesh, progress_dlg ):
+	skin_clusters, bones = get_skin_clusters( lmesh, in_bones )
+
+	return Mesh_Snapshot( mesh.GetName( ), vert_xform_rows, control_points, polygon_vertices, polygon_normals, polygon_uvs, material_ids,
+	                      skin_clusters, bool( bones ), get_blend_targets( lmesh ) )
+
+
+def get_mesh_data( snapshot, progress_dlg, weld_epsilon = 0.0 ):
 	"""
 	Get the face and normal data
 
 	*Arguments:*
-		* ``mesh`` FBX mesh
+		* ``snapshot`` Mesh_Snapshot of the mesh
+		* ``progress_dlg`` dialog object or None
 
 	*Keyword Arguments:*
-		* ``none``
+		* ``weld_epsilon`` Tolerance used when matching the attributes of split verts, 0 for exact matches
 
 	*Returns:*
-		* ``face_data`` List of face_info objects that contain face index, uvs, norms, verts
+		* ``mesh_buffers`` Mesh_Buffers with the verts, uvs, norms and triangles of the mesh
+		* ``weld_info`` Number of verts that were split and welded
 
 	*Examples:* ::
 
@@ -2100,178 +3380,189 @@ def get_mesh_data( mesh, progress_dlg ):
 		* Randall Hess,   12/6/2013 3:02:30 PM
 	"""
 
-	face_data = [ ]
-
 	if DEBUG_OUTPUT:
 		print '---------------------------------------------------------------------------'
 		print 'Faces\n'
 
-	# TODO - Handle Multiple Layers
-	lmesh = mesh.GetNodeAttribute( )
-	layer_element = lmesh.GetLayer( 0 )
-	if layer_element:
+	if not snapshot.polygon_vertices is None:
 
-		# get the transform used to orient and scale the vertices
-		vertex_transform = compute_vertex_transform( mesh )
-		#3dsmax
-		if IS_3DSMAX:
-			vert_xform_rows = [ vertex_transform.GetRow( 0 ), vertex_transform.GetRow( 2 ), vertex_transform.GetRow( 1 ), vertex_transform.GetRow( 3 ) ]
-		else:
-			vert_xform_rows = [ vertex_transform.GetRow( 0 ), -vertex_transform.GetRow( 2 ), -vertex_transform.GetRow( 1 ), vertex_transform.GetRow( 3 ) ]
-
-		# setup the vert data
-		vertices = [ ]
-		num_verts = lmesh.GetControlPointsCount( )
-		for i in range( num_verts ):
-			vertices.append( Vertex_Info( i ) )
-
-		# get the fbx verts
-		fbx_verts = [ ]
-		control_points = lmesh.GetControlPoints( )
-		for vert_index in range( num_verts ):
-			wx.Yield( )
-			vert = control_points[ vert_index ]
+		# get the fbx verts, converted all at once
+		vert_xform_rows = snapshot.vert_xform_rows
+		num_verts = len( snapshot.control_points )
+		fbx_verts = transform_points( snapshot.control_points, vert_xform_rows )[ :, : 3 ]
 
-			if IS_MAYAYUP:
-				vector = [ vert[0], vert[1], vert[2], vert[3] ]
-				vert_converted = matrix_multiply( vert_xform_rows, vector )
-				vert_x = get_scaled_value( vert_converted[0], 1 )
-				vert_y = get_scaled_value( vert_converted[1], 1 )
-				vert_z = get_scaled_value( vert_converted[2], 1 )
-				vert_w = get_scaled_value( vert_converted[3], 1 )
+		polygon_vertices = snapshot.polygon_vertices
+		material_ids = snapshot.material_ids
+		triangle_count = len( polygon_vertices ) // 3
 
-			elif IS_3DSMAX:
-				scale_inches_to_meters = 39.3701
-				vert_x = get_scaled_value( vert[0], scale_inches_to_meters )
-				vert_y = get_scaled_value( vert[1], scale_inches_to_meters )
-				vert_z = get_scaled_value( vert[2], scale_inches_to_meters )
-				vert_w = get_scaled_value( vert[3], scale_inches_to_meters )
+		# triangle, Normals
+		polygon_normals = transform_points( snapshot.polygon_normals, vert_xform_rows, scale_max_units = False )[ :, : 3 ]
 
-			fbx_verts.append( [ vert_x, vert_y, vert_z, vert_w ] )
+		# triangle, UVs
+		polygon_uvs = round_values( snapshot.polygon_uvs )
+		# This may be 3dsmax only conversion
+		polygon_uvs[ :, 1 ] = 1.0 - polygon_uvs[ :, 1 ]
 
-		# get the uv channel name
-		uv_elements = layer_element.GetUVSets( )
-		uv_name = ''
-		for uv_element in uv_elements:
-			if uv_element:
-				uv_name = uv_element.GetName( )
+		# weld keys of every triangle corner
+		corner_values = numpy.hstack( ( fbx_verts[ polygon_vertices ], polygon_normals, polygon_uvs ) )
+		weld_keys = get_weld_keys( corner_values, weld_epsilon )
+		if weld_epsilon:
+			exact_keys = get_weld_keys( corner_values )
 
-		# get the material element in the layer
-		material_element = layer_element.GetMaterials( )
+		polygon_vertices = polygon_vertices.tolist( )
+
+		# every control point gets a vert, split verts are added after them
+		# each vert keeps the corner it was made from to pull its values from
+		vertex_keys = [ None ] * num_verts
+		vertex_corners = [ -1 ] * num_verts
+		original_index = [ -1 ] * num_verts
+		triangles = [ 0 ] * len( polygon_vertices )
+
+		# split verts by control point and attribute key
+		split_verts = { }
+		num_split = 0
+		num_welded = 0
 
-		# get the face data
-		triangle_count = lmesh.GetPolygonVertexCount( ) / 3
 		for triangle_index in range( triangle_count):
 
 			# only update the pulse in increments of 5
-			if triangle_index % 5 == 0:
+			if progress_dlg and triangle_index % 5 == 0:
 				wx.Yield( )
 				progress_dlg._msg.SetLabelText( 'Getting Mesh Triangle: {0}'.format( triangle_index ) )
 				progress_dlg.UpdatePulse( )
 
-			# create the face object
-			face = Face_Info( triangle_index )
-
-			# get the material id for the current face
-			if material_element:
-				material_id = material_element.GetIndexArray( ).GetAt( triangle_index )
-				face.material_id = material_id
-
 			for idx in range( 0, 3 ):
 
 				# triangle, Vertices
-				index = lmesh.GetPolygonVertex( triangle_index, idx )
-				if index == -1:
-					return None, None
-				face.indices[ idx ] = index
-
-				# setup a temp info
-				temp_vert = Vertex_Info( index )
-				temp_vert.index = index
-				temp_vert.positions[ 0 ] = fbx_verts[ index ][ 0 ]
-				temp_vert.positions[ 1 ] = fbx_verts[ index ][ 1 ]
-				temp_vert.positions[ 2 ] = fbx_verts[ index ][ 2 ]
-
-				# triangle, Normals
-				fbx_norm = FbxCommon.FbxVector4()
-				lmesh.GetPolygonVertexNormal( triangle_index, idx, fbx_norm )
-
-				if IS_MAYAYUP:
-					vector = [ fbx_norm[0], fbx_norm[1], fbx_norm[2], fbx_norm[3] ]
-					norm_converted = matrix_multiply( vert_xform_rows, vector )
-					temp_vert.normal[ 0 ] = get_scaled_value( norm_converted[ 0 ], 1.0 )
-					temp_vert.normal[ 1 ] = get_scaled_value( norm_converted[ 1 ], 1.0 )
-					temp_vert.normal[ 2 ] = get_scaled_value( norm_converted[ 2 ], 1.0 )
-
-				elif IS_3DSMAX:
-					temp_vert.normal[ 0 ] = get_scaled_value( fbx_norm[ 0 ], 1.0 )
-					temp_vert.normal[ 1 ] = get_scaled_value( fbx_norm[ 1 ], 1.0 )
-					temp_vert.normal[ 2 ] = get_scaled_value( fbx_norm[ 2 ], 1.0 )
-
-				# triangle, UVs
-				tex_coord_found = False
-				fbx_uv = FbxCommon.FbxVector2()
-				tex_coord_found = lmesh.GetPolygonVertexUV( triangle_index, idx, uv_name, fbx_uv )
-				temp_vert.uvs[ 0 ] = get_scaled_value( fbx_uv[ 0 ], 1.0 )
-
-				# This may be 3dsmax only conversion
-				temp_vert.uvs[ 1 ] = 1.0 - ( get_scaled_value( fbx_uv[ 1 ], 1.0 ) )
-
-				# set the vertex indice with the current vert_info
-				if vertices[ index ].index == -1:
-					vertices[ index ] = temp_vert
-					vertices[ index ].original_index = index
-
-				else:
-					# if the vert is set make sure the positions,norms and uvs are all the same
-					if not vertices[ index ].positions == temp_vert.positions or \
-					   not vertices[ index ].normal == temp_vert.normal or \
-					   not vertices[ index ].uvs == temp_vert.uvs:
-
-						# try to find a similar vert with the same old index
-						found_vert = None
-						for vert in vertices:
-							if vert.original_index == index:
-								if vert.positions == temp_vert.positions and vert.normal == temp_vert.normal and vert.uvs == temp_vert.uvs:
-									found_vert = vert
-									temp_vert = vert
-									break
-
-						if found_vert is None:
-							# create a new vert
-							temp_index = len( vertices) + 1
-							temp_vert.index = temp_index
-							temp_vert.original_index = index
-							vertices.append( temp_vert )
-							if DEBUG_OUTPUT or DEBUG_VERTS:
-								print 'Duplicating vert: {0} New indice: {1}'.format( index, temp_index )
-
-					else:
-						temp_vert.index = index
-						vertices[ index ] = temp_vert
+				polygon_vertex = triangle_index * 3 + idx
+				index = polygon_vertices[ polygon_vertex ]
+				weld_key = weld_keys[ polygon_vertex ]
+				vertex_index = index
+
+				# set the vert with the current corner
+				if vertex_keys[ index ] is None:
+					vertex_keys[ index ] = weld_key
+					vertex_corners[ index ] = polygon_vertex
+					original_index[ index ] = index
+
+				# if the vert is set make sure the positions,norms and uvs are all the same
+				elif not vertex_keys[ index ] == weld_key:
+
+					# try to find a similar vert with the same old index
+					vertex_index = split_verts.get( ( index, weld_key ) )
+					if vertex_index is None:
+						# create a new vert
+						vertex_index = len( vertex_corners )
+						vertex_corners.append( polygon_vertex )
+						original_index.append( index )
+						split_verts[ ( index, weld_key ) ] = vertex_index
+						num_split += 1
+						if DEBUG_OUTPUT or DEBUG_VERTS:
+							print 'Duplicating vert: {0} New indice: {1}'.format( index, vertex_index )
+
+					elif weld_epsilon and not exact_keys[ vertex_corners[ vertex_index ] ] == exact_keys[ polygon_vertex ]:
+						num_welded += 1
+
+				elif weld_epsilon and not exact_keys[ vertex_corners[ index ] ] == exact_keys[ polygon_vertex ]:
+					num_welded += 1
 
 				# set the face vert data
-				face.verts[ idx ] = temp_vert
+				triangles[ polygon_vertex ] = vertex_index
 
 			# Output
 			if DEBUG_OUTPUT:
 				print '***************************************'
-				print 'Face: {0}'.format( face.index )
-				print '  Indices: {0}'.format( face.indices )
-				index = 0
-				for vert in face.verts:
-					print '  Vert {0}: {1}'.format( index, vert.positions )
-					index += 1
-				index = 0
-				for vert in face.verts:
-					print '  UV {0}: {1}'.format( index, vert.uvs )
-					index += 1
+				print 'Face: {0}'.format( triangle_index )
+				print '  Indices: {0}'.format( polygon_vertices[ triangle_index * 3 : triangle_index * 3 + 3 ] )
+				for idx in range( 0, 3 ):
+					print '  Vert {0}: {1}'.format( idx, corner_values[ triangle_index * 3 + idx, : 3 ].tolist( ) )
+				for idx in range( 0, 3 ):
+					print '  UV {0}: {1}'.format( idx, polygon_uvs[ vertex_corners[ triangles[ triangle_index * 3 + idx ] ] ].tolist( ) )
 				print '***************************************'
 
-			# update the face structure
-			face_data.append( face )
+		# gather the vert values from the corners they were made from, unused control points are left at zero
+		num_vertices = len( vertex_corners )
+		vertex_corners = numpy.array( vertex_corners, dtype = numpy.int64 )
+		original_index = numpy.array( original_index, dtype = numpy.int32 )
+		used_verts = original_index != -1
+
+		positions = numpy.zeros( ( num_vertices, 3 ), dtype = numpy.float64 )
+		positions[ used_verts ] = fbx_verts[ original_index[ used_verts ] ]
+		normals = numpy.zeros( ( num_vertices, 3 ), dtype = numpy.float32 )
+		normals[ used_verts ] = polygon_normals[ vertex_corners[ used_verts ] ]
+		uvs = numpy.zeros( ( num_vertices, 2 ), dtype = numpy.float32 )
+		uvs[ used_verts ] = polygon_uvs[ vertex_corners[ used_verts ] ]
+
+		if material_ids is None:
+			material_ids = numpy.zeros( triangle_count, dtype = numpy.uint16 )
+
+		# every corner, welded or not, takes the uvs of the vert it was matched with
+		triangles = numpy.array( triangles, dtype = numpy.uint32 ).reshape( -1, 3 )
+		mesh_buffers = Mesh_Buffers( positions, normals, uvs, original_index, triangles,
+		                             numpy.asarray( material_ids[ : triangle_count ], dtype = numpy.uint16 ),
+		                             uvs[ triangles ] )
+
+		print 'Mesh: {0} Split verts: {1} Welded verts: {2}'.format( snapshot.name, num_split, num_welded )
+
+		return mesh_buffers, { 'split' : num_split, 'welded' : num_welded }
+
+	return None, None
+
+
+def extract_mesh_content( snapshot, weld_epsilon = 0.0, progress_dlg = None ):
+	"""
+	Extract the face data, bone weights and blendshapes of a mesh from its snapshot
+	Does not touch the fbx scene, the extraction worker processes run this
+
+	*Arguments:*
+		* ``snapshot`` Mesh_Snapshot of the mesh
+
+	*Keyword Arguments:*
+		* ``weld_epsilon`` Tolerance used when matching the attributes of split verts, 0 for exact matches
+		* ``progress_dlg`` dialog object, None in a worker process
+
+	*Returns:*
+		* ``mesh_buffers, weld_info, bone_weights, blendshapes`` or None if the mesh has no triangles
+	"""
+
+	mesh_buffers, weld_info = get_mesh_data( snapshot, progress_dlg, weld_epsilon = weld_epsilon )
+	if not mesh_buffers or not mesh_buffers.get_triangle_count( ):
+		return None
+
+	# only keep the bone weights if the mesh has bones
+	# we are only exporting character meshes at this time
+	bone_weights = None
+	if snapshot.has_bones:
+		bone_weights = get_boneweights( snapshot.skin_clusters, mesh_buffers, progress_dlg )
+
+	# if there are bones its likely a skinned mesh
+	# check for blendshapes
+	blendshapes = get_blendshapes( snapshot, mesh_buffers, progress_dlg )
+	if not blendshapes:
+		blendshapes = None
+
+	return mesh_buffers, weld_info, bone_weights, blendshapes
+
+
+def init_extraction_worker( is_3dsmax, is_mayayup ):
+	"""
+	Set up an extraction worker process with the conversion settings of the loaded scene
+
+	*Arguments:*
+		* ``is_3dsmax`` IS_3DSMAX of the loaded scene
+		* ``is_mayayup`` IS_MAYAYUP of the loaded scene
+
+	*Keyword Arguments:*
+		* ``none``
+
+	*Returns:*
+		* ``None``
+	"""
 
-		return face_data, vertices
+	global IS_3DSMAX
+	global IS_MAYAYUP
+	IS_3DSMAX = is_3dsmax
+	IS_MAYAYUP = is_mayayup
 
 
 def get_fbx_materials( mesh ):
@@ -2310,12 +3601,12 @@ def get_fbx_materials( mesh ):
 			for layer_index in range( mesh.GetLayerCount( ) ):
 				layer_element_material = mesh.GetLayer( layer_index ).GetMaterials()
 				if layer_element_material:
-					if layer_element_material.GetReferenceMode() == FbxCommon.FbxLayerElement.eIndex:
+					if layer_element_material.GetReferenceMode() == FBX_API.FbxLayerElement.eIndex:
 						#Materials are in an undefined external table
 						continue
 
 					if material_count > 0:
-						color = FbxCommon.FbxColor()
+						color = FBX_API.FbxColor()
 
 						if DEBUG_OUTPUT:
 							print " Materials on layer {0}".format( layer_index )
@@ -2331,7 +3622,162 @@ def get_fbx_materials( mesh ):
 	return materials
 
 
-def load_fbx_scene( fbx_scene, do_3dsmax, do_Maya ):
+# Mesh buffer arrays, bone and tag attributes stored in the fbx cache
+CACHE_MESH_ATTRIBUTES = [ 'positions', 'normals', 'uvs', 'original_index', 'triangles', 'material_ids', 'face_uvs' ]
+CACHE_BONE_ATTRIBUTES = [ 'name', 'index', 'id', 'parent', 'parent_id', 'parent_index' ]
+CACHE_TAG_ATTRIBUTES = [ 'name', 'parent_index' ]
+
+
+def get_cache_value( value ):
+	"""
+	Convert a value read back from the cache json into the type the converter uses
+
+	*Arguments:*
+		* ``value`` Value loaded from json
+
+	*Keyword Arguments:*
+		* ``none``
+
+	*Returns:*
+		* ``value`` ascii strings are returned as str instead of unicode
+	"""
+
+	if isinstance( value, unicode ):
+		try:
+			return str( value )
+		except UnicodeEncodeError:
+			pass
+	return value
+
+
+def pack_mesh_content( mesh_buffers, bone_weights, blendshapes, bone_order, bones, tags ):
+	"""
+	Flatten the extracted data of a mesh into arrays that can be written to the fbx cache
+
+	*Arguments:*
+		* ``mesh_buffers`` Mesh_Buffers of the mesh
+		* ``bone_weights`` Bone_Weights of the mesh verts or None
+		* ``blendshapes`` Dictionary of blendshape name -> Blend_Target or None
+		* ``bone_order`` Dictionary of bone order keys and bones
+		* ``bones`` List of all the bones in the scene
+		* ``tags`` List of all the tags in the scene
+
+	*Keyword Arguments:*
+		* ``none``
+
+	*Returns:*
+		* ``arrays`` Dictionary of array name -> numpy array
+		* ``meta`` Json serializable names and bone/tag attributes
+	"""
+
+	arrays = dict( ( attr, getattr( mesh_buffers, attr ) ) for attr in CACHE_MESH_ATTRIBUTES )
+
+	meta = { 'bone_weight_names' : None, 'blendshape_names' : None }
+
+	# bone weight slots
+	if not bone_weights is None:
+		meta[ 'bone_weight_names' ] = bone_weights.bone_names
+		arrays[ 'weight_bone' ] = bone_weights.bone_indices
+		arrays[ 'weight_value' ] = bone_weights.weights
+
+	# blendshape targets concatenated in the order they were found, one row per shape/vert pair
+	if not blendshapes is None:
+		blendshape_names = sorted( blendshapes, key = lambda name: blendshapes[ name ].order )
+		targets = [ blendshapes[ name ] for name in blendshape_names ]
+
+		meta[ 'blendshape_names' ] = blendshape_names
+		arrays[ 'blend_count' ] = numpy.array( [ target.get_vertex_count( ) for target in targets ], dtype = numpy.int32 )
+		arrays[ 'blend_vertex' ] = numpy.concatenate( [ numpy.zeros( 0, dtype = numpy.int32 ) ] + [ target.vertex_indices for target in targets ] )
+		arrays[ 'blend_delta' ] = numpy.concatenate( [ numpy.zeros( ( 0, 3 ), dtype = numpy.float64 ) ] + [ target.delta_positions for target in targets ] )
+		arrays[ 'blend_normal' ] = numpy.concatenate( [ numpy.zeros( ( 0, 3 ), dtype = numpy.float32 ) ] + [ target.delta_normals for target in targets ] )
+
+	# bones and tags after the bone order was resolved
+	meta[ 'bones' ] = [ [ getattr( bone, attr ) for attr in CACHE_BONE_ATTRIBUTES ] for bone in bones ]
+	meta[ 'tags' ] = [ [ getattr( tag, attr ) for attr in CACHE_TAG_ATTRIBUTES ] for tag in tags ]
+	meta[ 'bone_order' ] = [ [ key, bones.index( bone ) ] for key, bone in bone_order.iteritems( ) ]
+
+	return arrays, meta
+
+
+def unpack_mesh_content( arrays, meta, bones, tags ):
+	"""
+	Rebuild the extracted data of a mesh from the arrays stored in the fbx cache
+	The cached bone and tag attributes are applied to the scene bones and tags
+
+	*Arguments:*
+		* ``arrays`` Dictionary of array name -> numpy array
+		* ``meta`` Names and bone/tag attributes stored with the arrays
+		* ``bones`` List of all the bones in the scene
+		* ``tags`` List of all the tags in the scene
+
+	*Keyword Arguments:*
+		* ``none``
+
+	*Returns:*
+		* ``mesh_buffers, bone_weights, blendshapes, bone_order`` or None if the cached rig does not match the scene
+	"""
+
+	if len( meta[ 'bones' ] ) != len( bones ) or len( meta[ 'tags' ] ) != len( tags ):
+		return None
+
+	mesh_buffers = Mesh_Buffers( *[ arrays[ attr ] for attr in CACHE_MESH_ATTRIBUTES ] )
+
+	# bone weights
+	bone_weights = None
+	weight_names = meta[ 'bone_weight_names' ]
+	if not weight_names is None:
+		bone_weights = Bone_Weights( [ get_cache_value( name ) for name in weight_names ], arrays[ 'weight_bone' ], arrays[ 'weight_value' ] )
+
+	# blendshapes
+	blendshapes = None
+	blendshape_names = meta[ 'blendshape_names' ]
+	if not blendshape_names is None:
+		# adding the names in the order they were found rebuilds the same dictionary order
+		blendshapes = { }
+		ends = numpy.cumsum( arrays[ 'blend_count' ] ).tolist( )
+		starts = [ 0 ] + ends[ : -1 ]
+		for order, name in enumerate( blendshape_names ):
+			start, end = starts[ order ], ends[ order ]
+			blendshapes[ get_cache_value( name ) ] = Blend_Target( arrays[ 'blend_vertex' ][ start : end ], arrays[ 'blend_delta' ][ start : end ], arrays[ 'blend_normal' ][ start : end ], order )
+
+	# bones and tags
+	for bone, values in zip( bones, meta[ 'bones' ] ):
+		for attr, value in zip( CACHE_BONE_ATTRIBUTES, values ):
+			setattr( bone, attr, get_cache_value( value ) )
+
+	for tag, values in zip( tags, meta[ 'tags' ] ):
+		for attr, value in zip( CACHE_TAG_ATTRIBUTES, values ):
+			setattr( tag, attr, get_cache_value( value ) )
+
+	bone_order = { }
+	for key, bone_index in meta[ 'bone_order' ]:
+		bone_order[ get_cache_value( key ) ] = bones[ bone_index ]
+
+	return mesh_buffers, bone_weights, blendshapes, bone_order
+
+
+def get_fbx_api( backend = None ):
+	"""
+	Get the module used to load and query FBX scenes
+	The built-in reader is used when the Autodesk FBX SDK is not installed
+
+	*Arguments:*
+		* ``none``
+
+	*Keyword Arguments:*
+		* ``backend`` FBX_BACKEND_SDK or FBX_BACKEND_NATIVE
+
+	*Returns:*
+		* ``module`` FbxCommon or FbxNative
+	"""
+
+	if backend == FBX_BACKEND_NATIVE or FbxCommon is None:
+		return FbxNative
+
+	return FbxCommon
+
+
+def load_fbx_scene( fbx_scene, do_3dsmax, do_Maya, backend = None ):
 	"""
 	Load the FBX scene and do necessary conversions
 
@@ -2339,7 +3785,7 @@ def load_fbx_scene( fbx_scene, do_3dsmax, do_Maya ):
 		* ``fbx_scene`` Fbx scene file
 
 	*Keyword Arguments:*
-		* ``none``
+		* ``backend`` FBX_BACKEND_SDK or FBX_BACKEND_NATIVE, defaults to the SDK when installed
 
 	*Returns:*
 	   * ``lStatus`` Status of opening the fbx_scene
@@ -2358,10 +3804,13 @@ def load_fbx_scene( fbx_scene, do_3dsmax, do_Maya ):
 	"""
 
 	# Prepare the FBX SDK.
-	lSdkManager, lScene = FbxCommon.InitializeSdkObjects( )
+	global FBX_API
+	FBX_API = get_fbx_api( backend )
+	NODE_PROPERTY_INDEX.clear( )
+	lSdkManager, lScene = FBX_API.InitializeSdkObjects( )
 
 	if fbx_scene:
-		lStatus = FbxCommon.LoadScene(lSdkManager, lScene, fbx_scene)
+		lStatus = FBX_API.LoadScene(lSdkManager, lScene, fbx_scene)
 
 	else:
 		lStatus = False
@@ -2378,14 +3827,14 @@ def load_fbx_scene( fbx_scene, do_3dsmax, do_Maya ):
 
 				# override with force settings
 		#if do_Maya:
-			#fbx_scene_axis = FbxCommon.FbxAxisSystem.MayaYUp
+			#fbx_scene_axis = FBX_API.FbxAxisSystem.MayaYUp
 			#SCENE_SCALE_CONVERSION = 0.01
 		if do_3dsmax:
-			max_scene_axis = FbxCommon.FbxAxisSystem.Max
+			max_scene_axis = FBX_API.FbxAxisSystem.Max
 			#SCENE_SCALE_CONVERSION = fbx_scene_units.GetScaleFactor( ) * 0.01
 			max_scene_axis.ConvertScene( lScene  )
 			#max_scene_axis.ConvertChildren( lScene.GetRootNode(), max_scene_axis )
-			#new_system_unit = FbxCommon.FbxSystemUnit.Inch
+			#new_system_unit = FBX_API.FbxSystemUnit.Inch
 			#new_system_unit.ConvertScene( lScene )
 			#SCENE_SCALE_CONVERSION = 0.01
 
@@ -2396,7 +3845,7 @@ def load_fbx_scene( fbx_scene, do_3dsmax, do_Maya ):
 		# vector sign, indicates pos or neg direction of the axis
 		up_vector_sign 	= 0
 		front_vector_sign = 1
-		front_vector_type = FbxCommon.FbxAxisSystem.eParityOdd
+		front_vector_type = FBX_API.FbxAxisSystem.eParityOdd
 
 		# maya
 		if fbx_scene_units.GetScaleFactor( ) == 1.0:
@@ -2409,31 +3858,31 @@ def load_fbx_scene( fbx_scene, do_3dsmax, do_Maya ):
 		up_vector_type, up_vector_sign = fbx_scene_axis.GetUpVector( )
 		coordinate_system_type	= fbx_scene_axis.GetCoorSystem( )
 
-		up_vector		= FbxCommon.FbxVector4( )
-		front_vector	= FbxCommon.FbxVector4( )
-		right_vector	= FbxCommon.FbxVector4( )
+		up_vector		= FBX_API.FbxVector4( )
+		front_vector	= FBX_API.FbxVector4( )
+		right_vector	= FBX_API.FbxVector4( )
 
-		if up_vector_type == FbxCommon.FbxAxisSystem.eXAxis:
+		if up_vector_type == FBX_API.FbxAxisSystem.eXAxis:
 			up_vector.Set( 1.0, 0.0, 0.0, 0.0 )
-			if front_vector_type == FbxCommon.FbxAxisSystem.eParityEven:
+			if front_vector_type == FBX_API.FbxAxisSystem.eParityEven:
 				front_vector.Set(0.0, 1.0, 0.0, 0.0 )
 				right_vector.Set(0.0, 0.0, 1.0, 0.0 )
 			else:
 				front_vector.Set(0.0, 0.0, 1.0, 0.0 )
 				right_vector.Set(0.0, 1.0, 0.0, 0.0 )
 
-		elif up_vector_type == FbxCommon.FbxAxisSystem.eYAxis:
+		elif up_vector_type == FBX_API.FbxAxisSystem.eYAxis:
 			up_vector.Set( 0.0, 1.0, 0.0, 0.0 )
-			if front_vector_type == FbxCommon.FbxAxisSystem.eParityEven:
+			if front_vector_type == FBX_API.FbxAxisSystem.eParityEven:
 				front_vector.Set(1.0, 0.0, 0.0, 0.0 )
 				right_vector.Set(0.0, 0.0, 1.0, 0.0 )
 			else:
 				front_vector.Set( 0.0, 0.0, 1.0, 0.0 )
 				right_vector.Set( 1.0, 0.0, 0.0, 0.0 )
 
-		elif up_vector_type == FbxCommon.FbxAxisSystem.eZAxis:
+		elif up_vector_type == FBX_API.FbxAxisSystem.eZAxis:
 			up_vector.Set( 0.0, 0.0, 1.0, 0.0)
-			if front_vector_type == FbxCommon.FbxAxisSystem.eParityEven:
+			if front_vector_type == FBX_API.FbxAxisSystem.eParityEven:
 				front_vector.Set( 1.0, 0.0, 0.0, 0.0 )
 				right_vector.Set( 0.0, 1.0, 0.0, 0.0 )
 			else:
@@ -2445,12 +3894,12 @@ def load_fbx_scene( fbx_scene, do_3dsmax, do_Maya ):
 		up_vector		*= float( up_vector_sign )
 		front_vector	*= float( front_vector_sign )
 
-		coordinate_system_transform = FbxCommon.FbxMatrix( )
+		coordinate_system_transform = FBX_API.FbxMatrix( )
 
 
 
 		#REPLACING THIS CHECK NOW THAT WE ARE CONVERTING TO MAX Axis
-		if fbx_scene_axis == FbxCommon.FbxAxisSystem.MayaYUp:
+		if fbx_scene_axis == FBX_API.FbxAxisSystem.MayaYUp:
 			global IS_MAYAYUP
 			IS_MAYAYUP = True
 
@@ -2463,9 +3912,9 @@ def load_fbx_scene( fbx_scene, do_3dsmax, do_Maya ):
 			coordinate_system_transform.SetColumn( 0, right_vector )	#RVec
 			coordinate_system_transform.SetColumn( 1, -up_vector )	#UVec
 			coordinate_system_transform.SetColumn( 2, front_vector )	#FVec
-			coordinate_system_transform.SetColumn( 3, FbxCommon.FbxVector4( ) )	#Position
+			coordinate_system_transform.SetColumn( 3, FBX_API.FbxVector4( ) )	#Position
 
-		elif fbx_scene_axis == FbxCommon.FbxAxisSystem.Max:
+		elif fbx_scene_axis == FBX_API.FbxAxisSystem.Max:
 			global IS_3DSMAX
 			IS_3DSMAX = True
 
@@ -2473,7 +3922,7 @@ def load_fbx_scene( fbx_scene, do_3dsmax, do_Maya ):
 			coordinate_system_transform.SetColumn( 0, -right_vector )	#RVec
 			coordinate_system_transform.SetColumn( 1, up_vector )			#UVec
 			coordinate_system_transform.SetColumn( 2, front_vector )		#FVec
-			coordinate_system_transform.SetColumn( 3, FbxCommon.FbxVector4( ) )	#Position
+			coordinate_system_transform.SetColumn( 3, FBX_API.FbxVector4( ) )	#Position
 
 		if do_3dsmax:
 			global IS_MAYAYUP
@@ -2489,20 +3938,20 @@ def load_fbx_scene( fbx_scene, do_3dsmax, do_Maya ):
 			coordinate_system_transform.SetColumn( 0, -right_vector )	#RVec
 			coordinate_system_transform.SetColumn( 1, up_vector )	#UVec
 			coordinate_system_transform.SetColumn( 2, front_vector )	#FVec
-			coordinate_system_transform.SetColumn( 3, FbxCommon.FbxVector4( ) )	#Position
+			coordinate_system_transform.SetColumn( 3, FBX_API.FbxVector4( ) )	#Position
 
 		# get the scale matrix
-		scale_matrix = FbxCommon.FbxMatrix( )
+		scale_matrix = FBX_API.FbxMatrix( )
 		scale_matrix.SetIdentity( )
 		scale_col0 = scale_matrix[0]
 		scale_col1 = scale_matrix[1]
 		scale_col2 = scale_matrix[2]
 
-		rvec = FbxCommon.FbxVector4( )
+		rvec = FBX_API.FbxVector4( )
 		rvec.Set( SCENE_SCALE_CONVERSION, scale_col0[1], scale_col0[2], scale_col0[3] )
-		uvec = FbxCommon.FbxVector4( )
+		uvec = FBX_API.FbxVector4( )
 		uvec.Set( scale_col1[0], SCENE_SCALE_CONVERSION, scale_col1[2], scale_col1[3] )
-		fvec = FbxCommon.FbxVector4( )
+		fvec = FBX_API.FbxVector4( )
 		fvec.Set( scale_col2[0], scale_col2[1], SCENE_SCALE_CONVERSION, scale_col2[3] )
 
 		scale_matrix.SetColumn( 0, rvec )
@@ -2557,31 +4006,31 @@ def remove_transform_scale( object_transform ):
 	#object_affine_transform.SetTQS( translation, quat, scale )
 
 	# get the scale matrix
-	scale_matrix = FbxCommon.FbxAMatrix( )
+	scale_matrix = FBX_API.FbxAMatrix( )
 	scale_matrix.SetIdentity( )
 	scale_col0 = scale_matrix[0]
 	scale_col1 = scale_matrix[1]
 	scale_col2 = scale_matrix[2]
 
 	# build up the vectors with the scale conversion
-	rvec = FbxCommon.FbxVector4( )
+	rvec = FBX_API.FbxVector4( )
 	rvec.Set( SCENE_SCALE_CONVERSION, scale_col0[1], scale_col0[2], scale_col0[3] )
-	uvec = FbxCommon.FbxVector4( )
+	uvec = FBX_API.FbxVector4( )
 	uvec.Set( scale_col1[0], SCENE_SCALE_CONVERSION, scale_col1[2], scale_col1[3] )
-	fvec = FbxCommon.FbxVector4( )
+	fvec = FBX_API.FbxVector4( )
 	fvec.Set( scale_col2[0], scale_col2[1], SCENE_SCALE_CONVERSION, scale_col2[3] )
 
 	# build a temp regular matrix
-	temp_matrix = FbxCommon.FbxMatrix( )
+	temp_matrix = FBX_API.FbxMatrix( )
 	temp_matrix.SetColumn( 0, rvec )
 	temp_matrix.SetColumn( 1, uvec )
 	temp_matrix.SetColumn( 2, fvec )
 
 	# break down the temp matrix and convert to AffineMatrix that we can multiply
-	translation = FbxCommon.FbxVector4( )
-	quat = FbxCommon.FbxQuaternion( )
-	shear = FbxCommon.FbxVector4( )
-	scale = FbxCommon.FbxVector4( )
+	translation = FBX_API.FbxVector4( )
+	quat = FBX_API.FbxQuaternion( )
+	shear = FBX_API.FbxVector4( )
+	scale = FBX_API.FbxVector4( )
 	temp_matrix.GetElements( translation, quat, shear, scale )
 	scale_matrix.SetTQS( translation, quat, scale )
 	out_matrix = object_transform * scale_matrix
@@ -2618,14 +4067,14 @@ def compute_vertex_transform( node ):
 	"""
 
 	# Get the "geometric" transformation.
-	geometric_translation   = FbxCommon.FbxVector4( )
-	geometric_rotation      = FbxCommon.FbxVector4( )
-	geometric_scale         = FbxCommon.FbxVector4( )
-	geometric_transform_fbx = FbxCommon.FbxMatrix( )
-
-	geometric_translation = node.GetGeometricTranslation( FbxCommon.FbxNode.eSourcePivot )
-	geometric_rotation    = node.GetGeometricRotation( FbxCommon.FbxNode.eSourcePivot )
-	geometric_scale       = node.GetGeometricScaling( FbxCommon.FbxNode.eSourcePivot )
+	geometric_translation   = FBX_API.FbxVector4( )
+	geometric_rotation      = FBX_API.FbxVector4( )
+	geometric_scale         = FBX_API.FbxVector4( )
+	geometric_transform_fbx = FBX_API.FbxMatrix( )
+
+	geometric_translation = node.GetGeometricTranslation( FBX_API.FbxNode.eSourcePivot )
+	geometric_rotation    = node.GetGeometricRotation( FBX_API.FbxNode.eSourcePivot )
+	geometric_scale       = node.GetGeometricScaling( FBX_API.FbxNode.eSourcePivot )
 	geometric_transform_fbx.SetTRS( geometric_translation, geometric_rotation, geometric_scale )
 
 	# Volition multiplication goes from left to right.  This will put the object transform matrix into our coordinate system.
@@ -2662,12 +4111,12 @@ def compute_world_transform( fbx_node, use_geom = False ):
 	fbx_global_transform = fbx_node.EvaluateGlobalTransform()
 
 	# Get the offset transformation
-	geometric_translation = fbx_node.GetGeometricTranslation( FbxCommon.FbxNode.eSourcePivot )
-	geometric_rotation    = fbx_node.GetGeometricRotation( FbxCommon.FbxNode.eSourcePivot )
-	geometric_scale       = fbx_node.GetGeometricScaling( FbxCommon.FbxNode.eSourcePivot )
+	geometric_translation = fbx_node.GetGeometricTranslation( FBX_API.FbxNode.eSourcePivot )
+	geometric_rotation    = fbx_node.GetGeometricRotation( FBX_API.FbxNode.eSourcePivot )
+	geometric_scale       = fbx_node.GetGeometricScaling( FBX_API.FbxNode.eSourcePivot )
 
 	# Pivot offset
-	geometric_transform = FbxCommon.FbxAMatrix( )
+	geometric_transform = FBX_API.FbxAMatrix( )
 	geometric_transform.SetTRS( geometric_translation, geometric_rotation, geometric_scale )
 
 	# Fbx Matrix multiplication goes from right to left, Pivot Offset +
@@ -2677,14 +4126,14 @@ def compute_world_transform( fbx_node, use_geom = False ):
 		object_transform = fbx_global_transform
 
 	# Break Down the Matrix
-	translation = FbxCommon.FbxVector4( )
-	quat = FbxCommon.FbxQuaternion( )
-	shear = FbxCommon.FbxVector4( )
-	scale = FbxCommon.FbxVector4( )
+	translation = FBX_API.FbxVector4( )
+	quat = FBX_API.FbxQuaternion( )
+	shear = FBX_API.FbxVector4( )
+	scale = FBX_API.FbxVector4( )
 	COORD_SYS_TRANSFORM.GetElements( translation, quat, shear, scale )
 
 	# Convert to an AffineMatrix
-	coord_sys_transA = FbxCommon.FbxAMatrix( )
+	coord_sys_transA = FBX_API.FbxAMatrix( )
 	coord_sys_transA.SetTQS( translation, quat, scale )
 
 	# Inverse the coordsys transform
@@ -2696,6 +4145,117 @@ def compute_world_transform( fbx_node, use_geom = False ):
 	return out_matrix
 
 
+def get_property_value( fbx_property ):
+	"""
+	Get the typed value of an fbx property
+
+	*Arguments:*
+		* ``fbx_property`` fbx property
+
+	*Keyword Arguments:*
+		* ``none``
+
+	*Returns:*
+		* ``Value`` value of the property, None if the type is not handled
+	"""
+
+	lPropertyDataType= fbx_property.GetPropertyDataType( )
+
+	# BOOL
+	if lPropertyDataType.GetType() == FBX_API.eFbxBool:
+		fbx_property = FBX_API.FbxPropertyBool1( fbx_property)
+		val = fbx_property.Get( )
+		return val
+
+	# REAL
+	elif lPropertyDataType.GetType() == FBX_API.eFbxDouble:
+		fbx_property = FBX_API.FbxPropertyDouble1( fbx_property)
+		val = fbx_property.Get( )
+		return val
+
+	# FLOAT
+	elif lPropertyDataType.GetType() == FBX_API.eFbxFloat:
+		fbx_property = FBX_API.FbxPropertyFloat1( fbx_property )
+		val = fbx_property.Get( )
+		return val
+
+	# COLOR
+	#elif lPropertyDataType.Is(DTColor3) or lPropertyDataType.Is(DTColor4):
+		#val = fbx_property.Get()
+		#lDefault=FbxGet <FbxColor> (fbx_property)
+		#sprintf(lBuf, "R=%f, G=%f, B=%f, A=%f", lDefault.mRed, lDefault.mGreen, lDefault.mBlue, lDefault.mAlpha)
+		#DisplayString("            Default Value: ", lBuf)
+	#    pass
+
+	# INTEGER
+	elif lPropertyDataType.GetType( ) == FBX_API.eFbxInt:
+		fbx_property = FBX_API.FbxPropertyInteger1( fbx_property )
+		val = fbx_property.Get( )
+		return val
+
+	# VECTOR
+	elif lPropertyDataType.GetType( ) == FBX_API.eFbxDouble3:
+		fbx_property = FBX_API.FbxPropertyDouble3( fbx_property )
+		val = fbx_property.Get( )
+		return val
+
+	# DOUBLE4
+	elif lPropertyDataType.GetType( ) == FBX_API.eFbxDouble4:
+		fbx_property = FBX_API.FbxPropertyDouble4( fbx_property )
+		val = fbx_property.Get( )
+		return val
+
+	# STRING
+	elif lPropertyDataType.GetType( ) == FBX_API.eFbxString:
+		fbx_property = FBX_API.FbxPropertyString( fbx_property )
+		val = fbx_property.Get( )
+		return val
+
+	# LIST
+	#elif lPropertyDataType.GetType() == eFbxEnum:
+	#val = fbx_property.Get()
+
+	# UNIDENTIFIED
+	return None
+
+
+def get_node_property_index( fbx_object ):
+	"""
+	Get the user defined properties of an fbx object
+	The properties are read in a single pass the first time the object is queried
+
+	*Arguments:*
+		* ``fbx_object`` fbx object
+
+	*Keyword Arguments:*
+		* ``none``
+
+	*Returns:*
+		* ``dict`` property name -> ( property data type, property value )
+	"""
+
+	try:
+		return NODE_PROPERTY_INDEX[ fbx_object ]
+	except KeyError:
+		pass
+
+	property_index = { }
+	fbx_property = fbx_object.GetFirstProperty( )
+	while fbx_property.IsValid( ):
+		if fbx_property.GetFlag( FBX_API.FbxPropertyAttr.eUserDefined ):
+			property_name = str( fbx_property.GetName( ) )
+
+			# the first property found with a name wins, matching the sdk lookup order
+			if not property_name in property_index:
+				property_index[ property_name ] = ( fbx_property.GetPropertyDataType( ), get_property_value( fbx_property ) )
+
+		fbx_property = fbx_object.GetNextProperty( fbx_property )
+
+	NODE_PROPERTY_INDEX[ fbx_object ] = property_index
+
+	return property_index
+
+
 def get_node_properties( fbx_object, property_name = None, get_value = False ):
 	"""
 	Get specific attributes off of an Fbx node
@@ -2724,96 +4284,14 @@ def get_node_properties( fbx_object, property_name = None, get_value = False ):
 	if property_name is None:
 		return False
 
-	property_count = 0
-	#lTitleStr = "    Property Count: "
-
-	fbx_property = fbx_object.GetFirstProperty( )
-	while fbx_property.IsValid( ):
-		if fbx_property.GetFlag( FbxCommon.FbxPropertyAttr.eUserDefined ):
-			property_count += 1
-
-		fbx_property= fbx_object.GetNextProperty( fbx_property )
-
-	if property_count == 0:
-		return # there are no user properties to display
+	property_info = get_node_property_index( fbx_object ).get( property_name )
+	if property_info is None:
+		return None
 
-	#DisplayInt(lTitleStr, property_count)
-
-	fbx_property = fbx_object.GetFirstProperty( )
-	i = 0
-	while fbx_property.IsValid( ):
-		if fbx_property.GetFlag( FbxCommon.FbxPropertyAttr.eUserDefined ):
-
-			if fbx_property.GetName( ) == property_name:
-				lPropertyDataType= fbx_property.GetPropertyDataType( )
-				if not get_value:
-					return lPropertyDataType
-
-				lPropertyDataType= fbx_property.GetPropertyDataType( )
-
-				# BOOL
-				if lPropertyDataType.GetType() == FbxCommon.eFbxBool:
-					fbx_property = FbxCommon.FbxPropertyBool1( fbx_property)
-					val = fbx_property.Get( )
-					return val
-
-				# REAL
-				elif lPropertyDataType.GetType() == FbxCommon.eFbxDouble:
-					fbx_property = FbxCommon.FbxPropertyDouble1( fbx_property)
-					val = fbx_property.Get( )
-					return val
-
-				# FLOAT
-				elif lPropertyDataType.GetType() == FbxCommon.eFbxFloat:
-					fbx_property = FbxCommon.FbxPropertyFloat1( fbx_property )
-					val = fbx_property.Get( )
-					return val
-
-				# COLOR
-				#elif lPropertyDataType.Is(DTColor3) or lPropertyDataType.Is(DTColor4):
-					#val = fbx_property.Get()
-					#lDefault=FbxGet <FbxColor> (fbx_property)
-					#sprintf(lBuf, "R=%f, G=%f, B=%f, A=%f", lDefault.mRed, lDefault.mGreen, lDefault.mBlue, lDefault.mAlpha)
-					#DisplayString("            Default Value: ", lBuf)
-				#    pass
-
-				# INTEGER
-				elif lPropertyDataType.GetType( ) == FbxCommon.eFbxInt:
-					fbx_property = FbxCommon.FbxPropertyInteger1( fbx_property )
-					val = fbx_property.Get( )
-					return val
-
-				# VECTOR
-				elif lPropertyDataType.GetType( ) == FbxCommon.eFbxDouble3:
-					fbx_property = FbxCommon.FbxPropertyDouble3( fbx_property )
-					val = fbx_property.Get( )
-					lBuf = "X=%f, Y=%f, Z=%f", (val[0], val[1], val[2])
-					return val
-
-				# DOUBLE4
-				elif lPropertyDataType.GetType( ) == FbxCommon.eFbxDouble4:
-					fbx_property = FbxCommon.FbxPropertyDouble4( fbx_property )
-					val = fbx_property.Get( )
-					lBuf = "X=%f, Y=%f, Z=%f, W=%f", (val[0], val[1], val[2], val[3])
-					return val
-
-				# STRING
-				elif lPropertyDataType.GetType( ) == FbxCommon.eFbxString:
-					fbx_property = FbxCommon.FbxPropertyString( fbx_property )
-					val = fbx_property.Get( )
-					return val
-
-				# LIST
-				#elif lPropertyDataType.GetType() == eFbxEnum:
-				#val = fbx_property.Get()
-
-				# UNIDENTIFIED
-				else:
-					pass
-					#DisplayString("            Default Value: UNIDENTIFIED")
-			i += 1
+	if not get_value:
+		return property_info[ 0 ]
 
-		fbx_property= fbx_object.GetNextProperty( fbx_property )
+	return property_info[ 1 ]
 
 
 
@@ -3220,16 +4698,19 @@ class App_Frame( wx.Frame ):
 		self.remove_temp_files = True
 		self.do_3dsmax = False
 		self.do_Maya = False
+		self.fbx_backend = FBX_BACKEND_SDK if FbxCommon else FBX_BACKEND_NATIVE
+		self.weld_epsilon = 0.0
+		self.batch_texture_rules = False
+		self.export_build_plan = False
 
 		self.colliders = [ ]
 		self.bones = [ ]
 		self.bone_orders = [ ]
 		self.bone_weights = [ ]
 		self.tags = [ ]
-		self.vertices = [ ]
 		self.meshes = [ ]
 		self.mesh_names = [ ]
-		self.mesh_data = [ ]
+		self.mesh_buffers = [ ]
 		self.materials = [ ]
 		self.material_elements = { }
 		self.material_names = [ ]
@@ -3248,9 +4729,18 @@ class App_Frame( wx.Frame ):
 		self.morphx_file = None
 		self.morphx_files = [ ]
 		self.blendshapes = [ ]
+		self.mesh_content_loaded = [ ]
 		self.node_index = 0
 		self.nodes = { }
 		self.game_folder = None
+		self.fbx_sdk_manager = None
+		self.fbx_scene = None
+		self.fbx_geometry_converter = None
+		self.fbx_cache_dir = os.path.join( WORKING_DIR, FbxCache.FBX_CACHE_FOLDER )
+		self.fbx_cache_key = None
+		self.extraction_pool = None
+		self.extraction_jobs = [ ]
+		self.artifact_store_dir = os.path.join( WORKING_DIR, ArtifactStore.ARTIFACT_STORE_FOLDER )
 
 		# Status Bar
 		self.CreateStatusBar()
@@ -3277,6 +4767,16 @@ class App_Frame( wx.Frame ):
 		self.settings_menu.Check( 203, self.do_3dsmax )
 		self.settings_menu.AppendCheckItem( 204, "&Force Maya YUp, Cm", "Force Maya YUp, Cm" )
 		self.settings_menu.Check( 204, self.do_Maya )
+		self.settings_menu.AppendSeparator()
+		self.settings_menu.AppendCheckItem( 205, "&Built-in FBX Reader", "Load FBX files without the Autodesk FBX SDK" )
+		self.settings_menu.Check( 205, self.fbx_backend == FBX_BACKEND_NATIVE )
+		self.settings_menu.Enable( 205, FbxCommon is not None )
+		self.settings_menu.Append( 206, "&Vertex Weld Tolerance...", "Tolerance used when welding split verts" )
+		self.settings_menu.Append( 207, "&Artifact Store Folder...", "Local or shared folder crunched files are reused from" )
+		self.settings_menu.AppendCheckItem( 208, "&Batch Texture Rules", "Crunch several textures with one texture cruncher process" )
+		self.settings_menu.Check( 208, self.batch_texture_rules )
+		self.settings_menu.AppendCheckItem( 209, "&Export Build Plan", "Write ninja and make build plans to the logs folder instead of crunching" )
+		self.settings_menu.Check( 209, self.export_build_plan )
 
 		## HELP
 		self.help_menu = wx.Menu()
@@ -3296,6 +4796,11 @@ class App_Frame( wx.Frame ):
 		wx.EVT_MENU( self, 202, self.toggle_triangulate )
 		wx.EVT_MENU( self, 203, self.toggle_3dsmax )
 		wx.EVT_MENU( self, 204, self.toggle_Maya )
+		wx.EVT_MENU( self, 205, self.toggle_fbx_backend )
+		wx.EVT_MENU( self, 206, self.on_set_weld_epsilon )
+		wx.EVT_MENU( self, 207, self.on_set_artifact_store_dir )
+		wx.EVT_MENU( self, 208, self.toggle_batch_texture_rules )
+		wx.EVT_MENU( self, 209, self.toggle_export_build_plan )
 		wx.EVT_MENU( self, 300, self.open_url )
 		wx.EVT_MENU( self, 301, self.open_url )
 		wx.EVT_MENU( self, 302, self.open_url )
@@ -3613,7 +5118,7 @@ class App_Frame( wx.Frame ):
 			* Randall Hess, randall.hess@volition-inc.com, 7/7/2014 2:38:24 PM
 		"""
 		# update the config file
-		config = { 'last_dir' : self.last_dir, 'remove_temp' : self.remove_temp_files, 'do_triangulate' : self.do_triangulate, 'game_folder' : self.game_folder, 'do_3dsmax' : self.do_3dsmax, 'do_Maya' : self.do_Maya }
+		config = { 'last_dir' : self.last_dir, 'remove_temp' : self.remove_temp_files, 'do_triangulate' : self.do_triangulate, 'game_folder' : self.game_folder, 'do_3dsmax' : self.do_3dsmax, 'do_Maya' : self.do_Maya, 'fbx_backend' : self.fbx_backend, 'weld_epsilon' : self.weld_epsilon, 'artifact_store_dir' : self.artifact_store_dir, 'batch_texture_rules' : self.batch_texture_rules, 'export_build_plan' : self.export_build_plan }
 		json.dump( config, open( self.config_file, 'w' ) )
 
 
@@ -3675,12 +5180,46 @@ class App_Frame( wx.Frame ):
 						self.do_3dsmax = do_3dsmax
 				except KeyError:
 					pass
+				try:
+					fbx_backend = load_dict[ 'fbx_backend' ]
+					if fbx_backend in ( FBX_BACKEND_SDK, FBX_BACKEND_NATIVE ) and FbxCommon:
+						self.fbx_backend = fbx_backend
+				except KeyError:
+					pass
+				try:
+					weld_epsilon = load_dict[ 'weld_epsilon' ]
+					if not weld_epsilon is None:
+						self.weld_epsilon = max( float( weld_epsilon ), 0.0 )
+				except ( KeyError, TypeError, ValueError ):
+					pass
 				try:
 					game_folder = load_dict[ 'game_folder' ]
 					if not do_triangulate is None:
 						self.game_folder = game_folder
 				except KeyError:
 					pass
+				try:
+					batch_texture_rules = load_dict[ 'batch_texture_rules' ]
+					if not batch_texture_rules is None:
+						self.batch_texture_rules = batch_texture_rules
+				except KeyError:
+					pass
+				try:
+					export_build_plan = load_dict[ 'export_build_plan' ]
+					if not export_build_plan is None:
+						self.export_build_plan = export_build_plan
+				except KeyError:
+					pass
+				try:
+					artifact_store_dir = load_dict[ 'artifact_store_dir' ]
+					if not artifact_store_dir is None:
+						self.artifact_store_dir = artifact_store_dir
+				except KeyError:
+					pass
+
+		# an empty store folder turns the store off
+		global ARTIFACT_STORE_DIR
+		ARTIFACT_STORE_DIR = self.artifact_store_dir or None
 
 
 	def on_set_game_folder( self, event ):
@@ -3699,12 +5238,48 @@ class App_Frame( wx.Frame ):
 			self.update_ui()
 
 
+	def on_process_output( self, line ):
+		"""
+		Show the latest output line of a cruncher or vpkg in the status bar, safe to call from the cruncher threads
+
+		*Arguments:*
+			* ``line`` Output line
+
+		*Keyword Arguments:*
+			* ``none``
+
+		*Returns:*
+			* ``none``
+		"""
+
+		if line.strip( ):
+			wx.CallAfter( self.SetStatusText, 'Status:   {0}'.format( line.strip( ) ) )
+
+
+	def on_cruncher_output( self, rule_file, line ):
+		"""
+		Show the latest output line of a cruncher in the status bar with the rule it is crunching
+
+		*Arguments:*
+			* ``rule_file`` Rule filename being crunched
+			* ``line`` Output line
+
+		*Keyword Arguments:*
+			* ``none``
+
+		*Returns:*
+			* ``none``
+		"""
+
+		self.on_process_output( '{0}: {1}'.format( os.path.basename( rule_file ), line.strip( ) ) if line.strip( ) else '' )
+
+
 	def on_package_files( self, event ):
 		if self.game_folder:
 			if self.fbx_file:
 				converted_folder = os.path.join( os.path.dirname( self.fbx_file ), 'output' )
 				if os.path.lexists( converted_folder ):
-					do_package = package_files( converted_folder, self.game_folder )
+					do_package = package_files( converted_folder, self.game_folder, output_callback = self.on_process_output, wait_callback = wx.Yield )
 					if do_package:
 						wx.MessageBox( 'Packaging files is complete', style = wx.OK, caption = 'Volition FBX Converter' )
 					else:
@@ -3746,6 +5321,9 @@ class App_Frame( wx.Frame ):
 			wx.MessageBox( 'A mesh has not been selected to convert!' + '\n\nAborting Conversion' , style = wx.OK, caption = 'Volition FBX Converter' )
 			return False
 
+		if not self.get_mesh_content( self.selected_mesh ):
+			return False
+
 		for index in range( len( self.materials[ self.selected_mesh ] ) ):
 			shader_value = self.table_grid.GetCellValue( index, 2 )
 			if shader_value:
@@ -3787,153 +5365,150 @@ class App_Frame( wx.Frame ):
 		global SMALL_LARGE_TEXTURES
 		SMALL_LARGE_TEXTURES = small_large_textures
 
-		# write the rigx
-		if self.rig_button.GetValue( ):
-			if not static_mesh:
-				if DEBUG_OUTPUT:
-					print("\n\n------------\nWrite Rigx\n------------\n")
-				write_rigx_file = write_rigx( self.rigx_files[ self.selected_mesh ], self.bone_orders[ self.selected_mesh ], self.tags )
-				if write_rigx_file:
-					did_convert = True
-					print 'Rigx file was written: {0}'.format( self.rigx_files[ self.selected_mesh ] )
-					rig_rule = write_crunch_rule( self.rigx_files[ self.selected_mesh ], '.rigx' )
-					did_crunch = crunch_rule( rig_rule )
-					if did_crunch:
-						print ' Crunched file: {0}'.format( rig_rule )
-					else:
-						print ' Failed to crunch file: {0}'.format( rig_rule )
+		mesh_index = self.selected_mesh
+		if static_mesh:
+			mesh_filename = self.smeshx_files[ mesh_index ]
+		else:
+			mesh_filename = self.cmeshx_files[ mesh_index ]
+
+		# write the intermediate files at the same time
+		# only the morphx depends on another file, it needs the vert order of the cmeshx
+		rigx_job = None
+		cmeshx_job = None
+		matlibx_job = None
+		morphx_job = None
+		ordered_verts = [ ]
+		writer_pool = multiprocessing.pool.ThreadPool( XML_WRITER_THREADS )
+		try:
+			# write the rigx
+			if self.rig_button.GetValue( ):
+				if not static_mesh:
+					if DEBUG_OUTPUT:
+						print("\n\n------------\nWrite Rigx\n------------\n")
+					rigx_job = writer_pool.apply_async( write_rigx, ( self.rigx_files[ mesh_index ], self.bone_orders[ mesh_index ], self.tags ) )
+				else:
+					wx.MessageBox( 'This is a static mesh: ' + self.mesh_names[ mesh_index ] + '\nNot exporting a rig file.\n\nConversion Warning' , style = wx.OK, caption = 'Volition FBX Converter' )
 
+			# write the cmesh or smeshx
+			if self.cmesh_button.GetValue( ):
+				cmeshx_job = writer_pool.apply_async( write_cmeshx, ( mesh_filename, self.meshes[ mesh_index ], self.mesh_names[ mesh_index ], self.mesh_buffers[ mesh_index ], self.bone_orders[ mesh_index ], self.tags, self.materials[ mesh_index ], self.bone_weights[ mesh_index ] ), { 'static_mesh' : static_mesh } )
 
-			else:
-				wx.MessageBox( 'This is a static mesh: ' + self.mesh_names[ self.selected_mesh ] + '\nNot exporting a rig file.\n\nConversion Warning' , style = wx.OK, caption = 'Volition FBX Converter' )
+			# write the matlibx
+			if self.matlib_button.GetValue( ):
+				matlibx_job = writer_pool.apply_async( write_matlibx, ( self.matlibx_files[ mesh_index ], self.materials[ mesh_index ] ) )
 
-		# write the cmesh or smeshx
-		ordered_verts = [ ]
-		if self.cmesh_button.GetValue( ):
-			if not static_mesh:
+			# write the morphx once the cmeshx vert order is known
+			if cmeshx_job:
+				while not cmeshx_job.ready( ):
+					wx.Yield( )
+					cmeshx_job.wait( 0.05 )
 				try:
-					write_cmeshx_file, ordered_verts = write_cmeshx( self.cmeshx_files[ self.selected_mesh ], self.meshes[ self.selected_mesh ], self.mesh_names[ self.selected_mesh ], self.mesh_data[ self.selected_mesh ], self.vertices[ self.selected_mesh ], self.bone_orders[ self.selected_mesh ], self.tags, self.materials[ self.selected_mesh ], self.bone_weights[ self.selected_mesh ], static_mesh = False )
+					write_cmeshx_file, ordered_verts = cmeshx_job.get( )
 				except IOError:
-					wx.MessageBox( 'Cannot write to the file at this time: ' + sself.cmeshx_files[ self.selected_mesh ], style = wx.OK, caption = 'Volition FBX Converter' )
+					wx.MessageBox( 'Cannot write to the file at this time: ' + mesh_filename, style = wx.OK, caption = 'Volition FBX Converter' )
+
+			if len( ordered_verts ):
+				if self.morph_button.GetValue( ):
+					if not static_mesh:
+						if self.blendshapes[ mesh_index ]:
+							morphx_job = writer_pool.apply_async( write_morphx, ( self.morphx_files[ mesh_index ], self.cmeshx_files[ mesh_index ], self.meshes[ mesh_index ], self.mesh_names[ mesh_index ], self.mesh_buffers[ mesh_index ], self.blendshapes[ mesh_index ], ordered_verts ) )
+		finally:
+			writer_pool.close( )
+			writer_pool.join( )
+
+		# crunch the written files as a build graph, rules that do not depend on each other crunch at the same time
+		scheduler = Crunch_Scheduler( output_callback = self.on_cruncher_output )
+		mesh_rule = None
+		mat_rule = None
+
+		if rigx_job:
+			write_rigx_file = rigx_job.get( )
+			if write_rigx_file:
+				did_convert = True
+				print 'Rigx file was written: {0}'.format( self.rigx_files[ mesh_index ] )
+				scheduler.add_rule( write_crunch_rule( self.rigx_files[ mesh_index ], '.rigx' ) )
+
+		if write_cmeshx_file:
+			did_convert = True
 
-				if write_cmeshx_file:
-					print 'Cmeshx file was written: {0}'.format( self.cmeshx_files[ self.selected_mesh ] )
+			if not static_mesh:
+				print 'Cmeshx file was written: {0}'.format( mesh_filename )
+				mesh_rule = scheduler.add_rule( write_crunch_rule( mesh_filename, '.cmeshx' ) )
 			else:
-				# write out a smeshx instead
-				write_cmeshx_file = write_cmeshx( self.smeshx_files[ self.selected_mesh ], self.meshes[ self.selected_mesh ], self.mesh_names[ self.selected_mesh ], self.mesh_data[ self.selected_mesh ], self.vertices[ self.selected_mesh ], self.bone_orders[ self.selected_mesh ], self.tags, self.materials[ self.selected_mesh ], self.bone_weights[ self.selected_mesh ], static_mesh = True )
-				if write_cmeshx_file:
-					print 'Smeshx file was written: {0}'.format( self.smeshx_files[ self.selected_mesh ] )
+				print 'Smeshx file was written: {0}'.format( mesh_filename )
+				mesh_rule = scheduler.add_rule( write_crunch_rule( mesh_filename, '.smeshx' ) )
 
-			if write_cmeshx_file:
+		if matlibx_job:
+			write_matlibx_file = matlibx_job.get( )
+			if write_matlibx_file:
 				did_convert = True
+				print 'Matlibx file was written: {0}'.format( self.matlibx_files[ mesh_index ] )
+				mat_rule = scheduler.add_rule( write_crunch_rule( self.matlibx_files[ mesh_index ], '.matlibx' ) )
 
-				if not static_mesh:
-					mesh_rule = write_crunch_rule( self.cmeshx_files[ self.selected_mesh ], '.cmeshx' )
-					did_crunch = crunch_rule( mesh_rule )
-					if did_crunch:
-						print ' Crunched file: {0}'.format( mesh_rule )
-					else:
-						print ' Failed to crunch file: {0}'.format( mesh_rule )
-				else:
-					mesh_rule = write_crunch_rule( self.smeshx_files[ self.selected_mesh ], '.smeshx' )
-					did_crunch = crunch_rule( mesh_rule )
-					if did_crunch:
-						print ' Crunched file: {0}'.format( mesh_rule )
-					else:
-						print ' Failed to crunch file: {0}'.format( mesh_rule )
-
-		# write and crunch the matlibx
-		if self.matlib_button.GetValue( ):
-			#if not static_mesh:
-			write_matlibx_file = write_matlibx( self.matlibx_files[ self.selected_mesh ], self.materials[ self.selected_mesh ] )
-			if write_matlibx_file:
+		if morphx_job:
+			write_morphx_file = morphx_job.get( )
+			if write_morphx_file:
 				did_convert = True
-				print 'Matlibx file was written: {0}'.format( self.matlibx_files[ self.selected_mesh ] )
-				mat_rule = write_crunch_rule( self.matlibx_files[ self.selected_mesh ], '.matlibx' )
-				did_crunch = crunch_rule( mat_rule )
-				if did_crunch:
-					print ' Crunched file: {0}'.format( mat_rule )
-				else:
-					print ' Failed to crunch file: {0}'.format( mat_rule )
+				print 'Morphx file was written: {0}'.format( self.morphx_files[ mesh_index ] )
 
-		# write and crunch the morphx
-		if ordered_verts:
-			if self.morph_button.GetValue( ):
-				if not static_mesh:
-					if self.blendshapes[ self.selected_mesh ]:
-						write_morphx_file = write_morphx( self.morphx_files[ self.selected_mesh ], self.cmeshx_files[ self.selected_mesh ], self.meshes[ self.selected_mesh ], self.mesh_names[ self.selected_mesh ], self.vertices[ self.selected_mesh ], self.blendshapes[ self.selected_mesh ], self.mesh_data[ self.selected_mesh ], ordered_verts )
-						if write_morphx_file:
-							did_convert = True
-							print 'Morphx file was written: {0}'.format( self.morphx_files[ self.selected_mesh ] )
-							morph_rule = write_crunch_rule( self.morphx_files[ self.selected_mesh ], '.morphx' )
-							did_crunch = crunch_rule( morph_rule )
-							if did_crunch:
-								print ' Crunched file: {0}'.format( morph_rule )
-							else:
-								print ' Failed to crunch file: {0}'.format( morph_rule )
-
-		# write out the peg rule
-		timer_val = 2.25
-		total_time = 0.0
-		if write_cmeshx_file or write_matlibx_file:
+				# the morph cruncher reads the .morph_key_pc written by the mesh cruncher
+				morph_rule = write_crunch_rule( self.morphx_files[ mesh_index ], '.morphx' )
+				scheduler.add_rule( morph_rule, depends_on = [ mesh_rule ] if mesh_rule else None )
 
-			# write a rule for each texture file
-			for texture in all_textures:
+		# write out the texture and peg rules
+		if write_cmeshx_file or write_matlibx_file:
 
-				if static_mesh:
-					texture_rule = write_crunch_rule( self.smeshx_files[ self.selected_mesh ], '.texture', textures = texture )
-					did_crunch = crunch_rule( texture_rule )
-					if did_crunch:
-						print ' Crunched file: {0}'.format( texture_rule )
-					else:
-						print ' Failed to crunch file: {0}'.format( texture_rule )
-				else:
-					texture_rule = write_crunch_rule( self.cmeshx_files[ self.selected_mesh ], '.texture', textures = texture )
-					did_crunch = crunch_rule( texture_rule )
-					if did_crunch:
-						print ' Crunched file: {0}'.format( texture_rule )
-					else:
-						print ' Failed to crunch file: {0}'.format( texture_rule )
-
-				# wait for the textures to crunch this is not very reliable..
-				time.sleep( timer_val )
-				total_time += timer_val
-
-			# write out the mesh peg files
-			if static_mesh:
-				peg_rule = write_crunch_rule( self.smeshx_files[ self.selected_mesh ], '.peg', textures = self.textures[ self.selected_mesh ] )
-				did_crunch = crunch_rule( peg_rule )
-				if did_crunch:
-					print ' Crunched file: {0}'.format( peg_rule )
-				else:
-					print ' Failed to crunch file: {0}'.format( peg_rule )
+			# write a rule for each texture file, or batch the textures to start fewer cruncher processes
+			texture_rules = { }
+			if self.batch_texture_rules:
+				batch_textures = [ ]
+				for texture in all_textures:
+					if not texture in batch_textures:
+						batch_textures.append( texture )
+
+				batch_size = scheduler.get_batch_size( len( batch_textures ) )
+				mesh_base_name = os.path.splitext( os.path.basename( mesh_filename ) )[ 0 ]
+				for batch_index, batch_start in enumerate( range( 0, len( batch_textures ), batch_size ) ):
+					batch = batch_textures[ batch_start : batch_start + batch_size ]
+					batch_name = '{0}_textures_{1}'.format( mesh_base_name, batch_index )
+					batch_rule = scheduler.add_rule( write_crunch_rule( mesh_filename, '.texture', textures = batch, rule_name = batch_name ) )
+					for texture in batch:
+						texture_rules[ texture ] = batch_rule
 			else:
-				peg_rule = write_crunch_rule( self.cmeshx_files[ self.selected_mesh ], '.peg', textures = self.textures[ self.selected_mesh ] )
-				did_crunch = crunch_rule( peg_rule )
-				if did_crunch:
-					print ' Crunched file: {0}'.format( peg_rule )
-				else:
-					print ' Failed to crunch file: {0}'.format( peg_rule )
+				for texture in all_textures:
+					texture_rules[ texture ] = scheduler.add_rule( write_crunch_rule( mesh_filename, '.texture', textures = texture ) )
+
+			# write out the mesh peg file, it is assembled from the crunched textures
+			peg_rule = write_crunch_rule( mesh_filename, '.peg', textures = self.textures[ mesh_index ] )
+			scheduler.add_rule( peg_rule, depends_on = [ texture_rules[ texture ] for texture in self.textures[ mesh_index ] ] )
 
 			# write out the matlib peg file
 			if write_matlibx_file:
 
 				# pass through lg textures if found
 				use_textures = [ ]
-				for texture in self.textures[ self.selected_mesh ]:
-					this_texture = texture
-					for key, val in small_large_textures.iteritems( ):
-						if key == texture:
-							this_texture = val
-							break
-					use_textures.append( this_texture )
-
-				peg_rule = write_crunch_rule( self.matlibx_files[ self.selected_mesh ], '.peg', textures = use_textures )
-				did_crunch = crunch_rule( peg_rule )
-				if did_crunch:
-					print ' Crunched file: {0}'.format( peg_rule )
-				else:
-					print ' Failed to crunch file: {0}'.format( peg_rule )
+				for texture in self.textures[ mesh_index ]:
+					use_textures.append( small_large_textures.get( texture, texture ) )
+
+				peg_rule = write_crunch_rule( self.matlibx_files[ mesh_index ], '.peg', textures = use_textures )
+				scheduler.add_rule( peg_rule, depends_on = [ mat_rule ] + [ texture_rules[ texture ] for texture in use_textures ] )
+
+		# write the crunch plan for an external build tool, or crunch the rules now
+		if self.export_build_plan:
+			package_commands = [ ]
+			if self.game_folder:
+				converted_folder = os.path.join( os.path.dirname( self.fbx_file ), 'output' )
+				package_executable = '"{0}"'.format( os.path.join( WORKING_DIR, 'vpkg_wd.exe' ) )
+				asm_files, str2_files = get_package_files( self.game_folder )
+				for str2_file in str2_files:
+					for asm_file in asm_files:
+						package_commands.append( get_package_command( self.game_folder, str2_file, asm_file, converted_folder, package_executable = package_executable ) )
+
+			plan_name = os.path.splitext( os.path.basename( mesh_filename ) )[ 0 ]
+			for plan_file in scheduler.write_build_plan( os.path.join( os.path.dirname( mesh_filename ), 'logs' ), plan_name, package_commands = package_commands ):
+				print 'Build plan was written: {0}'.format( plan_file )
+		else:
+			did_crunch = scheduler.run( wait_callback = wx.Yield )
 
 		self.SetSizer( self.mSizer )
 		self.SetFocus( )
@@ -3944,17 +5519,18 @@ class App_Frame( wx.Frame ):
 			else:
 				#print '\n\nRunning twice just to make sure textures were crunched before pegs were assembled:\n'
 				#self.convert_files( wx.EVT_BUTTON, do_notify = False )
-				if self.remove_temp_files:
-					time.sleep( total_time )
-
+				# the intermediate files are the sources of an exported build plan
+				if self.remove_temp_files and not self.export_build_plan:
 					# delete temp crunched texture files
 					intermediate_names = [ '.cmeshx', '.rigx', '.smeshx', '.matlibx', '.morphx' ]
 					local_dir = os.path.dirname( self.fbx_file )
 					if os.path.lexists( local_dir ):
+						# keep the crunched targets recorded in the crunch manifest so unchanged rules are not crunched again
+						crunched_targets = get_crunched_targets( os.path.join( local_dir, 'output', CRUNCH_MANIFEST_NAME ) )
 						files = os.listdir( local_dir )
 						if files:
 							for afile in files:
-								end_pc = afile.endswith( '_pc' )
+								end_pc = afile.endswith( '_pc' ) and not os.path.normcase( os.path.abspath( os.path.join( local_dir, afile ) ) ) in crunched_targets
 								is_intermediate = False
 								for ext in intermediate_names:
 									if afile.endswith( ext ):
@@ -3972,7 +5548,7 @@ class App_Frame( wx.Frame ):
 									if afile.endswith( '.log' ):
 										print '\tRemoving temp file: {0}'.format( afile )
 										os.remove( os.path.join( output_dir, afile ) )
-									elif afile.endswith('.morph_key_pc'):
+									elif afile.endswith('.morph_key_pc') and not os.path.normcase( os.path.abspath( os.path.join( output_dir, afile ) ) ) in crunched_targets:
 										print '\tRemoving temp file: {0}'.format( afile )
 										os.remove( os.path.join( output_dir, afile ) )
 
@@ -4004,10 +5580,9 @@ class App_Frame( wx.Frame ):
 		self.bone_orders = [ ]
 		self.bone_weights = [ ]
 		self.tags = [ ]
-		self.vertices = [ ]
 		self.meshes = [ ]
 		self.mesh_names = [ ]
-		self.mesh_data = [ ]
+		self.mesh_buffers = [ ]
 		self.materials = [ ]
 		self.material_names = [ ]
 		self.textures = [ ]
@@ -4026,6 +5601,21 @@ class App_Frame( wx.Frame ):
 		self.blendshapes = [ ]
 		self.morphx_file = None
 		self.morphx_files = [ ]
+		self.mesh_content_loaded = [ ]
+
+		# Destroy all objects created by the FBX SDK for the previous file
+		if self.fbx_sdk_manager:
+			self.fbx_sdk_manager.Destroy( )
+		self.fbx_sdk_manager = None
+		self.fbx_scene = None
+		self.fbx_geometry_converter = None
+		self.fbx_cache_key = None
+
+		# stop extracting the meshes of the previous file
+		if self.extraction_pool:
+			self.extraction_pool.terminate( )
+		self.extraction_pool = None
+		self.extraction_jobs = [ ]
 
 		self.update_ui( )
 
@@ -4123,6 +5713,120 @@ class App_Frame( wx.Frame ):
 		self.save_settings( )
 
 
+	def toggle_fbx_backend( self, event ):
+		"""
+		Toggle loading fbx files with the built-in reader instead of the FBX SDK
+
+		*Arguments:*
+			* ``wx.Event`` wx event
+
+		*Keyword Arguments:*
+			* ``None``
+
+		*Returns:*
+			* ``None``
+		"""
+
+		if self.fbx_backend == FBX_BACKEND_NATIVE and FbxCommon:
+			self.fbx_backend = FBX_BACKEND_SDK
+		else:
+			self.fbx_backend = FBX_BACKEND_NATIVE
+		self.settings_menu.Check( 205, self.fbx_backend == FBX_BACKEND_NATIVE )
+		self.save_settings( )
+
+
+	def toggle_batch_texture_rules( self, event ):
+		"""
+		Toggle batching the textures of a conversion into a few texture rules instead of one rule per texture
+
+		*Arguments:*
+			* ``wx.Event`` wx event
+
+		*Keyword Arguments:*
+			* ``None``
+
+		*Returns:*
+			* ``None``
+		"""
+
+		self.batch_texture_rules = not self.batch_texture_rules
+		self.settings_menu.Check( 208, self.batch_texture_rules )
+		self.save_settings( )
+
+
+	def toggle_export_build_plan( self, event ):
+		"""
+		Toggle writing the crunch plan of a conversion as ninja and make build plans instead of crunching it
+
+		*Arguments:*
+			* ``wx.Event`` wx event
+
+		*Keyword Arguments:*
+			* ``None``
+
+		*Returns:*
+			* ``None``
+		"""
+
+		self.export_build_plan = not self.export_build_plan
+		self.settings_menu.Check( 209, self.export_build_plan )
+		self.save_settings( )
+
+
+	def on_set_weld_epsilon( self, event ):
+		"""
+		Set the tolerance used when welding split verts, 0 only welds verts with identical values
+		Reload the fbx file for the new tolerance to take effect
+
+		*Arguments:*
+			* ``wx.Event`` wx event
+
+		*Keyword Arguments:*
+			* ``None``
+
+		*Returns:*
+			* ``None``
+		"""
+
+		entry_dialog = wx.TextEntryDialog( self, 'Vertex weld tolerance ( 0 for exact matches )', 'Volition FBX Converter', str( self.weld_epsilon ) )
+		if entry_dialog.ShowModal( ) == wx.ID_OK:
+			try:
+				weld_epsilon = float( entry_dialog.GetValue( ) )
+			except ValueError:
+				weld_epsilon = -1.0
+
+			if weld_epsilon < 0.0:
+				wx.MessageBox( 'The weld tolerance must be a number, 0 or greater', style = wx.OK, caption = 'Volition FBX Converter' )
+			else:
+				self.weld_epsilon = weld_epsilon
+				self.save_settings( )
+		entry_dialog.Destroy( )
+
+
+	def on_set_artifact_store_dir( self, event ):
+		"""
+		Set the folder crunched files are stored in and reused from
+		The folder can be shared by several projects or machines
+
+		*Arguments:*
+			* ``wx.Event`` wx event
+
+		*Keyword Arguments:*
+			* ``None``
+
+		*Returns:*
+			* ``None``
+		"""
+
+		open_dialog = wx.DirDialog( self, message = 'Pick the artifact store folder', defaultPath = self.artifact_store_dir or WORKING_DIR )
+		if open_dialog.ShowModal( ) == wx.ID_OK:
+			global ARTIFACT_STORE_DIR
+			self.artifact_store_dir = open_dialog.GetPath( )
+			ARTIFACT_STORE_DIR = self.artifact_store_dir
+			self.save_settings( )
+		open_dialog.Destroy( )
+
+
 	def load_fbx_file( self, event ):
 		"""
 		Import and Load the fbx file
@@ -4175,7 +5879,7 @@ class App_Frame( wx.Frame ):
 			base_no_ext = os.path.splitext( base_name )[ 0 ]
 
 			# Load the fbx scene
-			fbx_status, fbx_scene, lSdkManager = load_fbx_scene( fbx_file, self.do_3dsmax, self.do_Maya )
+			fbx_status, fbx_scene, lSdkManager = load_fbx_scene( fbx_file, self.do_3dsmax, self.do_Maya, backend = self.fbx_backend )
 			if fbx_status:
 
 				if DEBUG_OUTPUT:
@@ -4187,12 +5891,15 @@ class App_Frame( wx.Frame ):
 				if DEBUG_OUTPUT:
 					print("\n\n------------\nGet Bone Hierarchy\n------------\n")
 
-				# triangulate all meshes in the scene
+				# keep the scene around, mesh geometry is only extracted once a mesh is selected or converted
+				self.fbx_sdk_manager = lSdkManager
+				self.fbx_scene = fbx_scene
 				if self.do_triangulate:
-					print 'Triangulating meshes'
-					geo_converter = FbxCommon.FbxGeometryConverter( lSdkManager )
-					if geo_converter:
-						do_triangulate = geo_converter.Triangulate( fbx_scene, True, False )
+					self.fbx_geometry_converter = FBX_API.FbxGeometryConverter( lSdkManager )
+
+				# extracted mesh data is cached on disk by file contents and import settings
+				cache_settings = { 'do_3dsmax' : self.do_3dsmax, 'do_Maya' : self.do_Maya, 'do_triangulate' : self.do_triangulate, 'weld_epsilon' : self.weld_epsilon, 'fbx_api' : FBX_API.__name__ }
+				self.fbx_cache_key = FbxCache.get_cache_key( fbx_file, cache_settings )
 
 				# Filter out any mesh objects that might be acting as bones
 				# remove any of those "bones" from the mesh list
@@ -4202,8 +5909,7 @@ class App_Frame( wx.Frame ):
 					# get the vert/weight info
 					self.SetStatusText( 'Getting Mesh Bone Weights: {0}'.format( mesh.GetName( ) ) )
 					progress_dlg._msg.SetLabelText( 'Getting Bone Weights' )
-					bone_weights, bones = get_boneweights( lmesh, [ ], self.bones, progress_dlg )
-					#self.bone_weights.append( bone_weights )
+					skin_clusters, bones = get_skin_clusters( lmesh, self.bones, get_weights = False )
 
 					# determine if bones found in bone weights are in the self.meshes list
 					# if they are in the self.meshes list, we need to remove them,
@@ -4233,62 +5939,15 @@ class App_Frame( wx.Frame ):
 				for bone in self.bones:
 					bone.update_attributes( )
 
-				# Get the mesh face data ( Verts, Normals, UV's )
+				# Mesh face data, bone weights and blendshapes are extracted on demand by get_mesh_content
 				for mesh in self.meshes:
-
-					# zero the position of static meshes
-					lmesh = mesh.GetNodeAttribute( )
-					if lmesh.GetDeformerCount() == 0:
-						mesh_gbl_transform = mesh.EvaluateGlobalTransform()
-						mesh_gbl_transform.SetT( FbxCommon.FbxVector4() )
-						mesh_lcl_transform = mesh.EvaluateLocalTransform()
-						mesh_lcl_transform.SetT( FbxCommon.FbxVector4() )
-
-					self.SetStatusText( 'Getting Mesh Data: {0}'.format( mesh.GetName( ) ) )
-					progress_dlg._msg.SetLabelText( 'Getting the Mesh Data...' )
-
-					mesh_data, vertices = get_mesh_data( mesh, progress_dlg )
-					if not mesh_data or not vertices:
-						lSdkManager.Destroy()
-						progress_dlg.Destroy( )
-						wx.MessageBox( 'This mesh was not exported with Triangulate on.\n{0}\n\nExport the fbx file again with Triangulate checked on or toggle on Triangulate Mesh in the Settings!'.format( self.fbx_file ), style = wx.OK )
-						return False
-
-					num_polygon_verts = lmesh.GetPolygonVertexCount( )
-					self.mesh_data.append( mesh_data )
-					self.vertices.append( vertices )
-
-					colliders = [ ] # TODO get colliders
-					self.colliders.append( colliders )
-
-					num_polygons = lmesh.GetPolygonCount( )
-
-					# get the vert/weight info
-					self.SetStatusText( 'Getting Mesh Bone Weights: {0}'.format( mesh.GetName( ) ) )
-					progress_dlg._msg.SetLabelText( 'Getting Bone Weights..' )
-					bone_weights, bones = get_boneweights( lmesh, vertices, self.bones, progress_dlg )
-
-					# only add a mesh to the list if it has bones
-					# we are only exporting character meshes at this time
-					if bones:
-						self.bone_weights.append( bone_weights )
-					else:
-						self.bone_weights.append( None )
-
 					self.mesh_names.append( mesh.GetName() )
-					self.SetStatusText( 'Get the bone order ...' )
-					self.update_bone_attributes( self.bones, self.nodes )
-					progress_dlg._msg.SetLabelText( 'Getting the Bone Order...' )
-					bone_order = self.get_bone_order( progress_dlg )
-					self.bone_orders.append( bone_order )
-
-					# if there are bones its likely a skinned mesh
-					# check for blendshapes
-					blendshapes = get_blendshapes( mesh, vertices, progress_dlg)
-					if len( blendshapes ) > 0:
-						self.blendshapes.append( blendshapes )
-					else:
-						self.blendshapes.append( None )
+					self.mesh_buffers.append( None )
+					self.colliders.append( None )
+					self.bone_weights.append( None )
+					self.bone_orders.append( None )
+					self.blendshapes.append( None )
+					self.mesh_content_loaded.append( None )
 
 				# update the file lists based on the mesh inputs
 				for mesh in self.meshes:
@@ -4319,8 +5978,8 @@ class App_Frame( wx.Frame ):
 						mat_index += 1
 
 						# Get and Set the Material Texture Properties
-						for texture_index in range( FbxCommon.FbxLayerElement.sTypeTextureCount() ):
-							texture_property = material.FindProperty( FbxCommon.FbxLayerElement.sTextureChannelNames( texture_index ) )
+						for texture_index in range( FBX_API.FbxLayerElement.sTypeTextureCount() ):
+							texture_property = material.FindProperty( FBX_API.FbxLayerElement.sTextureChannelNames( texture_index ) )
 							if DEBUG_OUTPUT:
 								print 'Material: {0} Texture property: {1}'.format( material.GetName(), texture_property.GetName() )
 							if texture_property.IsValid():
@@ -4334,9 +5993,9 @@ class App_Frame( wx.Frame ):
 
 
 								texture_filename = None
-								num_textures = texture_property.GetSrcObjectCount( FbxCommon.FbxTexture.ClassId )
+								num_textures = texture_property.GetSrcObjectCount( FBX_API.FbxTexture.ClassId )
 								for num in range( num_textures ):
-									cur_texture = texture_property.GetSrcObject( FbxCommon.FbxTexture.ClassId, num )
+									cur_texture = texture_property.GetSrcObject( FBX_API.FbxTexture.ClassId, num )
 									if cur_texture:
 										texture_filename =cur_texture.GetFileName( )
 
@@ -4380,10 +6039,10 @@ class App_Frame( wx.Frame ):
 					self.materials.append( mats )
 					self.textures.append( textures )
 
-				self.SetStatusText( 'FBX File loaded: {0}'.format(  fbx_file.lower( ) ) )
+				# extract the meshes of multi mesh files in the background
+				self.start_mesh_extraction( progress_dlg )
 
-				# Destroy all objects created by the FBX SDK.
-				lSdkManager.Destroy()
+				self.SetStatusText( 'FBX File loaded: {0}'.format(  fbx_file.lower( ) ) )
 				progress_dlg.Destroy( )
 
 		wx.Yield( )
@@ -4393,6 +6052,207 @@ class App_Frame( wx.Frame ):
 		return True
 
 
+	def get_mesh_content( self, mesh_index ):
+		"""
+		Extract the face data, bone weights, bone order and blendshapes for a mesh.
+		The data is only extracted the first time a mesh is selected or converted,
+		afterwards the stored results are used
+
+		*Arguments:*
+			* ``mesh_index`` Index of the mesh in self.meshes
+
+		*Keyword Arguments:*
+			* ``none``
+
+		*Returns:*
+			* ``bool`` True if the mesh data is available
+		"""
+
+		mesh_loaded = self.mesh_content_loaded[ mesh_index ]
+		if not mesh_loaded is None:
+			return mesh_loaded
+
+		if not self.fbx_sdk_manager:
+			return False
+
+		mesh = self.meshes[ mesh_index ]
+
+		# use the cached data if this mesh was extracted before with the same settings
+		cache_filename = None
+		if self.fbx_cache_key:
+			cache_filename = FbxCache.get_cache_filename( self.fbx_cache_dir, self.fbx_cache_key, mesh_index )
+			if self.load_mesh_cache( mesh_index, cache_filename ):
+				return True
+
+		progress_dlg = wx.lib.agw.pyprogress.PyProgress( None, -1, "Importing FBX File", "Processing mesh: {0}".format( mesh.GetName( ) ), agwStyle=wx.PD_APP_MODAL )
+
+		self.SetStatusText( 'Getting Mesh Data: {0}'.format( mesh.GetName( ) ) )
+		progress_dlg._msg.SetLabelText( 'Getting the Mesh Data...' )
+
+		extraction_job = None
+		if self.extraction_jobs:
+			extraction_job = self.extraction_jobs[ mesh_index ]
+			self.extraction_jobs[ mesh_index ] = None
+
+		if extraction_job:
+			# the mesh is already being extracted by a worker process
+			while not extraction_job.ready( ):
+				wx.Yield( )
+				progress_dlg.UpdatePulse( )
+				extraction_job.wait( 0.1 )
+			mesh_content = extraction_job.get( )
+		else:
+			snapshot = self.get_mesh_snapshot( mesh_index )
+			mesh_content = extract_mesh_content( snapshot, weld_epsilon = self.weld_epsilon, progress_dlg = progress_dlg )
+
+		if mesh_content is None:
+			self.mesh_content_loaded[ mesh_index ] = False
+			progress_dlg.Destroy( )
+			wx.MessageBox( 'This mesh was not exported with Triangulate on.\n{0}\n\nExport the fbx file again with Triangulate checked on or toggle on Triangulate Mesh in the Settings!'.format( self.fbx_file ), style = wx.OK )
+			return False
+
+		mesh_buffers, weld_info, bone_weights, blendshapes = mesh_content
+		self.mesh_buffers[ mesh_index ] = mesh_buffers
+
+		colliders = [ ] # TODO get colliders
+		self.colliders[ mesh_index ] = colliders
+
+		self.bone_weights[ mesh_index ] = bone_weights
+
+		self.SetStatusText( 'Get the bone order ...' )
+		self.update_bone_attributes( self.bones, self.nodes )
+		progress_dlg._msg.SetLabelText( 'Getting the Bone Order...' )
+		self.bone_orders[ mesh_index ] = self.get_bone_order( progress_dlg )
+
+		self.blendshapes[ mesh_index ] = blendshapes
+
+		self.mesh_content_loaded[ mesh_index ] = True
+
+		if cache_filename:
+			cache_arrays, cache_meta = pack_mesh_content( mesh_buffers, self.bone_weights[ mesh_index ], self.blendshapes[ mesh_index ], self.bone_orders[ mesh_index ], self.bones, self.tags )
+			FbxCache.save_cache_entry( cache_filename, cache_arrays, cache_meta )
+
+		self.SetStatusText( 'Mesh loaded: {0}  Split verts: {1}  Welded verts: {2}'.format( mesh.GetName( ), weld_info[ 'split' ], weld_info[ 'welded' ] ) )
+		progress_dlg.Destroy( )
+
+		return True
+
+
+	def get_mesh_snapshot( self, mesh_index ):
+		"""
+		Prepare a mesh in the fbx scene and read its raw arrays for extraction
+
+		*Arguments:*
+			* ``mesh_index`` Index of the mesh in self.meshes
+
+		*Keyword Arguments:*
+			* ``none``
+
+		*Returns:*
+			* ``snapshot`` Mesh_Snapshot of the mesh
+		"""
+
+		mesh = self.meshes[ mesh_index ]
+
+		# triangulate the mesh
+		if self.fbx_geometry_converter:
+			print 'Triangulating mesh: {0}'.format( mesh.GetName( ) )
+			self.fbx_geometry_converter.Triangulate( mesh.GetNodeAttribute( ), True )
+
+		# zero the position of static meshes
+		lmesh = mesh.GetNodeAttribute( )
+		if lmesh.GetDeformerCount() == 0:
+			mesh_gbl_transform = mesh.EvaluateGlobalTransform()
+			mesh_gbl_transform.SetT( FBX_API.FbxVector4() )
+			mesh_lcl_transform = mesh.EvaluateLocalTransform()
+			mesh_lcl_transform.SetT( FBX_API.FbxVector4() )
+
+		return get_mesh_snapshot( mesh, self.bones )
+
+
+	def start_mesh_extraction( self, progress_dlg ):
+		"""
+		Start extracting the meshes that are not cached in a pool of worker processes.
+		The fbx arrays of each mesh are read here, the worker processes do the rest
+		and get_mesh_content picks up the results once a mesh is selected or converted.
+		Files with a single mesh to extract are left to get_mesh_content
+
+		*Arguments:*
+			* ``progress_dlg`` dialog object
+
+		*Keyword Arguments:*
+			* ``none``
+
+		*Returns:*
+			* ``None``
+		"""
+
+		self.extraction_jobs = [ None ] * len( self.meshes )
+
+		mesh_indices = [ ]
+		for mesh_index in range( len( self.meshes ) ):
+			if self.fbx_cache_key and os.path.isfile( FbxCache.get_cache_filename( self.fbx_cache_dir, self.fbx_cache_key, mesh_index ) ):
+				continue
+			mesh_indices.append( mesh_index )
+
+		if len( mesh_indices ) < 2:
+			return
+
+		try:
+			self.extraction_pool = multiprocessing.Pool( min( multiprocessing.cpu_count( ), len( mesh_indices ) ), init_extraction_worker, ( IS_3DSMAX, IS_MAYAYUP ) )
+		except ( OSError, ValueError, NotImplementedError ) as error:
+			# extract the meshes one at a time as they are selected
+			print 'Could not start the mesh extraction processes: {0}'.format( error )
+			self.extraction_pool = None
+			return
+
+		for mesh_index in mesh_indices:
+			wx.Yield( )
+			progress_dlg._msg.SetLabelText( 'Reading mesh: {0}'.format( self.mesh_names[ mesh_index ] ) )
+			progress_dlg.UpdatePulse( )
+
+			snapshot = self.get_mesh_snapshot( mesh_index )
+			self.extraction_jobs[ mesh_index ] = self.extraction_pool.apply_async( extract_mesh_content, ( snapshot, self.weld_epsilon ) )
+
+		self.extraction_pool.close( )
+
+
+	def load_mesh_cache( self, mesh_index, cache_filename ):
+		"""
+		Fill out the mesh data from an fbx cache entry
+
+		*Arguments:*
+			* ``mesh_index`` Index of the mesh in self.meshes
+			* ``cache_filename`` Cache entry for the mesh
+
+		*Keyword Arguments:*
+			* ``none``
+
+		*Returns:*
+			* ``bool`` True if the cache entry was found and used
+		"""
+
+		cache_arrays = FbxCache.load_cache_entry( cache_filename )
+		if cache_arrays is None:
+			return False
+
+		mesh_content = unpack_mesh_content( cache_arrays, cache_arrays[ 'meta' ], self.bones, self.tags )
+		if mesh_content is None:
+			return False
+
+		mesh_buffers, bone_weights, blendshapes, bone_order = mesh_content
+		self.mesh_buffers[ mesh_index ] = mesh_buffers
+		self.colliders[ mesh_index ] = [ ]
+		self.bone_weights[ mesh_index ] = bone_weights
+		self.blendshapes[ mesh_index ] = blendshapes
+		self.bone_orders[ mesh_index ] = bone_order
+		self.mesh_content_loaded[ mesh_index ] = True
+
+		self.SetStatusText( 'Mesh loaded from cache: {0}'.format( self.mesh_names[ mesh_index ] ) )
+
+		return True
+
+
 	def update_bone_attributes( self, bones, nodes ):
 		"""
 		Make sure the attributes on the bones are updated if they didnt previously exist
@@ -4563,13 +6423,13 @@ class App_Frame( wx.Frame ):
 
 			# Get the node type
 			node_attribute_type = ( node.GetNodeAttribute( ).GetAttributeType( ) )
-			if node_attribute_type == FbxCommon.FbxNodeAttribute.eSkeleton:
+			if node_attribute_type == FBX_API.FbxNodeAttribute.eSkeleton:
 				self.create_bone( node, scene )
 
-			elif node_attribute_type == FbxCommon.FbxNodeAttribute.eMesh:
+			elif node_attribute_type == FBX_API.FbxNodeAttribute.eMesh:
 				self.create_mesh( node, scene )
 
-			elif node_attribute_type == FbxCommon.FbxNodeAttribute.eNull:
+			elif node_attribute_type == FBX_API.FbxNodeAttribute.eNull:
 				self.create_tag( node, scene )
 
 			else:
@@ -4934,6 +6794,8 @@ class App_Frame( wx.Frame ):
 		self.settings_menu.Check( 202, self.do_triangulate )
 		self.settings_menu.Check( 203, self.do_3dsmax )
 		self.settings_menu.Check( 204, self.do_Maya )
+		self.settings_menu.Check( 208, self.batch_texture_rules )
+		self.settings_menu.Check( 209, self.export_build_plan )
 
 		# update the mesh names list
 		if self.mesh_names:
@@ -4965,6 +6827,11 @@ class App_Frame( wx.Frame ):
 		self.package_folder_button.Enable( False )
 		self.package_button.Enable( False )
 
+		# extract the selected mesh data if it hasnt been already
+		if not self.selected_mesh is None:
+			if not self.get_mesh_content( self.selected_mesh ):
+				self.selected_mesh = None
+
 		is_static_mesh = False
 		if not self.selected_mesh is None:
 
@@ -4973,9 +6840,9 @@ class App_Frame( wx.Frame ):
 				is_static_mesh = True
 
 			# fill out the mesh info
-			self.text_triangle_count.SetLabel( '  Triangles: {0}'.format( len( self.mesh_data[ self.selected_mesh ] ) ) )
-			self.text_vertex_count.SetLabel( '  Vertices: {0}'.format( len( self.vertices[ self.selected_mesh ] ) ) )
-			self.text_uv_count.SetLabel( '  UVs: {0}'.format( len( self.vertices[ self.selected_mesh ] ) ) )
+			self.text_triangle_count.SetLabel( '  Triangles: {0}'.format( self.mesh_buffers[ self.selected_mesh ].get_triangle_count( ) ) )
+			self.text_vertex_count.SetLabel( '  Vertices: {0}'.format( self.mesh_buffers[ self.selected_mesh ].get_vertex_count( ) ) )
+			self.text_uv_count.SetLabel( '  UVs: {0}'.format( self.mesh_buffers[ self.selected_mesh ].get_vertex_count( ) ) )
 			self.text_material_count.SetLabel( '  Materials: {0}'.format( len( self.materials[ self.selected_mesh ] ) ) )
 			self.text_collider_count.SetLabel( '  Colliders: {0}'.format( len( self.colliders[ self.selected_mesh ] ) ) )
 			self.text_bone_count.SetLabel( '  Bones: {0}'.format( len( self.bones ) ) )
@@ -5164,5 +7031,6 @@ class FBX_Converter( wx.App ):
 
 
 if __name__ == '__main__':
+	multiprocessing.freeze_support( )
 	app = FBX_Converter( )
 	app.MainLoop( )
\ No newline at end of file